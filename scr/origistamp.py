@@ -0,0 +1,531 @@
+import argparse, os, sys, json, datetime, time, functools, multiprocessing
+
+_start = time.perf_counter()
+
+from origistamp_core import (
+    HASH_BUFFER_SIZE, CACHE_MAX_ENTRIES, PDF_FAST_THRESHOLD, READ_AHEAD_BLOCKS,
+    scan_folders, ScanRules, SCAN_WORKERS, hash_paths, hash_file, hash_scanned,
+    DIGESTS, normalize_algorithms, open_cache, load_config,
+    is_valid_gpg, build_metadata, build_sha_table, build_report,
+    write_report, create_zip, compare_files,
+    SIMILAR_THRESHOLD, SIMILAR_MAX_THRESHOLD, find_similar_images, build_similar_section,
+    IMPORT_TIMES, lazy_import, preload_modules, format_import_profile, STATS
+)
+from origistamp_manifest import (
+    MANIFEST_FORMATS, ManifestWriter, load_manifest, write_manifest, verify_folder, build_verify_section, open_manifest_writer, common_base
+)
+from origistamp_merkle import MerkleTree, verify_proof, save_proof, load_proof
+from origistamp_dedup import EDGE_BLOCK_SIZE, find_duplicates, build_duplicates_section
+from origistamp_jobs import JobJournal, job_header, load_job
+from origistamp_compare import compare_folders, compare_manifest
+from origistamp_watch import WATCH_DEBOUNCE, WATCH_POLL_INTERVAL, FolderWatcher, known_state, merkle_changes, watch
+
+IMPORT_TIMES["origistamp_core"] = time.perf_counter() - _start
+
+
+def algorithm_list(value):
+    try:
+        return normalize_algorithms(value.split(","))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def similar_threshold(value):
+    try:
+        threshold = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if not 0 <= threshold <= SIMILAR_MAX_THRESHOLD:
+        raise argparse.ArgumentTypeError(f"must be between 0 and {SIMILAR_MAX_THRESHOLD}")
+    return threshold
+
+
+def add_algorithm_arg(parser):
+    parser.add_argument(
+        "--algorithms", metavar="LIST", type=algorithm_list,
+        help=f"comma-separated digests computed next to SHA-256 in the same pass: {', '.join(DIGESTS)} (default: config)"
+    )
+
+
+def add_hash_args(parser):
+    parser.add_argument("paths", nargs="+", help="files and/or folders to hash")
+    parser.add_argument("--workers", type=int, default=0, help="hashing threads = files read in flight (default: auto)")
+    parser.add_argument("--read-ahead", type=int, metavar="BLOCKS", help=f"blocks read ahead of the hasher in large files, 0 = off (default: config or {READ_AHEAD_BLOCKS})")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or update the hash cache")
+    parser.add_argument("--force", action="store_true", help="re-hash every file even if cached")
+    parser.add_argument("--phash", action="store_true", help="also compute perceptual hashes for images")
+    add_algorithm_arg(parser)
+    parser.add_argument("--manifest", help="stream a machine-readable manifest to this path while hashing")
+    parser.add_argument("--manifest-format", choices=MANIFEST_FORMATS, default="jsonl", help="manifest format (default: jsonl)")
+    parser.add_argument("--checkpoint", metavar="FILE", help="journal progress to FILE; rerun with the same FILE to resume an interrupted run")
+    add_scan_args(parser)
+
+
+def add_scan_args(parser):
+    parser.add_argument("--exclude", action="append", default=[], metavar="PATTERN", help="gitignore-style pattern to skip (repeatable)")
+    parser.add_argument("--include", action="append", default=[], metavar="PATTERN", help="only hash files matching a pattern (repeatable)")
+    parser.add_argument("--no-default-excludes", action="store_true", help="also descend into .git, node_modules, build output, ...")
+    parser.add_argument("--scan-workers", type=int, default=0, help=f"parallel directory listers (default: config or {SCAN_WORKERS})")
+
+
+def add_report_args(parser):
+    parser.add_argument("-o", "--output", help="output path")
+    parser.add_argument("--format", choices=["md", "pdf", "both"], help="report format (default: config)")
+    parser.add_argument("--author", help="author / creator name (default: config)")
+    parser.add_argument("--note", help="note / version info (default: config)")
+    parser.add_argument("--gpg", help="GPG fingerprint, 40 hex chars (default: config)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="origistamp", description="Origistamp Hash - File Hashing & Verification Tool")
+    parser.add_argument("--import-profile", action="store_true", help="print import timings to stderr on exit")
+    parser.add_argument("--stats", metavar="FILE", help="record per-stage timers and counters; write JSON to FILE ('-' prints a table to stderr)")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("hash", help="print SHA-256 digests (sha256sum format)")
+    add_hash_args(p)
+
+    p = sub.add_parser("report", help="write a SHA-256 report")
+    add_hash_args(p)
+    add_report_args(p)
+
+    p = sub.add_parser("zip", help="bundle files and report into a ZIP with a .sha256 sidecar")
+    add_hash_args(p)
+    add_report_args(p)
+    p.add_argument("--compression", choices=["auto", "stored", "deflate", "lzma"], help="member compression (default: config or auto)")
+
+    p = sub.add_parser("compare", help="compare two files, two folders, or a manifest/report against a folder")
+    p.add_argument("file_a", help="file, folder, or manifest/report (side A)")
+    p.add_argument("file_b", help="file or folder (side B)")
+    add_algorithm_arg(p)
+    p.add_argument("--workers", type=int, default=0, help="hashing threads for folder compares (default: auto)")
+    p.add_argument("--no-cache", action="store_true", help="do not read or update the hash cache")
+    p.add_argument("--identical", action="store_true", help="also list identical files in the diff")
+    add_scan_args(p)
+
+    p = sub.add_parser("similar", help="find near-duplicate images by pHash")
+    add_hash_args(p)
+    p.add_argument("--threshold", type=similar_threshold, help=f"max pHash difference, 0-{SIMILAR_MAX_THRESHOLD} (default: config or {SIMILAR_THRESHOLD})")
+
+    p = sub.add_parser("dedup", help="list duplicate files, reading only what size and edge checks cannot rule out")
+    p.add_argument("paths", nargs="+", help="files and/or folders to search")
+    p.add_argument("--workers", type=int, default=0, help="hashing threads (default: auto)")
+    p.add_argument("--no-cache", action="store_true", help="do not reuse cached SHA-256 values")
+    p.add_argument("--block-size", type=int, default=EDGE_BLOCK_SIZE // 1024, help="first/last block compared before a full read, in KB")
+    p.add_argument("--include-empty", action="store_true", help="also group zero-byte files")
+    add_scan_args(p)
+
+    p = sub.add_parser("watch", help="hash once, then re-hash only changed files and keep the manifest/report current")
+    add_hash_args(p)
+    add_report_args(p)
+    p.add_argument("--debounce", type=float, help=f"seconds of quiet before a burst of changes is processed (default: config or {WATCH_DEBOUNCE:g})")
+    p.add_argument("--poll-interval", type=float, help=f"seconds between scans when polling (default: config or {WATCH_POLL_INTERVAL:g})")
+    p.add_argument("--polling", action="store_true", help="poll even where inotify is available (network shares)")
+
+    p = sub.add_parser("verify", help="check a folder against a saved report, .sha256 or SHA256SUMS file")
+    p.add_argument("manifest")
+    p.add_argument("folder")
+    p.add_argument("--workers", type=int, default=0, help="hashing threads (default: auto)")
+    add_scan_args(p)
+
+    p = sub.add_parser("proof", help="export a Merkle inclusion proof for one file of a stamped folder")
+    add_hash_args(p)
+    p.add_argument("--file", required=True, help="file to prove")
+    p.add_argument("-o", "--output", help="proof JSON path (default: stdout)")
+
+    p = sub.add_parser("verify-proof", help="check a file against an inclusion proof")
+    p.add_argument("proof")
+    p.add_argument("file", nargs="?", help="file to re-hash (default: trust the digest in the proof)")
+    p.add_argument("--root", help="expected Merkle root (default: the root stored in the proof)")
+
+    sub.add_parser("imports", help="import every optional dependency and print the timings")
+
+    sub.add_parser("gui", help="start the desktop app (default)")
+    return parser
+
+
+def hash_settings(config):
+    buffer_size = max(4, int(config.get("hash_buffer_kb", HASH_BUFFER_SIZE // 1024))) * 1024
+    return buffer_size, bool(config.get("use_mmap", False))
+
+
+def read_ahead(args, config):
+    return args.read_ahead if args.read_ahead is not None else int(config.get("read_ahead_blocks", READ_AHEAD_BLOCKS))
+
+
+def hash_algorithms(args, config):
+    return args.algorithms or normalize_algorithms(config.get("hash_algorithms", []))
+
+
+def scan_config(args, config):
+    scan = {
+        "scan_default_excludes": config.get("scan_default_excludes", True) and not args.no_default_excludes,
+        "scan_exclude": config.get("scan_exclude", []) + args.exclude,
+        "scan_include": config.get("scan_include", []) + args.include,
+    }
+    return scan
+
+
+def scan_rules(args, config):
+    return ScanRules.from_config(scan_config(args, config))
+
+
+def scanner_for(args, config, rules=None):
+    return scan_folders(
+        args.paths, rules or scan_rules(args, config), args.scan_workers or int(config.get("scan_workers", SCAN_WORKERS))
+    )
+
+
+def open_checkpoint(args, config):
+    # returns (journal, done rows, algorithms, scan rules) for a new or resumed job
+    if not os.path.exists(args.checkpoint):
+        algorithms = hash_algorithms(args, config)
+        scan = scan_config(args, config)
+        header = job_header(args.paths, algorithms, args.phash, scan)
+        return JobJournal(args.checkpoint, header), None, algorithms, ScanRules.from_config(scan)
+    job = load_job(args.checkpoint)
+    if job.roots != [os.path.abspath(p) for p in args.paths]:
+        raise ValueError(f"{args.checkpoint} belongs to a job on {', '.join(job.roots)}")
+    print(f"[*] Resuming {job.describe()}", file=sys.stderr)
+    rules = ScanRules.from_config(job.header["scan"])
+    return job.open_journal(), job.done, normalize_algorithms(job.header["algorithms"]), rules
+
+
+def run_hash(args, config):
+    journal = done = rules = None
+    algorithms = hash_algorithms(args, config)
+    if args.checkpoint:
+        try:
+            journal, done, algorithms, rules = open_checkpoint(args, config)
+        except (OSError, ValueError) as e:
+            print(f"[!] Cannot use checkpoint: {e}", file=sys.stderr)
+            return [], None
+    scanner = scanner_for(args, config, rules)
+    buffer_size, use_mmap = hash_settings(config)
+    cache = None if args.no_cache else open_cache(int(config.get("cache_max_entries", CACHE_MAX_ENTRIES)))
+    writer = None
+    if args.manifest:
+        writer = open_manifest_writer(args.manifest, args.manifest_format, common_base(args.paths))
+
+    def on_result(row, results):
+        writer.write(
+            results.path(row), results.digest(row), results.sizes[row], results.mtimes[row],
+            results.phash(row), results.extra_digests(row)
+        )
+
+    try:
+        results = hash_paths(
+            scanner, buffer_size=buffer_size, use_mmap=use_mmap, cache=cache, force=args.force,
+            workers=args.workers or int(config.get("hash_workers", 0)) or None, phash=args.phash,
+            on_result=on_result if writer else None, algorithms=algorithms, done=done, journal=journal,
+            read_ahead=read_ahead(args, config)
+        )
+        if journal:
+            journal.close(finished=True)
+    finally:
+        if journal:
+            journal.close()
+        if writer:
+            writer.close()
+        if cache:
+            cache.close()
+    for path, error in scanner.errors:
+        print(f"[!] Cannot scan {path}: {error}", file=sys.stderr)
+    if not scanner.paths:
+        print("[!] No supported files found.", file=sys.stderr)
+        return scanner.paths, None
+    return scanner.paths, results
+
+
+def report_content(args, config, paths, results, merkle=None):
+    author = config.get("author", "") if args.author is None else args.author
+    note = config.get("note", "") if args.note is None else args.note
+    gpg_fp = config.get("gpg", "") if args.gpg is None else args.gpg
+    if gpg_fp and not is_valid_gpg(gpg_fp):
+        print("[!] GPG fingerprint must be exactly 40 hexadecimal characters.", file=sys.stderr)
+        return None
+    merkle = merkle or MerkleTree.from_results(results, common_base(args.paths))
+    return build_report(build_sha_table(results), build_metadata(author, note, gpg_fp, merkle.root))
+
+
+def cmd_hash(args, config):
+    paths, results = run_hash(args, config)
+    if not results:
+        return 1
+    for row in results.sorted_rows():
+        line = f"{results.sha(row)}  {results.path(row)}"
+        for name, value in results.extra_digests(row).items():
+            line += f"  {name}:{value}"
+        img_hash = results.phash(row)
+        if args.phash and img_hash:
+            line += f"  phash:{img_hash}"
+        print(line)
+    return 0 if len(results) == len(paths) else 1
+
+
+def cmd_report(args, config):
+    paths, results = run_hash(args, config)
+    if not results:
+        return 1
+    content = report_content(args, config, paths, results)
+    if content is None:
+        return 2
+    export_mode = args.format or config.get("export_format", "md")
+    output = args.output or f"SHA_Report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    pdf_fast_threshold = int(config.get("pdf_fast_threshold", PDF_FAST_THRESHOLD))
+    for path in write_report(content, os.path.abspath(output), export_mode, pdf_fast_threshold):
+        print(path)
+    return 0
+
+
+def cmd_zip(args, config):
+    paths, results = run_hash(args, config)
+    if not results:
+        return 1
+    content = report_content(args, config, paths, results)
+    if content is None:
+        return 2
+    export_mode = args.format or config.get("export_format", "md")
+    zip_path = os.path.abspath(args.output or f"DocHash_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
+    compression = args.compression or config.get("zip_compression", "auto")
+    pdf_fast_threshold = int(config.get("pdf_fast_threshold", PDF_FAST_THRESHOLD))
+    zip_hash = create_zip(zip_path, paths, content, export_mode, results, compression, pdf_fast_threshold)
+    print(f"{zip_hash}  {zip_path}")
+    return 0
+
+
+def cmd_compare(args, config):
+    buffer_size, use_mmap = hash_settings(config)
+    if os.path.isdir(args.file_b):
+        return compare_trees(args, config, buffer_size)
+    hash1, hash2, result, text = compare_files(args.file_a, args.file_b, buffer_size, use_mmap, hash_algorithms(args, config))
+    print(text)
+    return 0 if hash1 == hash2 else 1
+
+
+def compare_trees(args, config, buffer_size):
+    # the diff is streamed to stdout while the files are hashed
+    cache = None if args.no_cache else open_cache(int(config.get("cache_max_entries", CACHE_MAX_ENTRIES)))
+    options = dict(
+        buffer_size=buffer_size, workers=args.workers or int(config.get("hash_workers", 0)) or None, cache=cache,
+        rules=scan_rules(args, config), scan_workers=args.scan_workers or int(config.get("scan_workers", SCAN_WORKERS)),
+        stream=sys.stdout, list_identical=args.identical
+    )
+    try:
+        if os.path.isdir(args.file_a):
+            result, _ = compare_folders(args.file_a, args.file_b, **options)
+        else:
+            manifest = load_manifest(args.file_a)
+            if not len(manifest):
+                print("[!] No SHA-256 entries found in the manifest.", file=sys.stderr)
+                return 2
+            result, _ = compare_manifest(manifest, args.file_b, **options)
+    finally:
+        if cache:
+            cache.close()
+    print()
+    return 0 if result.same else 1
+
+
+def cmd_similar(args, config):
+    threshold = args.threshold if args.threshold is not None else int(config.get("similar_threshold", SIMILAR_THRESHOLD))
+    if not 0 <= threshold <= SIMILAR_MAX_THRESHOLD:
+        print(f"[!] similar_threshold in the config must be between 0 and {SIMILAR_MAX_THRESHOLD}.", file=sys.stderr)
+        return 2
+    args.phash = True
+    paths, results = run_hash(args, config)
+    if not results:
+        return 1
+    clusters = find_similar_images({results.path(row): results.phash(row) for row in range(len(results))}, threshold)
+    print(build_similar_section(clusters, threshold))
+    return 0
+
+
+def cmd_dedup(args, config):
+    scanner = scanner_for(args, config)
+    buffer_size, _ = hash_settings(config)
+    cache = None if args.no_cache else open_cache(int(config.get("cache_max_entries", CACHE_MAX_ENTRIES)))
+    try:
+        result = find_duplicates(
+            scanner, buffer_size, args.workers or int(config.get("hash_workers", 0)) or None,
+            max(1, args.block_size) * 1024, cache, args.include_empty
+        )
+    finally:
+        if cache:
+            cache.close()
+    for path, error in scanner.errors + result.errors:
+        print(f"[!] {path}: {error}", file=sys.stderr)
+    print(build_duplicates_section(result, common_base(args.paths)))
+    return 0
+
+
+def cmd_watch(args, config):
+    paths, results = run_hash(args, config)
+    if results is None:
+        return 1
+    base = common_base(args.paths)
+    export_mode = args.format or config.get("export_format", "md")
+    pdf_fast_threshold = int(config.get("pdf_fast_threshold", PDF_FAST_THRESHOLD))
+
+    # kept for the whole session; each batch only touches the leaves it changed
+    merkle = MerkleTree.from_results(results, base)
+
+    def write_outputs(manifest=True):
+        # the initial manifest was already streamed by run_hash
+        if args.manifest and manifest:
+            # written next to the old one and swapped in, readers never see a half-written manifest
+            write_manifest(results, args.manifest + ".tmp", args.manifest_format, base)
+            os.replace(args.manifest + ".tmp", args.manifest)
+        if args.output:
+            content = report_content(args, config, paths, results, merkle)
+            if content is not None:
+                write_report(content, os.path.abspath(args.output), export_mode, pdf_fast_threshold)
+
+    def on_batch(changes, errors):
+        for kind, path, _ in changes:
+            print(f"{kind} {path}", flush=True)
+        for path, error in errors:
+            print(f"[!] Error processing {path}: {error}", file=sys.stderr)
+        merkle.apply(merkle_changes(results, changes, base))
+        write_outputs()
+        if cache:
+            cache.flush()
+        print(f"[*] {len(results)} file(s), Merkle root {merkle.root}", file=sys.stderr, flush=True)
+
+    buffer_size, use_mmap = hash_settings(config)
+    cache = None if args.no_cache else open_cache(int(config.get("cache_max_entries", CACHE_MAX_ENTRIES)))
+    job = functools.partial(
+        hash_scanned, buffer_size=buffer_size, use_mmap=use_mmap, cache=cache, phash=args.phash,
+        algorithms=hash_algorithms(args, config), read_ahead=read_ahead(args, config)
+    )
+    watcher = FolderWatcher(
+        args.paths, scan_rules(args, config), known_state(results),
+        debounce=args.debounce or float(config.get("watch_debounce", WATCH_DEBOUNCE)),
+        poll_interval=args.poll_interval or float(config.get("watch_poll_interval", WATCH_POLL_INTERVAL)),
+        polling=args.polling
+    )
+    write_outputs(manifest=False)
+    watcher.start()
+    print(f"[*] Watching {', '.join(args.paths)} ({watcher.mode}); Ctrl+C to stop", file=sys.stderr, flush=True)
+    try:
+        watch(results, watcher, job, on_batch, workers=args.workers or int(config.get("hash_workers", 0)) or None)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        if cache:
+            cache.close()
+    return 0
+
+
+def cmd_verify(args, config):
+    manifest = load_manifest(args.manifest)
+    if not len(manifest):
+        print("[!] No SHA-256 entries found in the manifest.", file=sys.stderr)
+        return 2
+    buffer_size, _ = hash_settings(config)
+    result = verify_folder(
+        manifest, args.folder, buffer_size, args.workers or int(config.get("hash_workers", 0)) or None,
+        rules=scan_rules(args, config), scan_workers=args.scan_workers or int(config.get("scan_workers", SCAN_WORKERS))
+    )
+    print(build_verify_section(result, args.manifest))
+    return 0 if result.ok else 1
+
+
+def cmd_proof(args, config):
+    paths, results = run_hash(args, config)
+    if not results:
+        return 1
+    base = common_base(args.paths)
+    merkle = MerkleTree.from_results(results, base)
+    target = os.path.abspath(args.file)
+    row = next((r for r in range(len(results)) if os.path.abspath(results.path(r)) == target), None)
+    if row is None:
+        print(f"[!] {args.file} is not part of the hashed set.", file=sys.stderr)
+        return 1
+
+    proof = merkle.export_proof(ManifestWriter(base).key(os.path.abspath(results.path(row))), results.digest(row))
+    if args.output:
+        save_proof(proof, args.output)
+        print(f"{proof['root']}  {args.output}")
+    else:
+        print(json.dumps(proof, indent=2))
+    return 0
+
+
+def cmd_verify_proof(args, config):
+    proof = load_proof(args.proof)
+    digest = proof["sha256"]
+    if args.file:
+        buffer_size, use_mmap = hash_settings(config)
+        digest = hash_file(args.file, buffer_size, use_mmap)
+    root = args.root or proof["root"]
+    ok = digest == proof["sha256"] and verify_proof(proof["path"], digest, proof["proof"], root)
+    print(f"{'✅ INCLUDED' if ok else '❌ NOT INCLUDED'}: {proof['path']} in {root}")
+    return 0 if ok else 1
+
+
+def cmd_imports(args, config):
+    for name in ("customtkinter", "origistamp_hash_checker"):
+        try:
+            lazy_import(name)
+        except ImportError as e:
+            print(f"[!] {name} unavailable: {e}")
+    preload_modules()
+    print(format_import_profile())
+    return 0
+
+
+def cmd_gui(args, config):
+    ctk = lazy_import("customtkinter")
+    DocHashApp = lazy_import("origistamp_hash_checker").DocHashApp
+
+    root = ctk.CTk()
+    app = DocHashApp(root)
+
+    def on_close():
+        app.save_config()
+        app.close()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", on_close)
+    root.mainloop()
+    return 0
+
+
+COMMANDS = {
+    "hash": cmd_hash,
+    "report": cmd_report,
+    "zip": cmd_zip,
+    "compare": cmd_compare,
+    "similar": cmd_similar,
+    "dedup": cmd_dedup,
+    "watch": cmd_watch,
+    "verify": cmd_verify,
+    "proof": cmd_proof,
+    "verify-proof": cmd_verify_proof,
+    "imports": cmd_imports,
+    "gui": cmd_gui,
+}
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.stats:
+        STATS.enable()
+        STATS.reset()
+    try:
+        return COMMANDS[args.command or "gui"](args, load_config())
+    finally:
+        if args.import_profile:
+            print(format_import_profile(), file=sys.stderr)
+        if args.stats == "-":
+            print(STATS.format_table(), file=sys.stderr)
+        elif args.stats:
+            STATS.dump(args.stats)
+
+
+if __name__ == '__main__':
+    # frozen Windows builds re-run this script in every worker process
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import argparse, hashlib, io, json, os, random, shutil, sys, tempfile, time
+
+from origistamp_core import (
+    build_metadata, build_report, build_sha_table, ResultStore, convert_markdown_to_pdf,
+    scan_folders, hash_paths, create_zip, compute_phash, STATS, Image
+)
+from origistamp_pdf import write_report_pdf
+
+# name -> (file count, bytes per file, extension); --scale shrinks the count,
+# or the file size for "huge"
+CORPORA = {
+    "tiny": (20000, 2 * 1024, ".txt"),
+    "huge": (4, 256 * 1024 * 1024, ".exe"),
+    "images": (300, 0, ".jpg"),
+}
+IMAGE_SIZE = (1600, 1200)
+WORDS = b"origin stamp hash report proof folder release asset build verify ".split()
+
+
+def synthetic_report(rows):
+    store = ResultStore()
+    for i in range(rows):
+        store.add(f"/bench/dir{i % 100}/file_{i:07d}.txt", hashlib.sha256(str(i).encode()).digest(), i * 37, 0)
+    metadata = build_metadata("Benchmark", f"{rows} synthetic rows", "DE5AE0C44FC50C20A9F792D89643F4B91418B743")
+    return build_report(build_sha_table(store), metadata)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def _text_block(rng, size):
+    # half compressible text, half noise, so ZIP numbers are not best or worst case
+    text = b" ".join(rng.choice(WORDS) for _ in range(size // 12 + 1))[:size // 2]
+    return text + rng.randbytes(size - len(text))
+
+
+def make_corpus(kind, root, scale=1.0, seed=0):
+    count, size, ext = CORPORA[kind]
+    if kind == "huge":
+        size = max(1, int(size * scale))
+    else:
+        count = max(1, int(count * scale))
+    rng = random.Random(seed)
+    folder = os.path.join(root, kind)
+    os.makedirs(folder, exist_ok=True)
+
+    if kind == "images":
+        for i in range(count):
+            # gaussian noise: no flat areas, so JPEG decoding is close to worst case
+            img = Image.effect_noise(IMAGE_SIZE, 32 + i % 64).convert("RGB")
+            img.save(os.path.join(folder, f"img_{i:05d}{ext}"), quality=90)
+        return folder
+
+    for i in range(count):
+        sub = os.path.join(folder, f"d{i % 50:02d}") if kind == "tiny" else folder
+        os.makedirs(sub, exist_ok=True)
+        with open(os.path.join(sub, f"f_{i:06d}{ext}"), "wb") as f:
+            left = size
+            while left:
+                chunk = min(left, 8 * 1024 * 1024)
+                f.write(_text_block(rng, chunk))
+                left -= chunk
+    return folder
+
+
+def corpus_size(folder):
+    files = total = 0
+    for path, stat in scan_folders([folder]):
+        files += 1
+        total += stat.st_size
+    return files, total
+
+
+def report_row(bench, corpus, files, total, seconds, extra=""):
+    mb = total / (1024 * 1024)
+    print(
+        f"{bench:<12} | {corpus:<8} | {files:>7} | {mb:>9.1f} | {seconds:>8.2f} | "
+        f"{mb / seconds if seconds else 0:>8.1f} | {files / seconds if seconds else 0:>9.0f} {extra}"
+    )
+    return {"bench": bench, "corpus": corpus, "files": files, "bytes": total, "seconds": seconds,
+            "mb_per_s": mb / seconds if seconds else None, "files_per_s": files / seconds if seconds else None}
+
+
+def print_header():
+    print(f"{'bench':<12} | {'corpus':<8} | {'files':>7} | {'MB':>9} | {'seconds':>8} | {'MB/s':>8} | {'files/s':>9}")
+
+
+def bench_hash(folder, corpus, workers=None, phash=False):
+    # the load_files pipeline without Tk: scanner -> HashScheduler -> hash_entry, cache off
+    _, total = corpus_size(folder)
+    seconds, results = timed(lambda: hash_paths(scan_folders([folder]), workers=workers, phash=phash))
+    return report_row("hash" if not phash else "hash+phash", corpus, len(results), total, seconds)
+
+
+def bench_zip(folder, corpus, compression):
+    files, total = corpus_size(folder)
+    paths = [path for path, _ in scan_folders([folder])]
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "bench.zip")
+        seconds, _ = timed(lambda: create_zip(zip_path, paths, "# Bench\n", "md", None, compression))
+        ratio = os.path.getsize(zip_path) / total if total else 0
+    row = report_row(f"zip:{compression}", corpus, files, total, seconds, f"(ratio {ratio:.2f})")
+    row["ratio"] = ratio
+    return row
+
+
+def bench_phash(folder, corpus):
+    paths = [path for path, _ in scan_folders([folder])]
+    total = sum(os.path.getsize(p) for p in paths)
+
+    def run():
+        for path in paths:
+            compute_phash(path)
+
+    seconds, _ = timed(run)
+    return report_row("phash", corpus, len(paths), total, seconds)
+
+
+def bench_pdf(sizes, weasyprint_limit):
+    rows_out = []
+    print(f"{'rows':>8} | {'engine':<10} | {'seconds':>8} | {'rows/s':>10} | {'size KB':>9}")
+    for rows in sizes:
+        content = synthetic_report(rows)
+
+        def direct():
+            buf = io.BytesIO()
+            write_report_pdf(content, buf)
+            return buf.getvalue()
+
+        seconds, pdf = timed(direct)
+        print(f"{rows:>8} | {'direct':<10} | {seconds:>8.2f} | {rows / seconds:>10.0f} | {len(pdf) / 1024:>9.1f}")
+        rows_out.append({"bench": "pdf", "engine": "direct", "rows": rows, "seconds": seconds, "bytes": len(pdf)})
+
+        if rows <= weasyprint_limit:
+            try:
+                seconds, pdf = timed(lambda: convert_markdown_to_pdf(content, None, fast_threshold=sys.maxsize))
+                print(f"{rows:>8} | {'weasyprint':<10} | {seconds:>8.2f} | {rows / seconds:>10.0f} | {len(pdf) / 1024:>9.1f}")
+                rows_out.append({"bench": "pdf", "engine": "weasyprint", "rows": rows, "seconds": seconds, "bytes": len(pdf)})
+            except ImportError as e:
+                print(f"{rows:>8} | {'weasyprint':<10} | skipped ({e})")
+    return rows_out
+
+
+def prepare(args, kinds):
+    # reuse an existing corpus directory, otherwise build a throwaway one
+    root = args.corpus_dir or tempfile.mkdtemp(prefix="origistamp_bench_")
+    folders = {}
+    for kind in kinds:
+        folder = os.path.join(root, kind)
+        if not os.path.isdir(folder):
+            try:
+                print(f"[*] generating {kind} corpus in {folder}", file=sys.stderr)
+                make_corpus(kind, root, args.scale)
+            except ImportError as e:
+                print(f"[!] {kind} corpus skipped ({e})", file=sys.stderr)
+                shutil.rmtree(folder, ignore_errors=True)
+                continue
+        folders[kind] = folder
+    return root, folders
+
+
+def run_files(args):
+    kinds = args.corpus or list(CORPORA)
+    root, folders = prepare(args, kinds)
+    rows = []
+    try:
+        print_header()
+        for kind, folder in folders.items():
+            if args.command in ("hash", "all"):
+                rows.append(bench_hash(folder, kind, args.workers or None, phash=kind == "images"))
+            if args.command in ("zip", "all"):
+                for compression in args.compression:
+                    rows.append(bench_zip(folder, kind, compression))
+            if args.command in ("phash", "all") and kind == "images":
+                rows.append(bench_phash(folder, kind))
+    finally:
+        if args.corpus_dir or args.keep:
+            print(f"[*] corpus kept in {root}", file=sys.stderr)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="origistamp_bench", description="Origistamp benchmarks")
+    parser.add_argument("--json", metavar="FILE", help="also write the measurements as JSON")
+    parser.add_argument("--stats", action="store_true", help="enable per-stage instrumentation and print the breakdown")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("pdf", help="report PDF generation at 1k/10k/100k rows")
+    p.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    p.add_argument("--weasyprint-limit", type=int, default=10000, help="largest row count to also render with WeasyPrint")
+
+    p = sub.add_parser("corpus", help="generate synthetic corpora and keep them for later runs")
+    p.add_argument("folder")
+    p.add_argument("--corpus", nargs="+", choices=list(CORPORA), help="corpora to generate (default: all)")
+    p.add_argument("--scale", type=float, default=1.0, help="multiply file counts (tiny, images) or sizes (huge)")
+
+    for name, text in (("hash", "hashing throughput (the load_files pipeline)"), ("zip", "create_zip throughput"),
+                       ("phash", "perceptual hash throughput"), ("all", "hash, zip and phash on every corpus")):
+        p = sub.add_parser(name, help=text)
+        p.add_argument("--corpus", nargs="+", choices=list(CORPORA), help="corpora to run (default: all)")
+        p.add_argument("--corpus-dir", help="folder from `corpus`; generated in a temp dir when omitted")
+        p.add_argument("--scale", type=float, default=0.1, help="size of a generated corpus (default: 0.1)")
+        p.add_argument("--keep", action="store_true", help="keep the generated temp corpus")
+        p.add_argument("--workers", type=int, default=0, help="hashing threads (default: auto)")
+        p.add_argument("--compression", nargs="+", default=["auto"], choices=["auto", "stored", "deflate", "lzma"])
+
+    args = parser.parse_args(argv)
+    if args.stats:
+        STATS.enable()
+
+    if args.command == "pdf":
+        rows = bench_pdf(args.rows, args.weasyprint_limit)
+    elif args.command == "corpus":
+        for kind in args.corpus or list(CORPORA):
+            try:
+                print(make_corpus(kind, args.folder, args.scale))
+            except ImportError as e:
+                print(f"[!] {kind} corpus skipped ({e})", file=sys.stderr)
+        return 0
+    else:
+        rows = run_files(args)
+
+    if args.stats:
+        print()
+        print(STATS.format_table())
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": rows, "stats": STATS.snapshot() if args.stats else None}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
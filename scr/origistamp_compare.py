@@ -0,0 +1,238 @@
+import os, functools
+from concurrent.futures import ThreadPoolExecutor
+
+from origistamp_core import HASH_BUFFER_SIZE, SCAN_WORKERS, HashScheduler, hash_file, scan_folders, format_size
+from origistamp_manifest import ManifestWriter, match_entries
+
+IDENTICAL = "identical"
+CHANGED = "changed"
+ONLY_A = "only in A"
+ONLY_B = "only in B"
+STATUS_ICONS = {IDENTICAL: "✅", CHANGED: "❌", ONLY_A: "➖", ONLY_B: "➕"}
+
+
+class CompareResult:
+    def __init__(self, source_a="", source_b=""):
+        self.source_a = source_a
+        self.source_b = source_b
+        self.identical = 0
+        self.changed = []
+        self.only_a = []
+        self.only_b = []
+        self.errors = []
+        self.files_a = 0
+        self.files_b = 0
+        self.size_mismatches = 0
+        self.cached = 0
+        self.bytes_read = 0
+
+    @property
+    def same(self):
+        return not (self.changed or self.only_a or self.only_b or self.errors)
+
+
+class CompareReport:
+    """Markdown diff written row by row as files are settled.
+
+    Lines are kept for comparison_result_text and, with `stream`, written out
+    immediately, so a long compare shows its first differences right away.
+    """
+
+    def __init__(self, result, stream=None, list_identical=False):
+        self.result = result
+        self.stream = stream
+        self.list_identical = list_identical
+        self.lines = []
+        self._write("# Folder Comparison\n\n")
+        self._write(f"- A: `{result.source_a}`\n- B: `{result.source_b}`\n\n")
+        self._write("| Status | File | Detail |\n|--------|------|--------|\n")
+
+    def _write(self, text):
+        self.lines.append(text)
+        if self.stream:
+            self.stream.write(text)
+
+    def row(self, status, key, detail=""):
+        if status == IDENTICAL and not self.list_identical:
+            return
+        self._write(f"| {STATUS_ICONS[status]} {status} | `{key}` | {detail} |\n")
+
+    def finish(self):
+        result = self.result
+        lines = ["\n## Summary\n\n"]
+        lines.append(f"- Files in A: {result.files_a}\n- Files in B: {result.files_b}\n")
+        lines.append(f"- Identical: {result.identical}\n")
+        lines.append(f"- Changed: {len(result.changed)} ({result.size_mismatches} by size alone)\n")
+        lines.append(f"- Only in A: {len(result.only_a)}\n- Only in B: {len(result.only_b)}\n")
+        lines.append(f"- Read: {format_size(result.bytes_read)}; {result.cached} digest(s) from cache or manifest\n")
+        if result.errors:
+            lines.append(f"- Errors: {len(result.errors)}\n")
+            lines.extend(f"  - `{key}` — {error}\n" for key, error in result.errors)
+        status = "✅ Folders are IDENTICAL." if result.same else "❌ Folders DIFFER."
+        lines.append(f"\n**Result:** {status}")
+        self._write("".join(lines))
+
+    def text(self):
+        return "".join(self.lines)
+
+
+# a side maps relative key -> (path, size, sha, size tolerance, stat);
+# folder sides have no sha yet, manifest sides have no path
+def folder_side(folder, rules=None, workers=SCAN_WORKERS, cancelled=None, errors=None):
+    writer = ManifestWriter(os.path.abspath(folder))
+    scanner = scan_folders([folder], rules, workers, cancelled)
+    side = {writer.key(os.path.abspath(path)): (path, stat.st_size, None, 0, stat) for path, stat in scanner}
+    if errors is not None:
+        errors.extend(scanner.errors)
+    return side
+
+
+def manifest_side(manifest, folder=None, buffer_size=HASH_BUFFER_SIZE, workers=None, cancelled=None):
+    # Markdown reports only list file names; they are paired with the folder side's
+    # keys by match_entries, the same way verify does it. `folder` is updated in
+    # place with the digests read while matching
+    folder = folder if folder is not None else {}
+    if not manifest.basenames_only:
+        return {key: (None, size, sha, tolerance, None) for key, sha, size, tolerance in manifest.entries}
+
+    paths = {entry[0]: key for key, entry in folder.items()}
+    pairs, digests = match_entries(manifest.entries, list(paths), None, True, buffer_size, workers, cancelled)
+    for path, sha in digests.items():
+        key = paths[path]
+        folder[key] = folder[key][:2] + (sha,) + folder[key][3:]
+    side = {}
+    for i, (key, sha, size, tolerance) in enumerate(manifest.entries):
+        if i in pairs:
+            key = paths[pairs[i]]
+        else:
+            # a repeated name without a file of its own still counts as one row
+            name, n = key, 1
+            while key in side or key in folder:
+                n += 1
+                key = f"{name} ({n})"
+        side[key] = (None, size, sha, tolerance, None)
+    return side
+
+
+def _hash_job(item, buffer_size=HASH_BUFFER_SIZE):
+    return hash_file(item[2], buffer_size)
+
+
+def compare_sides(side_a, side_b, result, report, buffer_size=HASH_BUFFER_SIZE, workers=None, cache=None,
+                  cancelled=None, on_progress=None):
+    """Settles every key of two sides, reading only what size cannot decide.
+
+    Keys on one side only and size mismatches are reported before any file is
+    opened. The rest are hashed on one shared pool, both sides interleaved,
+    unless the digest is already known from the manifest or the hash cache.
+    """
+    result.files_a, result.files_b = len(side_a), len(side_b)
+    for key in sorted(side_a.keys() - side_b.keys()):
+        result.only_a.append(key)
+        report.row(ONLY_A, key, format_size(side_a[key][1]) if side_a[key][1] is not None else "")
+    for key in sorted(side_b.keys() - side_a.keys()):
+        result.only_b.append(key)
+        report.row(ONLY_B, key, format_size(side_b[key][1]) if side_b[key][1] is not None else "")
+
+    def settle(key, sha_a, sha_b):
+        if sha_a == sha_b:
+            result.identical += 1
+            report.row(IDENTICAL, key)
+        else:
+            result.changed.append((key, "SHA-256 differs"))
+            report.row(CHANGED, key, f"SHA-256 `{sha_a[:12]}…` → `{sha_b[:12]}…`")
+
+    pending = {}
+    jobs = []
+    for key in sorted(side_a.keys() & side_b.keys()):
+        entries = (side_a[key], side_b[key])
+        (_, size_a, _, tol_a, _), (_, size_b, _, tol_b, _) = entries
+        if size_a is not None and size_b is not None:
+            if abs(size_a - size_b) > max(tol_a, tol_b):
+                result.size_mismatches += 1
+                result.changed.append((key, "size differs"))
+                if tol_a or tol_b:
+                    # a Markdown report only knows the size to 0.01 KB, so both are shown at that precision
+                    detail = f"size {format_size(size_a)} → {format_size(size_b)}"
+                else:
+                    detail = f"size {int(size_a):,} → {int(size_b):,} bytes"
+                report.row(CHANGED, key, detail)
+                continue
+            if size_a == size_b == 0 and not (tol_a or tol_b):
+                result.identical += 1
+                report.row(IDENTICAL, key)
+                continue
+        digests = []
+        for side, (path, size, sha, _, stat) in enumerate(entries):
+            if sha is None and cache and stat is not None:
+                cached = cache.get(path, stat)
+                sha = cached["sha"] if cached else None
+            if sha is None:
+                jobs.append((key, side, path, stat))
+            else:
+                result.cached += 1
+            digests.append(sha.lower() if sha else None)
+        if None in digests:
+            pending[key] = digests
+        else:
+            settle(key, *digests)
+
+    scheduler = HashScheduler(functools.partial(_hash_job, buffer_size=buffer_size), workers=workers)
+    scheduler.start(jobs)
+    done = 0
+    try:
+        for (key, side, path, stat), sha, error in scheduler.iter_results():
+            if cancelled is not None and cancelled.is_set():
+                scheduler.cancel()
+            done += 1
+            if on_progress:
+                on_progress(done, len(jobs))
+            digests = pending.get(key)
+            if digests is None:
+                continue
+            if error:
+                del pending[key]
+                result.errors.append((key, str(error)))
+                continue
+            result.bytes_read += stat.st_size
+            if cache:
+                cache.put(path, stat, sha)
+            digests[side] = sha
+            if None not in digests:
+                del pending[key]
+                settle(key, *digests)
+    finally:
+        if not scheduler.finished:
+            scheduler.cancel()
+            scheduler.wait()
+        # whatever is left was cancelled before both sides were read
+        result.errors.extend((key, "not compared") for key in pending)
+        if cache:
+            cache.flush()
+    return result
+
+
+def compare_folders(folder_a, folder_b, buffer_size=HASH_BUFFER_SIZE, workers=None, cache=None, rules=None,
+                    scan_workers=SCAN_WORKERS, cancelled=None, on_progress=None, stream=None, list_identical=False):
+    result = CompareResult(folder_a, folder_b)
+    report = CompareReport(result, stream, list_identical)
+    scan_errors = []
+    # both trees are listed at the same time; on network shares the listing is most of the wait
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(folder_side, folder, rules, scan_workers, cancelled, scan_errors) for folder in (folder_a, folder_b)]
+        side_a, side_b = (future.result() for future in futures)
+    result.errors.extend(scan_errors)
+    compare_sides(side_a, side_b, result, report, buffer_size, workers, cache, cancelled, on_progress)
+    report.finish()
+    return result, report.text()
+
+
+def compare_manifest(manifest, folder, buffer_size=HASH_BUFFER_SIZE, workers=None, cache=None, rules=None,
+                     scan_workers=SCAN_WORKERS, cancelled=None, on_progress=None, stream=None, list_identical=False):
+    result = CompareResult(os.path.basename(manifest.source) or "manifest", folder)
+    report = CompareReport(result, stream, list_identical)
+    side_b = folder_side(folder, rules, scan_workers, cancelled, result.errors)
+    side_a = manifest_side(manifest, side_b, buffer_size, workers, cancelled)
+    compare_sides(side_a, side_b, result, report, buffer_size, workers, cache, cancelled, on_progress)
+    report.finish()
+    return result, report.text()
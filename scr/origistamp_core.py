@@ -0,0 +1,1122 @@
+import hashlib, os, sys, io, datetime, zipfile, mmap
+import threading, queue, functools, sqlite3, time, importlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import json
+from array import array
+
+from origistamp_pdf import write_report_pdf
+from origistamp_scan import Scanner, ScanRules, SCAN_WORKERS, scan_paths
+from origistamp_stats import STATS
+
+IMPORT_TIMES = {}
+
+
+def lazy_import(name):
+    module = sys.modules.get(name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        IMPORT_TIMES[name] = time.perf_counter() - start
+    return module
+
+
+class LazyModule:
+    # heavy optional dependencies are only imported on first attribute access
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = lazy_import(self._name)
+        return getattr(self._module, attr)
+
+
+Image = LazyModule("PIL.Image")
+imagehash = LazyModule("imagehash")
+markdown2 = LazyModule("markdown2")
+weasyprint = LazyModule("weasyprint")
+blake3 = LazyModule("blake3")
+
+LAZY_MODULES = ("PIL.Image", "imagehash", "markdown2", "weasyprint")
+
+
+def preload_modules(names=LAZY_MODULES):
+    for name in names:
+        try:
+            lazy_import(name)
+        except ImportError as e:
+            print(f"[!] Optional dependency unavailable: {name} ({e})")
+
+
+def format_import_profile():
+    lines = ["import time: cumulative [us] | module"]
+    for name, seconds in sorted(IMPORT_TIMES.items(), key=lambda item: -item[1]):
+        lines.append(f"import time: {int(seconds * 1e6):>16} | {name}")
+    return "\n".join(lines)
+
+SUPPORTED_FORMATS = (
+    '.txt', '.md', '.pdf', '.docx', '.odt', '.rtf',
+    '.json', '.csv', '.xml', '.yaml', '.yml', '.ini',
+    '.py', '.js', '.html', '.css', '.java', '.c', '.cpp', '.sh', '.bat', '.ts',
+    '.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp', '.tiff', '.ico', '.psd',
+    '.exe', '.msi', '.dll', '.so', '.app', '.dmg', '.deb', '.rpm'
+)
+
+IMAGE_FORMATS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp', '.tiff', '.ico', '.psd')
+
+# already-compressed containers gain nothing from deflate, so "auto" stores them
+COMPRESSED_FORMATS = (
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.pdf', '.docx', '.odt', '.psd',
+    '.exe', '.msi', '.dll', '.so', '.dmg', '.deb', '.rpm', '.zip', '.gz', '.7z'
+)
+
+ZIP_COMPRESSION = {
+    "stored": zipfile.ZIP_STORED,
+    "deflate": zipfile.ZIP_DEFLATED,
+    "lzma": zipfile.ZIP_LZMA,
+}
+
+CONFIG_FILE = "config.json"
+CACHE_FILE = "hash_cache.sqlite"
+CACHE_MAX_ENTRIES = 500000
+
+HASH_BUFFER_SIZE = 1024 * 1024
+MMAP_THRESHOLD = 64 * 1024 * 1024
+# blocks a reader thread keeps ahead of the hasher for files of PIPELINE_THRESHOLD
+# and up; the files themselves are in flight once per hashing worker
+READ_AHEAD_BLOCKS = 2
+PIPELINE_THRESHOLD = 16 * 1024 * 1024
+PHASH_INLINE_LIMIT = 64 * 1024 * 1024
+PHASH_THUMBNAIL = (128, 128)
+SIMILAR_THRESHOLD = 5
+SIMILAR_MAX_THRESHOLD = 64
+PDF_FAST_THRESHOLD = 1000
+
+# name -> (constructor, label). SHA-256 is always computed: cache, manifests,
+# Merkle leaves and verify are keyed on it; the others are extra columns
+DIGESTS = {
+    "sha256": (hashlib.sha256, "SHA-256"),
+    "sha512": (hashlib.sha512, "SHA-512"),
+    "blake2b": (hashlib.blake2b, "BLAKE2b"),
+    "blake3": (lambda: blake3.blake3(), "BLAKE3"),
+}
+PRIMARY_DIGEST = "sha256"
+DEFAULT_ALGORITHMS = (PRIMARY_DIGEST,)
+
+
+def digest_label(name):
+    return DIGESTS[name][1]
+
+
+def available_digests():
+    names = []
+    for name, (factory, _) in DIGESTS.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def normalize_algorithms(names):
+    algorithms = [PRIMARY_DIGEST]
+    for name in names or ():
+        name = name.strip().lower().replace("-", "")
+        if name not in DIGESTS:
+            raise ValueError(f"Unknown digest algorithm: {name}")
+        if name in algorithms:
+            continue
+        try:
+            DIGESTS[name][0]()
+        except ImportError:
+            raise ValueError(f"{digest_label(name)} needs the optional '{name}' package")
+        algorithms.append(name)
+    return tuple(algorithms)
+
+
+def hash_file_digests(filepath, algorithms=DEFAULT_ALGORITHMS, buffer_size=HASH_BUFFER_SIZE, use_mmap=False, read_ahead=READ_AHEAD_BLOCKS):
+    # every algorithm is fed from the same buffer, so extra digests cost CPU but no extra I/O
+    hashers = [DIGESTS[name][0]() for name in algorithms]
+    with open(filepath, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if size > buffer_size:
+            advise_sequential(f.fileno(), size)
+        if read_ahead and size >= PIPELINE_THRESHOLD and not use_mmap:
+            total, read_wait, digest_time = _hash_pipelined(f, buffer_size, read_ahead, hashers)
+            STATS.add_time("io.wait", read_wait)
+            STATS.add_time("cpu.digest", digest_time)
+            STATS.count("bytes.hashed", total)
+            return {name: h.hexdigest() for name, h in zip(algorithms, hashers)}
+        if use_mmap and size >= MMAP_THRESHOLD:
+            STATS.count("bytes.hashed", size)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # every slice is an export of the map; each one is released
+                # before the next, or closing the map raises BufferError
+                with memoryview(mm) as view:
+                    for offset in range(0, size, buffer_size):
+                        with view[offset:offset + buffer_size] as chunk:
+                            for h in hashers:
+                                h.update(chunk)
+            return {name: h.hexdigest() for name, h in zip(algorithms, hashers)}
+
+        # one reusable buffer per call keeps memory flat regardless of file size
+        buf = bytearray(buffer_size)
+        view = memoryview(buf)
+        if STATS.enabled:
+            _hash_timed(f, buf, view, hashers)
+        else:
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                chunk = view[:n]
+                for h in hashers:
+                    h.update(chunk)
+    return {name: h.hexdigest() for name, h in zip(algorithms, hashers)}
+
+
+def advise_sequential(fd, size):
+    # doubles the kernel readahead window and starts fetching the first block
+    # before it is asked for; a no-op where posix_fadvise does not exist
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        os.posix_fadvise(fd, 0, min(size, HASH_BUFFER_SIZE * 4), os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+
+
+def _hash_pipelined(f, buffer_size, depth, hashers):
+    """Reads on a helper thread while the caller hashes.
+
+    Up to `depth` filled blocks wait in the queue, so a slow read (NFS/SMB
+    round trip, disk seek) overlaps the digest of the previous block instead
+    of stalling it. Buffers are recycled through `free`, memory stays at
+    (depth + 1) blocks. Returns (bytes, seconds waiting for data, seconds hashing).
+    """
+    buffers = [bytearray(buffer_size) for _ in range(depth + 1)]
+    free = queue.Queue()
+    filled = queue.Queue()
+    for index in range(len(buffers)):
+        free.put(index)
+
+    def reader():
+        try:
+            while True:
+                index = free.get()
+                if index is None:
+                    return
+                n = f.readinto(buffers[index])
+                filled.put((index, n))
+                if not n:
+                    return
+        except BaseException as e:
+            filled.put((None, e))
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    clock = time.perf_counter
+    total = 0
+    read_wait = digest_time = 0.0
+    try:
+        while True:
+            start = clock()
+            index, n = filled.get()
+            got = clock()
+            read_wait += got - start
+            if index is None:
+                raise n
+            if not n:
+                break
+            with memoryview(buffers[index]) as view:
+                chunk = view[:n]
+                for h in hashers:
+                    h.update(chunk)
+                chunk.release()
+            free.put(index)
+            total += n
+            digest_time += clock() - got
+    finally:
+        free.put(None)
+        thread.join()
+    return total, read_wait, digest_time
+
+
+def _hash_timed(f, buf, view, hashers):
+    # same loop as hash_file_digests, split into disk and digest time
+    clock = time.perf_counter
+    read_time = digest_time = 0.0
+    total = 0
+    while True:
+        start = clock()
+        n = f.readinto(buf)
+        read_done = clock()
+        read_time += read_done - start
+        if not n:
+            break
+        total += n
+        chunk = view[:n]
+        for h in hashers:
+            h.update(chunk)
+        digest_time += clock() - read_done
+    STATS.add_time("io.read", read_time)
+    STATS.add_time("cpu.digest", digest_time)
+    STATS.count("bytes.hashed", total)
+
+
+def hash_file(filepath, buffer_size=HASH_BUFFER_SIZE, use_mmap=False, read_ahead=READ_AHEAD_BLOCKS):
+    return hash_file_digests(filepath, DEFAULT_ALGORITHMS, buffer_size, use_mmap, read_ahead)[PRIMARY_DIGEST]
+
+class HashCache:
+    def __init__(self, path=CACHE_FILE, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched = []
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, "
+            "sha TEXT, phash TEXT, used INTEGER, digests TEXT)"
+        )
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(hashes)")]
+        if "digests" not in columns:
+            self.conn.execute("ALTER TABLE hashes ADD COLUMN digests TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS hashes_used ON hashes (used)")
+        self.conn.commit()
+
+    def get(self, path, stat):
+        path = os.path.abspath(path)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT sha, phash, digests FROM hashes WHERE path = ? AND size = ? AND mtime_ns = ? AND inode = ?",
+                (path, stat.st_size, stat.st_mtime_ns, stat.st_ino)
+            ).fetchone()
+            if row:
+                self.hits += 1
+                self._touched.append((int(time.time()), path))
+                return {"sha": row[0], "phash": row[1], "digests": json.loads(row[2]) if row[2] else {}}
+            self.misses += 1
+            return None
+
+    def put(self, path, stat, sha, phash=None, digests=None):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, stat.st_ino, sha, phash, int(time.time()),
+                 json.dumps(digests) if digests else None)
+            )
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def flush(self):
+        with self._lock:
+            if self._touched:
+                self.conn.executemany("UPDATE hashes SET used = ? WHERE path = ?", self._touched)
+                self._touched = []
+            count = self.conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+            if count > self.max_entries:
+                # least recently used rows go first
+                self.conn.execute(
+                    "DELETE FROM hashes WHERE path IN (SELECT path FROM hashes ORDER BY used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self.conn.commit()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+
+def open_cache(max_entries=CACHE_MAX_ENTRIES):
+    try:
+        cache_path = os.path.join(os.path.dirname(os.path.abspath(CONFIG_FILE)), CACHE_FILE)
+        return HashCache(cache_path, max_entries)
+    except Exception as e:
+        print(f"[!] Hash cache unavailable: {e}")
+        return None
+
+
+def hash_entry(filepath, buffer_size=HASH_BUFFER_SIZE, use_mmap=False, cache=None, force=False, cpu_pool=None, phash=False, phash_pool=None, stat=None, algorithms=DEFAULT_ALGORITHMS, read_ahead=READ_AHEAD_BLOCKS):
+    if stat is None:
+        stat = os.stat(filepath)
+    want_phash = phash and is_image(filepath)
+    extra = [name for name in algorithms if name != PRIMARY_DIGEST]
+    if cache and not force:
+        with STATS.stage("cache.lookup"):
+            cached = cache.get(filepath, stat)
+        if cached and (cached["phash"] or not want_phash) and all(name in cached["digests"] for name in extra):
+            digests = {name: cached["digests"][name] for name in extra}
+            STATS.count("files.cached")
+            return {"sha": cached["sha"], "size": stat.st_size, "mtime": stat.st_mtime_ns, "phash": cached["phash"], "digests": digests, "cached": True}
+
+    if want_phash:
+        job = (image_hashes, filepath, buffer_size, use_mmap, algorithms, read_ahead)
+        pool = phash_pool or cpu_pool
+    else:
+        job = (hash_file_digests, filepath, algorithms, buffer_size, use_mmap, read_ahead)
+        pool = cpu_pool
+
+    with STATS.stage("pool.wait" if pool else ("image.hash" if want_phash else "file.hash")):
+        if pool:
+            result = pool.submit(*job).result()
+        else:
+            result = job[0](*job[1:])
+    STATS.count("images.hashed" if want_phash else "files.hashed")
+    digests, img_hash = result if want_phash else (result, None)
+    sha = digests.pop(PRIMARY_DIGEST)
+
+    if cache:
+        cache.put(filepath, stat, sha, img_hash, digests)
+    return {"sha": sha, "size": stat.st_size, "mtime": stat.st_mtime_ns, "phash": img_hash, "digests": digests, "cached": False}
+
+
+PHASH_NONE = 0
+PHASH_OK = 1
+PHASH_FAILED = 2
+
+
+class ResultStore:
+    # columnar manifest: raw digests in one bytearray, numbers in typed arrays,
+    # directory prefixes interned once; strings are only formatted on demand
+    DIGEST_SIZE = 32
+
+    def __init__(self):
+        self.dirs = []
+        self._dir_prefixes = []
+        self._dir_ids = {}
+        self.dir_index = array('I')
+        self.names = []
+        self.digests = bytearray()
+        self.sizes = array('q')
+        self.mtimes = array('q')
+        self.phashes = array('Q')
+        self.phash_state = bytearray()
+        self.extra = {}
+        self.extra_sizes = {}
+        self._row_of = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, path):
+        return self.row_of(path) is not None
+
+    def add(self, path, sha, size, mtime=0, phash=None, digests=None):
+        directory, name = os.path.split(path)
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = self._dir_ids[directory] = len(self.dirs)
+            self.dirs.append(directory)
+            self._dir_prefixes.append(os.path.join(directory, "") if directory else "")
+        row = len(self.names)
+        self.dir_index.append(dir_id)
+        self.names.append(sys.intern(name))
+        self.digests += bytes.fromhex(sha) if isinstance(sha, str) else sha
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        value, state = self._phash_value(phash)
+        self.phashes.append(value)
+        self.phash_state.append(state)
+        if digests or self.extra:
+            self._add_extra(row, digests or {})
+        if self._row_of is not None:
+            self._row_of[path] = row
+        return row
+
+    @staticmethod
+    def _phash_value(phash):
+        if phash in (None, ""):
+            return 0, PHASH_NONE
+        if phash == "-":
+            return 0, PHASH_FAILED
+        return int(phash, 16), PHASH_OK
+
+    def update(self, row, sha, size, mtime=0, phash=None, digests=None):
+        # in place, so row numbers (and any view built on them) stay valid
+        start = row * self.DIGEST_SIZE
+        self.digests[start:start + self.DIGEST_SIZE] = bytes.fromhex(sha) if isinstance(sha, str) else sha
+        self.sizes[row] = size
+        self.mtimes[row] = mtime
+        self.phashes[row], self.phash_state[row] = self._phash_value(phash)
+        digests = digests or {}
+        for name in digests:
+            if name not in self.extra:
+                raw = digests[name]
+                self.extra_sizes[name] = len(bytes.fromhex(raw) if isinstance(raw, str) else raw)
+                self.extra[name] = bytearray(len(self) * self.extra_sizes[name])
+        for name, column in self.extra.items():
+            width = self.extra_sizes[name]
+            value = digests.get(name)
+            raw = bytes.fromhex(value) if isinstance(value, str) else value
+            column[row * width:(row + 1) * width] = raw or bytes(width)
+
+    def remove(self, rows):
+        drop = set(rows)
+        if not drop:
+            return
+        keep = [row for row in range(len(self)) if row not in drop]
+        size = self.DIGEST_SIZE
+        self.dir_index = array('I', (self.dir_index[row] for row in keep))
+        self.names = [self.names[row] for row in keep]
+        self.digests = bytearray(b"".join(self.digests[row * size:(row + 1) * size] for row in keep))
+        self.sizes = array('q', (self.sizes[row] for row in keep))
+        self.mtimes = array('q', (self.mtimes[row] for row in keep))
+        self.phashes = array('Q', (self.phashes[row] for row in keep))
+        self.phash_state = bytearray(self.phash_state[row] for row in keep)
+        for name, column in self.extra.items():
+            width = self.extra_sizes[name]
+            self.extra[name] = bytearray(b"".join(column[row * width:(row + 1) * width] for row in keep))
+        self._row_of = None
+
+    def _add_extra(self, row, digests):
+        # one bytearray per extra algorithm; rows without that digest stay zero-filled
+        for name, value in digests.items():
+            raw = bytes.fromhex(value) if isinstance(value, str) else value
+            column = self.extra.get(name)
+            if column is None:
+                column = self.extra[name] = bytearray(row * len(raw))
+                self.extra_sizes[name] = len(raw)
+            column += raw
+        for name, column in self.extra.items():
+            missing = (row + 1) * self.extra_sizes[name] - len(column)
+            if missing > 0:
+                column += bytes(missing)
+
+    def clear(self):
+        self.__init__()
+
+    def path(self, row):
+        return self._dir_prefixes[self.dir_index[row]] + self.names[row]
+
+    def paths(self):
+        return [self.path(row) for row in range(len(self))]
+
+    def digest(self, row):
+        start = row * self.DIGEST_SIZE
+        return bytes(self.digests[start:start + self.DIGEST_SIZE])
+
+    def sha(self, row):
+        return self.digest(row).hex()
+
+    def algorithms(self):
+        return [PRIMARY_DIGEST] + list(self.extra)
+
+    def hexdigest(self, row, name):
+        if name == PRIMARY_DIGEST:
+            return self.sha(row)
+        size = self.extra_sizes[name]
+        raw = self.extra[name][row * size:(row + 1) * size]
+        return raw.hex() if any(raw) else None
+
+    def extra_digests(self, row):
+        return {name: self.hexdigest(row, name) for name in self.extra}
+
+    def phash(self, row):
+        state = self.phash_state[row]
+        if state == PHASH_OK:
+            return f"{self.phashes[row]:016x}"
+        return "-" if state == PHASH_FAILED else None
+
+    def has_phashes(self):
+        return any(self.phash_state)
+
+    def row_of(self, path):
+        # path lookups are rare (verify, watch), so the index is built lazily
+        if self._row_of is None:
+            self._row_of = {self.path(row): row for row in range(len(self))}
+        return self._row_of.get(path)
+
+    def sorted_rows(self, key="path", reverse=False):
+        rows = range(len(self))
+        if key == "size":
+            return sorted(rows, key=self.sizes.__getitem__, reverse=reverse)
+        if key == "mtime":
+            return sorted(rows, key=self.mtimes.__getitem__, reverse=reverse)
+        if key == "sha":
+            return sorted(rows, key=self.digest, reverse=reverse)
+        if key == "name":
+            return sorted(rows, key=lambda row: self.names[row].lower(), reverse=reverse)
+        # directory first, then name: groups files per folder without building every path
+        prefixes, dir_index, names = self._dir_prefixes, self.dir_index, self.names
+        return sorted(rows, key=lambda row: (prefixes[dir_index[row]], names[row]), reverse=reverse)
+
+    def filter_rows(self, text, rows=None):
+        text = text.lower()
+        rows = range(len(self)) if rows is None else rows
+        return [row for row in rows if text in self.names[row].lower()]
+
+
+class HashScheduler:
+    _DONE = object()
+
+    def __init__(self, job, workers=None, use_processes=False, max_pending=None):
+        self.job = job
+        self.use_processes = use_processes
+        if not workers:
+            cpus = os.cpu_count() or 1
+            workers = cpus if use_processes else min(32, cpus + 4)
+        self.workers = workers
+        self.max_pending = max_pending or self.workers * 4
+        self.results = queue.Queue()
+        self.cancelled = threading.Event()
+        self.finished = False
+        self._executor = None
+        self._feeder = None
+
+    def start(self, items):
+        pool_cls = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        self._executor = pool_cls(max_workers=self.workers)
+        self._feeder = threading.Thread(target=self._feed, args=(items,), daemon=True)
+        self._feeder.start()
+
+    def _feed(self, items):
+        # bounded submission so huge selections don't queue millions of futures up front
+        slots = threading.BoundedSemaphore(self.max_pending)
+        try:
+            for item in items:
+                while not slots.acquire(timeout=0.1):
+                    if self.cancelled.is_set():
+                        break
+                if self.cancelled.is_set():
+                    break
+                future = self._executor.submit(self.job, item)
+                future.add_done_callback(lambda fut, item=item: self._collect(item, fut, slots))
+        except Exception as e:
+            print(f"[!] Hash scheduler stopped: {e}")
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=self.cancelled.is_set())
+            self.results.put(self._DONE)
+
+    def _collect(self, item, future, slots):
+        slots.release()
+        if future.cancelled():
+            return
+        error = future.exception()
+        self.results.put((item, None if error else future.result(), error))
+
+    def drain(self, max_items=500):
+        batch = []
+        while len(batch) < max_items:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if result is self._DONE:
+                self.finished = True
+                break
+            batch.append(result)
+        return batch
+
+    def iter_results(self):
+        while True:
+            result = self.results.get()
+            if result is self._DONE:
+                self.finished = True
+                return
+            yield result
+
+    def wait(self):
+        if self._feeder:
+            self._feeder.join()
+
+    def cancel(self):
+        self.cancelled.set()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def is_image(path):
+    return path.lower().endswith(IMAGE_FORMATS)
+
+
+def compute_phash(source):
+    img = Image.open(source)
+    # draft() lets JPEG decode at a reduced scale; the DCT only needs 32x32 anyway
+    img.draft("L", PHASH_THUMBNAIL)
+    img.thumbnail(PHASH_THUMBNAIL)
+    return imagehash.phash(img)
+
+
+def get_image_hash(filepath):
+    try:
+        return str(compute_phash(filepath))
+    except Exception as e:
+        print(f"[!] Image hash failed: {e}")
+        return "-"
+
+
+def image_hashes(filepath, buffer_size=HASH_BUFFER_SIZE, use_mmap=False, algorithms=DEFAULT_ALGORITHMS, read_ahead=READ_AHEAD_BLOCKS):
+    if os.path.getsize(filepath) > PHASH_INLINE_LIMIT:
+        return hash_file_digests(filepath, algorithms, buffer_size, use_mmap, read_ahead), get_image_hash(filepath)
+
+    # read once, then feed the same bytes to the digests and the decoder
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    digests = {}
+    for name in algorithms:
+        h = DIGESTS[name][0]()
+        h.update(data)
+        digests[name] = h.hexdigest()
+    try:
+        with STATS.stage("cpu.phash"):
+            img_hash = str(compute_phash(io.BytesIO(data)))
+    except Exception as e:
+        print(f"[!] Image hash failed: {e}")
+        img_hash = "-"
+    return digests, img_hash
+
+
+def compare_image_hashes(f1, f2):
+    hash1 = compute_phash(f1)
+    hash2 = compute_phash(f2)
+    return hash1, hash2, abs(hash1 - hash2)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    # metric tree over Hamming distance: a query only visits children whose
+    # edge distance lies within [d - threshold, d + threshold]
+    def __init__(self):
+        self.root = None
+
+    def add(self, value, key):
+        if self.root is None:
+            self.root = (value, [key], {})
+            return
+        node = self.root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                node[1].append(key)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [key], {})
+                return
+            node = child
+
+    def search(self, value, threshold):
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node[0])
+            if distance <= threshold:
+                found.extend((key, distance) for key in node[1])
+            for edge, child in node[2].items():
+                if distance - threshold <= edge <= distance + threshold:
+                    stack.append(child)
+        return found
+
+
+def similar_pairs(values, threshold, bits=64):
+    # multi-index hashing: split each hash into threshold + 1 substrings; by the
+    # pigeonhole principle any pair within the threshold shares one of them exactly
+    chunks = threshold + 1
+    width = bits // chunks
+    if width < 4:
+        tree = BKTree()
+        for i, value in enumerate(values):
+            for j, _ in tree.search(value, threshold):
+                yield j, i
+            tree.add(value, i)
+        return
+
+    bounds = [(c * width, (bits - c * width) if c == chunks - 1 else width) for c in range(chunks)]
+    tables = [{} for _ in bounds]
+    for i, value in enumerate(values):
+        seen = set()
+        for table, (shift, size) in zip(tables, bounds):
+            bucket = table.setdefault((value >> shift) & ((1 << size) - 1), [])
+            for j in bucket:
+                if j not in seen:
+                    seen.add(j)
+                    if hamming_distance(value, values[j]) <= threshold:
+                        yield j, i
+            bucket.append(i)
+
+
+def find_similar_images(phashes, threshold=SIMILAR_THRESHOLD):
+    if not 0 <= threshold <= SIMILAR_MAX_THRESHOLD:
+        raise ValueError(f"Similarity threshold must be between 0 and {SIMILAR_MAX_THRESHOLD}, got {threshold}")
+    items = [(path, int(h, 16)) for path, h in phashes.items() if h and h != "-"]
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    bits = max((len(h) * 4 for h in phashes.values() if h and h != "-"), default=64)
+    for j, i in similar_pairs([value for _, value in items], threshold, bits):
+        parent[find(i)] = find(j)
+
+    groups = {}
+    for i, (path, value) in enumerate(items):
+        groups.setdefault(find(i), []).append((path, phashes[path]))
+    clusters = [sorted(group) for group in groups.values() if len(group) > 1]
+    clusters.sort(key=lambda group: (-len(group), group[0][0]))
+    return clusters
+
+
+def build_similar_section(clusters, threshold=SIMILAR_THRESHOLD):
+    text = f"# Similar Images\n\n**Threshold:** pHash difference <= {threshold}\n"
+    if not clusters:
+        return text + "\nNo near-duplicate images found."
+    for n, group in enumerate(clusters, 1):
+        text += f"\n## Cluster {n} ({len(group)} images)\n\n"
+        for path, img_hash in group:
+            text += f"- `{os.path.basename(path)}` — `{img_hash}`\n"
+    return text
+
+
+def is_supported(path):
+    return path.lower().endswith(SUPPORTED_FORMATS)
+
+
+def scan_folders(paths, rules=None, workers=SCAN_WORKERS, cancelled=None):
+    return Scanner(paths, rules, SUPPORTED_FORMATS, workers, cancelled)
+
+
+def collect_folder(folder, rules=None, workers=SCAN_WORKERS):
+    return scan_paths([folder], rules, SUPPORTED_FORMATS, workers)
+
+
+def expand_paths(paths, rules=None, workers=SCAN_WORKERS):
+    return scan_paths(paths, rules, SUPPORTED_FORMATS, workers)
+
+
+def format_size(size):
+    return f"{size / 1024:.2f} KB"
+
+
+def hash_scanned(item, done=None, **kwargs):
+    # done holds the rows of an interrupted job; unchanged files are taken from it
+    path, stat = item
+    if done is not None:
+        row = done.row_of(path)
+        if row is not None:
+            stat = stat or os.stat(path)
+            unchanged = done.sizes[row] == stat.st_size and done.mtimes[row] == stat.st_mtime_ns
+            if unchanged and not (kwargs.get("phash") and is_image(path) and done.phash(row) is None):
+                digests = {name: value for name, value in done.extra_digests(row).items() if value}
+                return {"sha": done.digest(row), "size": stat.st_size, "mtime": stat.st_mtime_ns,
+                        "phash": done.phash(row), "digests": digests, "cached": True, "resumed": True}
+    return hash_entry(path, stat=stat, **kwargs)
+
+
+def scan_items(paths):
+    # plain paths are stat'ed by hash_entry, (path, stat) pairs from a Scanner are not
+    for item in paths:
+        yield item if isinstance(item, tuple) else (item, None)
+
+
+def hash_paths(paths, buffer_size=HASH_BUFFER_SIZE, use_mmap=False, cache=None, force=False, workers=None, phash=False,
+                on_result=None, algorithms=DEFAULT_ALGORITHMS, done=None, journal=None, read_ahead=READ_AHEAD_BLOCKS):
+    # paths may be a list or a Scanner; the scan streams straight into the workers.
+    # With a journal every new digest is checkpointed, so the run can be resumed
+    phash_pool = ProcessPoolExecutor() if phash else None
+    if done is not None:
+        # build the path index up front, the worker threads only read it
+        done.row_of("")
+    job = functools.partial(
+        hash_scanned, done=done, buffer_size=buffer_size, use_mmap=use_mmap, cache=cache, force=force,
+        phash=phash, phash_pool=phash_pool, algorithms=algorithms, read_ahead=read_ahead
+    )
+    scheduler = HashScheduler(job, workers=workers)
+    scheduler.start(scan_items(paths))
+    results = ResultStore()
+    try:
+        for (f, _), info, error in scheduler.iter_results():
+            if error:
+                print(f"[!] Error processing {f}: {error}")
+                continue
+            row = results.add(f, info["sha"], info["size"], info["mtime"], info["phash"], info["digests"])
+            if journal and not info.get("resumed"):
+                journal.record(f, info["sha"], info["size"], info["mtime"], info["phash"], info["digests"])
+                journal.checkpoint(len(results))
+            if on_result:
+                on_result(row, results)
+    finally:
+        if not scheduler.finished:
+            # stop the workers before the caller tears down the cache they write to
+            scheduler.cancel()
+            scheduler.wait()
+        if phash_pool:
+            phash_pool.shutdown()
+    if cache:
+        cache.flush()
+    return results
+
+
+def load_config(path=CONFIG_FILE):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[!] Failed to load config: {e}")
+        return {}
+
+
+def save_config(config_data, path=CONFIG_FILE):
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(config_data, f, indent=2)
+    except Exception as e:
+        print(f"[!] Failed to save config: {e}")
+
+
+def is_valid_gpg(gpg_fp):
+    return len(gpg_fp) == 40 and all(c in "0123456789abcdefABCDEF" for c in gpg_fp)
+
+
+def build_metadata(author="", note="", gpg_fp="", merkle_root=None):
+    metadata = ""
+    if author:
+        metadata += f"**Author:** {author}\n"
+    if note:
+        metadata += f"**Notes:** {note}\n"
+    if gpg_fp:
+        metadata += f"**GPG Fingerprint:** `{gpg_fp}`\n"
+    if merkle_root:
+        metadata += f"**Merkle Root:** `{merkle_root}`\n"
+    metadata += f"**Report Time:** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+    return metadata
+
+
+def iter_sha_table(results, rows=None):
+    # extra digests go after Size so the first three columns stay parseable by verify
+    with_phash = results.has_phashes()
+    extra = list(results.extra)
+    header = ["File Name", "SHA-256", "Size"] + [digest_label(name) for name in extra]
+    if with_phash:
+        header.append("Image Hash")
+    yield "| " + " | ".join(header) + " |\n"
+    yield "|" + "|".join("-" * (len(title) + 2) for title in header) + "|\n"
+    for row in results.sorted_rows() if rows is None else rows:
+        size_kb = format_size(results.sizes[row])
+        cells = [results.names[row], f"`{results.sha(row)}`", size_kb]
+        for name in extra:
+            value = results.hexdigest(row, name)
+            cells.append(f"`{value}`" if value else "-")
+        if with_phash:
+            img_hash = results.phash(row)
+            cells.append(f"`{img_hash}`" if img_hash not in (None, "-") else "-")
+        yield "| " + " | ".join(cells) + " |\n"
+
+
+def build_sha_table(results, rows=None):
+    # rows are collected as chunks and joined once; repeated += is quadratic on big reports
+    with STATS.stage("report.table"):
+        return "".join(iter_sha_table(results, rows))
+
+
+def build_report(sha_report_text, metadata, sections=()):
+    chunks = ["# SHA-256 Hash Report\n\n", metadata, "\n\n", sha_report_text]
+    for section in sections:
+        if section:
+            chunks.append("\n\n")
+            chunks.append(section)
+    return "".join(chunks)
+
+
+def write_report(content, path, export_mode="md", pdf_fast_threshold=PDF_FAST_THRESHOLD):
+    base_filename = os.path.splitext(os.path.basename(path))[0]
+    save_dir = os.path.dirname(path)
+    written = []
+
+    if export_mode in ["md", "both"]:
+        md_path = os.path.join(save_dir, base_filename + ".md")
+        with open(md_path, 'w', encoding='utf-8-sig') as f:
+            f.write(content)
+        written.append(md_path)
+
+    if export_mode in ["pdf", "both"]:
+        pdf_path = os.path.join(save_dir, base_filename + ".pdf")
+        convert_markdown_to_pdf(content, pdf_path, pdf_fast_threshold)
+        written.append(pdf_path)
+
+    return written
+
+
+def convert_markdown_to_pdf(md_text, output_path=None, fast_threshold=PDF_FAST_THRESHOLD):
+    # WeasyPrint lays out the whole table in memory; long reports go through
+    # the direct writer, which streams one page at a time
+    if md_text.count("\n|") > fast_threshold:
+        with STATS.stage("pdf.direct"):
+            if output_path is None:
+                buf = io.BytesIO()
+                write_report_pdf(md_text, buf)
+                return buf.getvalue()
+            with open(output_path, "wb") as f:
+                write_report_pdf(md_text, f)
+            return None
+
+    with STATS.stage("pdf.weasyprint"):
+        return _weasyprint_pdf(md_text, output_path)
+
+
+def _weasyprint_pdf(md_text, output_path):
+    html = markdown2.markdown(md_text, extras=["fenced-code-blocks", "tables", "strike", "cuddled-lists"])
+
+    html_doc = f"""
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <style>
+            @page {{
+                size: A4 landscape;
+                margin: 1in;
+            }}
+            body {{
+                font-family: 'Segoe UI', sans-serif;
+                margin: 0;
+                line-height: 1.5;
+                font-size: 12px;
+            }}
+            table {{
+                border-collapse: collapse;
+                width: 100%;
+                table-layout: fixed;
+                word-wrap: break-word;
+                font-size: 10px;
+            }}
+            th, td {{
+                border: 1px solid #ccc;
+                padding: 6px;
+                text-align: left;
+                vertical-align: top;
+                word-break: break-word;
+                overflow-wrap: break-word;
+            }}
+            code {{
+                background-color: #f2f2f2;
+                padding: 2px 4px;
+                border-radius: 4px;
+                font-family: Consolas, monospace;
+                font-size: 9px;
+                word-break: break-all;
+            }}
+            pre code {{
+                background-color: #f6f6f6;
+                display: block;
+                padding: 1em;
+                overflow-x: auto;
+                white-space: pre-wrap;
+                word-break: break-word;
+            }}
+            h1, h2, h3 {{
+                margin-top: 1em;
+                margin-bottom: 0.5em;
+            }}
+        </style>
+    </head>
+    <body>{html}</body>
+    </html>
+    """
+
+    return weasyprint.HTML(string=html_doc).write_pdf(output_path)
+
+
+class HashingWriter:
+    # write-only, non-seekable wrapper: zipfile falls back to data descriptors
+    # instead of seeking back, so every byte is hashed exactly once on its way out
+    def __init__(self, fileobj):
+        self._f = fileobj
+        self._pos = 0
+        self.sha = hashlib.sha256()
+
+    def write(self, data):
+        self._f.write(data)
+        self.sha.update(data)
+        size = len(data) if not isinstance(data, memoryview) else data.nbytes
+        self._pos += size
+        return size
+
+    def tell(self):
+        return self._pos
+
+    def flush(self):
+        self._f.flush()
+
+    def hexdigest(self):
+        return self.sha.hexdigest()
+
+
+def zip_compression_for(path, mode="auto"):
+    if mode == "auto":
+        return zipfile.ZIP_STORED if path.lower().endswith(COMPRESSED_FORMATS) else zipfile.ZIP_DEFLATED
+    return ZIP_COMPRESSION.get(mode, zipfile.ZIP_STORED)
+
+
+def build_sha256sums(results):
+    return "".join(f"{results.sha(row)}  {results.names[row]}\n" for row in results.sorted_rows())
+
+
+def create_zip(zip_path, file_paths, content, export_mode="md", results=None, compression="auto", pdf_fast_threshold=PDF_FAST_THRESHOLD):
+    with open(zip_path, 'wb') as raw:
+        writer = HashingWriter(raw)
+        with zipfile.ZipFile(writer, 'w') as zipf:
+            with STATS.stage("zip.files"):
+                for path in file_paths:
+                    zipf.write(path, os.path.basename(path), compress_type=zip_compression_for(path, compression))
+            STATS.count("zip.members", len(file_paths))
+            text_mode = zipfile.ZIP_DEFLATED if compression == "auto" else zip_compression_for("", compression)
+            if results:
+                zipf.writestr("SHA256SUMS", build_sha256sums(results), compress_type=text_mode)
+            if export_mode in ["md", "both"]:
+                zipf.writestr("sha_report.md", content.encode("utf-8-sig"), compress_type=text_mode)
+            if export_mode in ["pdf", "both"]:
+                zipf.writestr("sha_report.pdf", convert_markdown_to_pdf(content, None, pdf_fast_threshold), compress_type=zip_compression_for("x.pdf", compression))
+    zip_hash = writer.hexdigest()
+    STATS.count("zip.bytes", writer.tell())
+
+    try:
+        sha256_path = zip_path + ".sha256"
+        with open(sha256_path, "w", encoding="utf-8") as sha_file:
+            sha_file.write(f"{zip_hash}  {os.path.basename(zip_path)}\n")
+    except Exception as e:
+        print(f"[!] Failed to write SHA256 file: {e}")
+    return zip_hash
+
+
+def compare_files(f1, f2, buffer_size=HASH_BUFFER_SIZE, use_mmap=False, algorithms=DEFAULT_ALGORITHMS):
+    # returns {algorithm: hex} per file, one read pass each
+    hash1 = hash_file_digests(f1, algorithms, buffer_size, use_mmap)
+    hash2 = hash_file_digests(f2, algorithms, buffer_size, use_mmap)
+    result = "✅ Files are IDENTICAL." if hash1 == hash2 else "❌ Files are DIFFERENT."
+    lines = ["# File Comparison\n\n"]
+    for label, path, digests in (("File A", f1, hash1), ("File B", f2, hash2)):
+        lines.append(f"- {label}: `{os.path.basename(path)}`\n")
+        lines.extend(f"  - {digest_label(name)}: `{value}`\n" for name, value in digests.items())
+    lines.append(f"\n**Result:** {result}")
+    return hash1, hash2, result, "".join(lines)
+
+
+def open_folder(folder):
+    try:
+        if os.name == 'nt':
+            os.startfile(folder)
+        elif os.name == 'posix':
+            import subprocess
+            subprocess.run(['xdg-open', folder])
+    except Exception as e:
+        print(f"[!] Folder open error: {e}")
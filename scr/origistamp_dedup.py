@@ -0,0 +1,197 @@
+import os, hashlib, functools
+
+from origistamp_core import HASH_BUFFER_SIZE, HashScheduler, hash_file, scan_items, format_size
+
+# first and last block of every size collision are compared before any full read
+EDGE_BLOCK_SIZE = 64 * 1024
+
+
+class DuplicateResult:
+    def __init__(self):
+        self.groups = []
+        self.errors = []
+        self.files = 0
+        self.total_bytes = 0
+        self.bytes_read = 0
+        self.size_candidates = 0
+        self.edge_candidates = 0
+        self.full_hashed = 0
+
+    @property
+    def redundant_files(self):
+        return sum(len(paths) - 1 for _, _, paths in self.groups)
+
+    @property
+    def redundant_bytes(self):
+        return sum(size * (len(paths) - 1) for _, size, paths in self.groups)
+
+
+def edge_hash(path, size, block_size=EDGE_BLOCK_SIZE):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb", buffering=0) as f:
+        h.update(f.read(block_size))
+        f.seek(size - block_size)
+        h.update(f.read(block_size))
+    return h.digest()
+
+
+def _edge_job(item, block_size, buffer_size):
+    path, size = item
+    # small files are read whole either way, so they get their final digest right away
+    if size <= 2 * block_size:
+        return True, hash_file(path, buffer_size)
+    return False, edge_hash(path, size, block_size)
+
+
+def _full_job(item, buffer_size):
+    return hash_file(item[0], buffer_size)
+
+
+def _run(job, items, workers, cancelled, result):
+    scheduler = HashScheduler(job, workers=workers)
+    scheduler.start(items)
+    try:
+        for item, value, error in scheduler.iter_results():
+            if cancelled is not None and cancelled.is_set():
+                scheduler.cancel()
+            if error:
+                result.errors.append((item[0], str(error)))
+                continue
+            yield item, value
+    finally:
+        if not scheduler.finished:
+            scheduler.cancel()
+            scheduler.wait()
+
+
+def _group(items):
+    groups = {}
+    for key, path in items:
+        groups.setdefault(key, []).append(path)
+    return groups
+
+
+def find_duplicates(paths, buffer_size=HASH_BUFFER_SIZE, workers=None, block_size=EDGE_BLOCK_SIZE,
+                    cache=None, include_empty=False, cancelled=None):
+    """Group identical files while reading as little as possible.
+
+    Sizes come from the scan, so files with a unique size are never opened.
+    Size collisions are narrowed down by hashing the first and last block,
+    and only files that still collide are read in full. Cached SHA-256 values
+    are used as-is, and every full digest computed here is cached.
+    """
+    result = DuplicateResult()
+    by_size = {}
+    for path, stat in scan_items(paths):
+        try:
+            stat = stat or os.stat(path)
+        except OSError as e:
+            result.errors.append((path, str(e)))
+            continue
+        result.files += 1
+        result.total_bytes += stat.st_size
+        if stat.st_size or include_empty:
+            by_size.setdefault(stat.st_size, []).append((path, stat))
+
+    full = []
+    edge_items = []
+    to_hash = []
+    stats = {}
+    for size, entries in by_size.items():
+        if len(entries) < 2:
+            continue
+        result.size_candidates += len(entries)
+        uncached = []
+        for path, stat in entries:
+            cached = cache.get(path, stat) if cache else None
+            if cached:
+                full.append(((size, cached["sha"]), path))
+            elif size == 0:
+                full.append(((0, hashlib.sha256().hexdigest()), path))
+            else:
+                stats[path] = stat
+                uncached.append((path, size))
+        if len(uncached) < len(entries):
+            # a cached digest can only be matched by a full hash, the edge stage would
+            # drop an uncached file that has no uncached partner of the same size
+            to_hash.extend(uncached)
+        else:
+            edge_items.extend(uncached)
+
+    edge = []
+    job = functools.partial(_edge_job, block_size=block_size, buffer_size=buffer_size)
+    for (path, size), (final, digest) in _run(job, edge_items, workers, cancelled, result):
+        result.bytes_read += min(size, 2 * block_size)
+        if final:
+            full.append(((size, digest), path))
+            if cache:
+                cache.put(path, stats[path], digest)
+        else:
+            edge.append(((size, digest), path))
+
+    for (size, _), group in _group(edge).items():
+        if len(group) > 1:
+            result.edge_candidates += len(group)
+            to_hash.extend((path, size) for path in group)
+
+    job = functools.partial(_full_job, buffer_size=buffer_size)
+    for (path, size), sha in _run(job, to_hash, workers, cancelled, result):
+        result.bytes_read += size
+        result.full_hashed += 1
+        full.append(((size, sha), path))
+        if cache:
+            cache.put(path, stats[path], sha)
+    if cache:
+        cache.flush()
+
+    for (size, sha), group in _group(full).items():
+        if len(group) > 1:
+            result.groups.append((sha, size, sorted(group)))
+    result.groups.sort(key=lambda g: (-g[1] * (len(g[2]) - 1), g[2][0]))
+    return result
+
+
+def duplicates_from_results(results):
+    # a fully hashed set already has every digest: grouping costs no I/O at all
+    dup = DuplicateResult()
+    dup.files = len(results)
+    groups = {}
+    for row in range(len(results)):
+        dup.total_bytes += results.sizes[row]
+        if results.sizes[row]:
+            groups.setdefault(results.digest(row), []).append(row)
+    for digest, rows in groups.items():
+        if len(rows) > 1:
+            size = results.sizes[rows[0]]
+            dup.groups.append((digest.hex(), size, sorted(results.path(row) for row in rows)))
+    dup.groups.sort(key=lambda g: (-g[1] * (len(g[2]) - 1), g[2][0]))
+    return dup
+
+
+def build_duplicates_section(result, base=None):
+    def show(path):
+        return os.path.relpath(path, base).replace("\\", "/") if base else path
+
+    lines = ["# Duplicate Files\n\n"]
+    lines.append(f"- Files scanned: {result.files} ({format_size(result.total_bytes)})\n")
+    lines.append(f"- Duplicate groups: {len(result.groups)}\n")
+    lines.append(f"- Redundant copies: {result.redundant_files} ({format_size(result.redundant_bytes)})\n")
+    if result.total_bytes and (result.size_candidates or result.bytes_read):
+        share = 100 * result.bytes_read / result.total_bytes
+        lines.append(
+            f"- Read: {format_size(result.bytes_read)} ({share:.1f}% of the set); "
+            f"{result.size_candidates} size match(es), {result.edge_candidates} edge match(es), "
+            f"{result.full_hashed} full hash(es)\n"
+        )
+    if result.errors:
+        lines.append(f"- Errors: {len(result.errors)}\n")
+
+    if not result.groups:
+        lines.append("\nNo duplicate files found.")
+        return "".join(lines)
+
+    for n, (sha, size, paths) in enumerate(result.groups, 1):
+        lines.append(f"\n## Group {n} ({len(paths)} files, {format_size(size)} each)\n\n")
+        lines.append(f"SHA-256: `{sha}`\n\n")
+        lines.extend(f"- `{show(path)}`\n" for path in paths)
+    return "".join(lines)
@@ -1,32 +1,97 @@
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-import hashlib, os, pyperclip, datetime, zipfile
-from PIL import Image
-import imagehash
-import json
+from tkinter import filedialog, messagebox, simpledialog, ttk
+import os, pyperclip, datetime, functools, threading, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import webbrowser
-import markdown2
-from weasyprint import HTML
-
-SUPPORTED_FORMATS = (
-    '.txt', '.md', '.pdf', '.docx', '.odt', '.rtf',
-    '.json', '.csv', '.xml', '.yaml', '.yml', '.ini',
-    '.py', '.js', '.html', '.css', '.java', '.c', '.cpp', '.sh', '.bat', '.ts',
-    '.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp', '.tiff', '.ico', '.psd',
-    '.exe', '.msi', '.dll', '.so', '.app', '.dmg', '.deb', '.rpm'
+
+from origistamp_core import (
+    HASH_BUFFER_SIZE, CACHE_MAX_ENTRIES, SIMILAR_THRESHOLD, PDF_FAST_THRESHOLD, READ_AHEAD_BLOCKS,
+    HashScheduler, ResultStore, hash_scanned, scan_folders, ScanRules, SCAN_WORKERS, format_size, open_cache,
+    load_config, save_config, is_valid_gpg, build_metadata, build_sha_table, build_report,
+    write_report, create_zip, compare_files, compare_image_hashes, open_folder,
+    find_similar_images, build_similar_section,
+    STATS, DIGESTS, DEFAULT_ALGORITHMS, PRIMARY_DIGEST, available_digests, digest_label, normalize_algorithms
+)
+from origistamp_merkle import MerkleTree, save_proof
+from origistamp_dedup import find_duplicates, duplicates_from_results, build_duplicates_section
+from origistamp_jobs import JobJournal, job_header, new_job_path, list_jobs, load_job, jobs_dir, JOB_EXTENSION
+from origistamp_compare import compare_folders, compare_manifest
+from origistamp_watch import (
+    WATCH_DEBOUNCE, WATCH_POLL_INTERVAL, FolderWatcher, known_state, apply_removals, apply_result, merkle_changes
+)
+from origistamp_manifest import (
+    MANIFEST_EXTENSIONS, ManifestWriter, load_manifest, verify_folder, build_verify_section, write_manifest, common_base
 )
 
-CONFIG_FILE = "config.json"
 
-def get_image_hash(filepath):
-    try:
-        img = Image.open(filepath)
-        phash = imagehash.phash(img)
-        return str(phash)
-    except Exception as e:
-        print(f"[!] Image hash failed: {e}")
-        return "-"
+INFLIGHT_CHOICES = ["auto", "1", "2", "4", "8", "16", "32", "64"]
+
+
+class VirtualTable:
+    # Treeview that only holds the visible window of rows; the rest are
+    # fetched from the backing store via row_values(index) while scrolling
+    def __init__(self, parent, columns, row_count, row_values, height=10):
+        self.row_count = row_count
+        self.row_values = row_values
+        self.height = height
+        self.offset = 0
+
+        container = ctk.CTkFrame(parent, fg_color="transparent")
+        container.pack(fill="both", pady=10)
+        self.tree = ttk.Treeview(container, columns=columns, show="headings", height=height)
+        self.scrollbar = ttk.Scrollbar(container, orient="vertical", command=self.on_scrollbar)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.items = [self.tree.insert('', 'end', values=()) for _ in range(height)]
+        for item in self.items:
+            self.tree.detach(item)
+
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1))
+        self.render()
+
+    def max_offset(self):
+        return max(0, self.row_count() - self.height)
+
+    def on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.offset = int(float(args[0]) * self.row_count())
+        elif action == "scroll":
+            step = int(args[0]) * (self.height if args[1] == "pages" else 1)
+            self.offset += step
+        self.render()
+
+    def scroll(self, rows):
+        self.offset += rows * 3
+        self.render()
+        return "break"
+
+    def render(self):
+        total = self.row_count()
+        self.offset = min(max(0, self.offset), self.max_offset())
+        for slot, item in enumerate(self.items):
+            index = self.offset + slot
+            if index < total:
+                self.tree.item(item, values=self.row_values(index))
+                self.tree.reattach(item, '', slot)
+            else:
+                self.tree.detach(item)
+
+        if total <= self.height:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.height) / total)
+
+    def refresh(self):
+        # only the visible slots are touched, so this is cheap per poll tick
+        self.render()
+
+    def clear(self):
+        self.offset = 0
+        self.render()
 
 
 class DocHashApp:
@@ -38,13 +103,47 @@ class DocHashApp:
         ctk.set_default_color_theme("blue")
 
         self.file_paths = []
-        self.hash_results = {}
+        self.source_folder = None
+        self.merkle = None
+        self.hash_results = ResultStore()
+        self.view_rows = None
+        self.sort_key = None
+        self.filter_var = tk.StringVar(value="")
         self.sha_report_text = ""
         self.comparison_result_text = ""
+        self.similar_result_text = ""
+        self.duplicate_result_text = ""
+        self.similar_threshold = SIMILAR_THRESHOLD
+        self.pdf_fast_threshold = PDF_FAST_THRESHOLD
+        self.stats_file = ""
         self.open_folder_var = tk.BooleanVar(value=False)
+        self.hash_buffer_size = HASH_BUFFER_SIZE
+        self.use_mmap = False
+        self.hash_workers = 0
+        self.read_ahead = READ_AHEAD_BLOCKS
+        self.use_processes = False
+        self.hash_algorithms = DEFAULT_ALGORITHMS
+        self.scan_workers = SCAN_WORKERS
+        self.scan_exclude = []
+        self.scan_include = []
+        self.scan_default_excludes = True
+        self.scanner = None
+        self.scheduler = None
+        self.job = None
+        self.watch_roots = []
+        self.watcher = None
+        self.watch_scheduler = None
+        self.watch_manifest = None
+        self.watch_debounce = WATCH_DEBOUNCE
+        self.watch_poll_interval = WATCH_POLL_INTERVAL
+        self.cpu_pool = None
+        self.cache = None
+        self.cache_max_entries = CACHE_MAX_ENTRIES
+        self.force_rehash_var = tk.BooleanVar(value=False)
 
         self.build_ui()
         self.load_config()
+        self.cache = open_cache(self.cache_max_entries)
 
     def build_ui(self):
         donate_frame = ctk.CTkFrame(self.root)
@@ -76,10 +175,23 @@ class DocHashApp:
         self.gpg_entry.pack(fill="x", padx=10, pady=(2, 10))
 
 
-        self.progress = ctk.CTkProgressBar(frame)
-        self.progress.pack(fill="x", pady=10)
+        progress_row = ctk.CTkFrame(frame, fg_color="transparent")
+        progress_row.pack(fill="x", pady=10)
+
+        self.progress = ctk.CTkProgressBar(progress_row)
+        self.progress.pack(side="left", fill="x", expand=True)
         self.progress.set(0)
 
+        # files read in flight = hashing workers; raise it for NFS/SMB shares and spinning disks
+        ctk.CTkLabel(progress_row, text="In-flight reads:").pack(side="left", padx=(10, 0))
+        self.inflight_var = tk.StringVar(value="auto")
+        ctk.CTkOptionMenu(
+            progress_row, variable=self.inflight_var, values=INFLIGHT_CHOICES, width=70, command=self.set_inflight
+        ).pack(side="left", padx=(5, 0))
+
+        self.cancel_button = ctk.CTkButton(progress_row, text="✖ Cancel", width=80, command=self.cancel_hashing, state="disabled")
+        self.cancel_button.pack(side="left", padx=(10, 0))
+
         btns = ctk.CTkFrame(frame)
         btns.pack(fill="x", pady=5)
 
@@ -87,16 +199,35 @@ class DocHashApp:
         ctk.CTkButton(btns, text="\U0001f4c2 Select Folder", command=self.select_folder).pack(side="left", padx=5)
         ctk.CTkButton(btns, text="\U0001f50d Compare Two Files", command=self.compare_files_popup).pack(side="left", padx=5)
         ctk.CTkButton(btns, text="\U0001f5bc Compare Two Images", command=self.compare_images_popup).pack(side="left", padx=5)
+        ctk.CTkButton(btns, text="\U0001f5c2 Compare Folders", command=self.compare_folders_popup).pack(side="left", padx=5)
+
+        tools = ctk.CTkFrame(frame)
+        tools.pack(fill="x", pady=5)
+
+        ctk.CTkButton(tools, text="✔ Verify Against Report", command=self.verify_popup).pack(side="left", padx=5)
+        ctk.CTkButton(tools, text="\U0001f333 Export Inclusion Proof", command=self.export_proof).pack(side="left", padx=5)
+        self.digest_button = ctk.CTkButton(tools, text=self.digest_button_text(), command=self.digests_popup)
+        self.digest_button.pack(side="left", padx=5)
+        ctk.CTkButton(tools, text="⏯ Resume Job", command=self.resume_job_popup).pack(side="left", padx=5)
+        self.watch_button = ctk.CTkButton(tools, text="\U0001f441 Watch", command=self.toggle_watch)
+        self.watch_button.pack(side="left", padx=5)
+
+        filter_entry = ctk.CTkEntry(frame, textvariable=self.filter_var, placeholder_text="\U0001f50e Filter by file name")
+        filter_entry.pack(fill="x", padx=10, pady=(5, 0))
+        filter_entry.bind("<KeyRelease>", lambda e: self.apply_view())
+
+        self.table = VirtualTable(
+            frame, ("filename", "sha256", "size", "created", "modified", "img_hash"),
+            self.table_row_count, self.table_row, height=10
+        )
+        self.tree = self.table.tree
 
-        self.tree = ttk.Treeview(frame, columns=("filename", "sha256", "size", "created", "modified", "img_hash"), show="headings", height=10)
-
-        self.tree.heading("filename", text="File Name")
-        self.tree.heading("sha256", text="SHA-256")
-        self.tree.heading("size", text="Size")
+        self.tree.heading("filename", text="File Name", command=lambda: self.sort_table("name"))
+        self.tree.heading("sha256", text="SHA-256", command=lambda: self.sort_table("sha"))
+        self.tree.heading("size", text="Size", command=lambda: self.sort_table("size"))
+        self.tree.heading("modified", text="Modified", command=lambda: self.sort_table("mtime"))
         self.tree.heading("img_hash", text="Image Hash")
 
-        self.tree.pack(fill="both", pady=10)
-
         option_row = ctk.CTkFrame(frame)
         option_row.pack(fill="x", padx=10, pady=(5, 10))
 
@@ -104,6 +235,9 @@ class DocHashApp:
         option_row, text="Open folder after saving report", variable=self.open_folder_var)
         checkbox_open_folder.pack(side="left", padx=5)
 
+        checkbox_force = ctk.CTkCheckBox(option_row, text="Force full re-verify", variable=self.force_rehash_var)
+        checkbox_force.pack(side="left", padx=5)
+
         format_frame = ctk.CTkFrame(option_row, fg_color="transparent") 
         format_frame.pack(side="right", padx=5)
 
@@ -112,107 +246,135 @@ class DocHashApp:
         format_menu = ctk.CTkOptionMenu(format_frame, variable=self.export_format_var, values=["md", "pdf", "both"])
         format_menu.pack(side="left", padx=(0, 5))
 
+        ctk.CTkLabel(format_frame, text="ZIP:").pack(side="left", padx=(5, 5))
+        self.zip_compression_var = tk.StringVar(value="auto")
+        compression_menu = ctk.CTkOptionMenu(format_frame, variable=self.zip_compression_var, values=["auto", "stored", "deflate", "lzma"], width=90)
+        compression_menu.pack(side="left", padx=(0, 5))
+
+        ctk.CTkLabel(format_frame, text="Manifest:").pack(side="left", padx=(5, 5))
+        self.manifest_format_var = tk.StringVar(value="none")
+        manifest_menu = ctk.CTkOptionMenu(format_frame, variable=self.manifest_format_var, values=["none", "jsonl", "sha256sums", "bin"], width=110)
+        manifest_menu.pack(side="left", padx=(0, 5))
+
         btn_frame = ctk.CTkFrame(frame)
         btn_frame.pack(pady=10)
 
         ctk.CTkButton(btn_frame, text="\U0001f4cb Copy SHA Report", command=self.copy_sha_report).pack(side="left", padx=5)
         ctk.CTkButton(btn_frame, text="\U0001f4be Save Report", command=self.save_report).pack(side="left", padx=5)
         ctk.CTkButton(btn_frame, text="\U0001f4e6 Create ZIP", command=self.create_zip).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="\U0001f9e9 Find Similar Images", command=self.find_similar_popup).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="\U0001f9ec Find Duplicates", command=self.find_duplicates_popup).pack(side="left", padx=5)
 
     def open_url(self, url):
         webbrowser.open(url)  
         
     def load_config(self):
-        if not os.path.exists(CONFIG_FILE):
+        config = load_config()
+        if not config:
             return
         try:
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                config = json.load(f)
-
             self.author_entry.insert(0, config.get("author", ""))
             self.note_entry.insert(0, config.get("note", ""))
             self.gpg_entry.insert(0, config.get("gpg", ""))
 
             self.open_folder_var.set(config.get("open_folder", False))
             self.export_format_var.set(config.get("export_format", "md"))
+            self.zip_compression_var.set(config.get("zip_compression", "auto"))
+            self.manifest_format_var.set(config.get("manifest_format", "none"))
+            self.hash_buffer_size = max(4, int(config.get("hash_buffer_kb", HASH_BUFFER_SIZE // 1024))) * 1024
+            self.use_mmap = bool(config.get("use_mmap", False))
+            self.hash_workers = int(config.get("hash_workers", 0))
+            self.inflight_var.set(str(self.hash_workers) if self.hash_workers else "auto")
+            self.read_ahead = int(config.get("read_ahead_blocks", READ_AHEAD_BLOCKS))
+            self.use_processes = bool(config.get("use_processes", False))
+            try:
+                self.hash_algorithms = normalize_algorithms(config.get("hash_algorithms", []))
+            except ValueError as e:
+                print(f"[!] Ignoring hash_algorithms: {e}")
+            self.digest_button.configure(text=self.digest_button_text())
+            self.scan_workers = int(config.get("scan_workers", SCAN_WORKERS))
+            self.scan_exclude = list(config.get("scan_exclude", []))
+            self.scan_include = list(config.get("scan_include", []))
+            self.scan_default_excludes = bool(config.get("scan_default_excludes", True))
+            self.cache_max_entries = int(config.get("cache_max_entries", CACHE_MAX_ENTRIES))
+            self.similar_threshold = int(config.get("similar_threshold", SIMILAR_THRESHOLD))
+            self.pdf_fast_threshold = int(config.get("pdf_fast_threshold", PDF_FAST_THRESHOLD))
+            self.stats_file = config.get("stats_file", "")
+            self.watch_debounce = float(config.get("watch_debounce", WATCH_DEBOUNCE))
+            self.watch_poll_interval = float(config.get("watch_poll_interval", WATCH_POLL_INTERVAL))
+            if config.get("instrumentation", False):
+                STATS.enable()
 
         except Exception as e:
             print(f"[!] Failed to load config: {e}")
 
     def save_config(self):
-        config_data = {
+        save_config({
             "open_folder": self.open_folder_var.get(),
             "author": self.author_entry.get().strip(),
             "note": self.note_entry.get().strip(),
             "gpg": self.gpg_entry.get().strip(),
-            "export_format": self.export_format_var.get()
-        }
-        try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, indent=2)
-        except Exception as e:
-            print(f"[!] Failed to save config: {e}")
-    
-    def convert_markdown_to_pdf(self, md_text, output_path):
-        html = markdown2.markdown(md_text, extras=["fenced-code-blocks", "tables", "strike", "cuddled-lists"])
-
-        html_doc = f"""
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                @page {{
-                    size: A4 landscape;
-                    margin: 1in;
-                }}
-                body {{
-                    font-family: 'Segoe UI', sans-serif;
-                    margin: 0;
-                    line-height: 1.5;
-                    font-size: 12px;
-                }}
-                table {{
-                    border-collapse: collapse;
-                    width: 100%;
-                    table-layout: fixed;
-                    word-wrap: break-word;
-                    font-size: 10px;
-                }}
-                th, td {{
-                    border: 1px solid #ccc;
-                    padding: 6px;
-                    text-align: left;
-                    vertical-align: top;
-                    word-break: break-word;
-                    overflow-wrap: break-word;
-                }}
-                code {{
-                    background-color: #f2f2f2;
-                    padding: 2px 4px;
-                    border-radius: 4px;
-                    font-family: Consolas, monospace;
-                    font-size: 9px;
-                    word-break: break-all;
-                }}
-                pre code {{
-                    background-color: #f6f6f6;
-                    display: block;
-                    padding: 1em;
-                    overflow-x: auto;
-                    white-space: pre-wrap;
-                    word-break: break-word;
-                }}
-                h1, h2, h3 {{
-                    margin-top: 1em;
-                    margin-bottom: 0.5em;
-                }}
-            </style>
-        </head>
-        <body>{html}</body>
-        </html>
-        """
-
-        HTML(string=html_doc).write_pdf(output_path)
+            "export_format": self.export_format_var.get(),
+            "zip_compression": self.zip_compression_var.get(),
+            "manifest_format": self.manifest_format_var.get(),
+            "hash_buffer_kb": self.hash_buffer_size // 1024,
+            "use_mmap": self.use_mmap,
+            "hash_workers": self.hash_workers,
+            "read_ahead_blocks": self.read_ahead,
+            "use_processes": self.use_processes,
+            "hash_algorithms": list(self.hash_algorithms),
+            "scan_workers": self.scan_workers,
+            "scan_exclude": self.scan_exclude,
+            "scan_include": self.scan_include,
+            "scan_default_excludes": self.scan_default_excludes,
+            "cache_max_entries": self.cache_max_entries,
+            "similar_threshold": self.similar_threshold,
+            "pdf_fast_threshold": self.pdf_fast_threshold,
+            "instrumentation": STATS.enabled,
+            "stats_file": self.stats_file,
+            "watch_debounce": self.watch_debounce,
+            "watch_poll_interval": self.watch_poll_interval
+        })
+
+    def close(self):
+        if STATS.enabled and self.stats_file:
+            try:
+                STATS.dump(self.stats_file)
+            except Exception as e:
+                print(f"[!] Failed to write stats: {e}")
+        if self.scheduler:
+            self.scheduler.cancel()
+        if self.job:
+            self.close_job()
+        self.stop_watch()
+        if self.cpu_pool:
+            self.cpu_pool.shutdown(wait=False, cancel_futures=True)
+        if self.cache:
+            try:
+                self.cache.close()
+            except Exception as e:
+                print(f"[!] Failed to close hash cache: {e}")
+
+    def manifest_base(self):
+        return os.path.abspath(self.source_folder) if self.source_folder else common_base(self.file_paths)
+
+    def report_metadata(self):
+        author = self.author_entry.get().strip()
+        note = self.note_entry.get().strip()
+        gpg_fp = self.gpg_entry.get().strip()
+        if gpg_fp and not is_valid_gpg(gpg_fp):
+            messagebox.showerror("Invalid GPG Fingerprint", "GPG fingerprint must be exactly 40 hexadecimal characters.")
+            return None
+        return build_metadata(author, note, gpg_fp, self.merkle.root if self.merkle else None)
+
+    def report_content(self):
+        metadata = self.report_metadata()
+        if metadata is None:
+            return None
+        return build_report(
+            self.sha_report_text, metadata,
+            [self.comparison_result_text, self.similar_result_text, self.duplicate_result_text]
+        )
 
     def compare_images_popup(self):
         f1 = filedialog.askopenfilename(title="Select First Image", filetypes=[("Image Files", "*.png;*.jpg;*.jpeg;*.bmp;*.gif;*.webp;*.tiff")])
@@ -223,10 +385,8 @@ class DocHashApp:
             return
 
         try:
-            hash1 = imagehash.phash(Image.open(f1))
-            hash2 = imagehash.phash(Image.open(f2))
-            diff = abs(hash1 - hash2)
-            result = f"❗ pHash difference: {diff} — {'Highly Similar' if diff <= 5 else 'Different'}"
+            hash1, hash2, diff = compare_image_hashes(f1, f2)
+            result = f"❗ pHash difference: {diff} — {'Highly Similar' if diff <= self.similar_threshold else 'Different'}"
         except Exception as e:
             messagebox.showerror("Error", f"Image hash failed: {e}")
             return
@@ -246,96 +406,474 @@ class DocHashApp:
         ctk.CTkButton(popup, text="\U0001f4cb Copy Result", command=copy_result).pack(pady=10)
 
 
+    def digest_button_text(self):
+        return "\U0001f510 Digests: " + ", ".join(digest_label(name) for name in self.hash_algorithms)
+
+    def digests_popup(self):
+        popup = tk.Toplevel(self.root)
+        popup.title("Digest Algorithms")
+        popup.geometry("360x260")
+
+        tk.Label(popup, text="Extra digests are computed in the same read pass as SHA-256.", wraplength=340).pack(padx=10, pady=(10, 5))
+        available = available_digests()
+        choices = {}
+        for name in DIGESTS:
+            var = tk.BooleanVar(value=name in self.hash_algorithms)
+            label = digest_label(name) if name in available else f"{digest_label(name)} (not installed)"
+            box = ctk.CTkCheckBox(popup, text=label, variable=var)
+            if name == PRIMARY_DIGEST or name not in available:
+                box.configure(state="disabled")
+            box.pack(anchor="w", padx=20, pady=2)
+            choices[name] = var
+
+        def apply():
+            self.hash_algorithms = normalize_algorithms([name for name, var in choices.items() if var.get()])
+            self.digest_button.configure(text=self.digest_button_text())
+            popup.destroy()
+
+        ctk.CTkButton(popup, text="OK", command=apply).pack(pady=10)
+
+    def find_similar_popup(self):
+        store = self.hash_results
+        phashes = {store.path(row): store.phash(row) for row in range(len(store)) if store.phash(row)}
+        if not phashes:
+            messagebox.showinfo("No Images", "Load a folder containing images first.")
+            return
+
+        threshold = simpledialog.askinteger(
+            "Find Similar Images", "Maximum pHash difference:",
+            initialvalue=self.similar_threshold, minvalue=0, maxvalue=64, parent=self.root
+        )
+        if threshold is None:
+            return
+        self.similar_threshold = threshold
+
+        clusters = find_similar_images(phashes, threshold)
+        self.similar_result_text = build_similar_section(clusters, threshold)
+        self.label_status.configure(text=f"\U0001f9e9 {len(clusters)} similar image cluster(s) found in {len(phashes)} image(s).")
+
+        popup = tk.Toplevel(self.root)
+        popup.title("Similar Images")
+        popup.geometry("700x400")
+
+        text = tk.Text(popup, wrap="word")
+        text.insert("1.0", self.similar_result_text)
+        text.configure(state="disabled")
+        text.pack(fill="both", expand=True, padx=10, pady=5)
+
+        def copy_result():
+            pyperclip.copy(self.similar_result_text)
+            messagebox.showinfo("Copied", "Similar image clusters copied to clipboard.")
+
+        ctk.CTkButton(popup, text="\U0001f4cb Copy Result", command=copy_result).pack(pady=10)
+
+    def find_duplicates_popup(self):
+        if self.scheduler:
+            messagebox.showwarning("Busy", "Wait for the current job to finish or cancel it.")
+            return
+        if len(self.hash_results):
+            # the loaded set is fully hashed already, grouping needs no reads
+            self.show_duplicates(duplicates_from_results(self.hash_results), self.manifest_base())
+            return
+
+        folder = filedialog.askdirectory(title="Select Folder to Scan for Duplicates")
+        if not folder:
+            return
+
+        job = {"result": None, "error": None}
+        cancelled = threading.Event()
+        scanner = scan_folders([folder], self.scan_rules(), self.scan_workers, cancelled)
+
+        def run():
+            try:
+                job["result"] = find_duplicates(
+                    scanner, self.hash_buffer_size, self.hash_workers or None, cache=self.cache, cancelled=cancelled
+                )
+            except Exception as e:
+                job["error"] = e
+
+        self.label_status.configure(text="\U0001f4ac Looking for duplicates...")
+        self.progress.set(0)
+        threading.Thread(target=run, daemon=True).start()
+        self.root.after(100, self.poll_duplicates, job, scanner, folder)
+
+    def poll_duplicates(self, job, scanner, folder):
+        if job["result"] is None and job["error"] is None:
+            stage = "Scanning" if not scanner.done else "Comparing candidates"
+            self.label_status.configure(text=f"\U0001f4ac {stage}... {len(scanner.paths)} file(s)")
+            self.root.after(100, self.poll_duplicates, job, scanner, folder)
+            return
+
+        self.progress.set(1)
+        if job["error"]:
+            self.label_status.configure(text=f"❌ Duplicate search failed: {job['error']}")
+            return
+        self.show_duplicates(job["result"], folder)
+
+    def show_duplicates(self, result, base):
+        self.duplicate_result_text = build_duplicates_section(result, base)
+        self.label_status.configure(
+            text=f"\U0001f9ec {len(result.groups)} duplicate group(s), {result.redundant_files} redundant file(s) "
+                 f"({format_size(result.redundant_bytes)})."
+        )
+
+        popup = tk.Toplevel(self.root)
+        popup.title("Duplicate Files")
+        popup.geometry("700x400")
+
+        text = tk.Text(popup, wrap="word")
+        text.insert("1.0", self.duplicate_result_text)
+        text.configure(state="disabled")
+        text.pack(fill="both", expand=True, padx=10, pady=5)
+
+        def copy_result():
+            pyperclip.copy(self.duplicate_result_text)
+            messagebox.showinfo("Copied", "Duplicate groups copied to clipboard.")
+
+        ctk.CTkButton(popup, text="\U0001f4cb Copy Result", command=copy_result).pack(pady=10)
+
     def select_files(self):
         selected = filedialog.askopenfilenames(title="Select Documents", filetypes=[("Supported Files", "*.*")])
         if selected:
+            self.source_folder = None
             self.load_files(selected)
 
     def select_folder(self):
         folder = filedialog.askdirectory(title="Select Folder")
         if folder:
-            collected = []
-            for root, _, files in os.walk(folder):
-                for file in files:
-                    if file.lower().endswith(SUPPORTED_FORMATS):
-                        collected.append(os.path.join(root, file))
-            self.load_files(collected)
-
-    def load_files(self, paths):
-        self.file_paths = [p for p in paths if p.lower().endswith(SUPPORTED_FORMATS)]
-        self.hash_results.clear()
-        self.tree.delete(*self.tree.get_children())
+            self.source_folder = folder
+            self.load_files([folder])
+
+    def scan_config(self):
+        return {
+            "scan_exclude": self.scan_exclude,
+            "scan_include": self.scan_include,
+            "scan_default_excludes": self.scan_default_excludes,
+        }
 
-        if not self.file_paths:
-            self.label_status.configure(text="⚠️ No supported files found.")
+    def scan_rules(self):
+        return ScanRules.from_config(self.scan_config())
+
+    def open_job(self, paths, resume=None):
+        # every run is journaled so an interrupted one can be picked up again
+        try:
+            if resume:
+                return resume.open_journal()
+            header = job_header(paths, self.hash_algorithms, True, self.scan_config(), self.source_folder)
+            return JobJournal(new_job_path(), header)
+        except Exception as e:
+            print(f"[!] Failed to open job journal: {e}")
+            return None
+
+    def close_job(self, finished=False):
+        try:
+            self.job.close(finished)
+        except Exception as e:
+            print(f"[!] Failed to close job journal: {e}")
+        self.job = None
+
+    def resume_job_popup(self):
+        if self.scheduler:
+            messagebox.showinfo("Busy", "Please wait for the current run to finish or cancel it.")
+            return
+        jobs = list_jobs()
+        if len(jobs) == 1:
+            path = jobs[0]
+        else:
+            path = filedialog.askopenfilename(
+                title="Select Interrupted Job", initialdir=jobs_dir() if jobs else None,
+                filetypes=[("Origistamp Jobs", f"*{JOB_EXTENSION}")]
+            )
+            if not path:
+                return
+        try:
+            job = load_job(path)
+            algorithms = normalize_algorithms(job.header["algorithms"])
+        except Exception as e:
+            messagebox.showerror("Resume Failed", str(e))
+            return
+        if len(jobs) == 1 and not messagebox.askyesno("Resume Job", f"Resume the interrupted run?\n\n{job.describe()}"):
             return
 
-        self.label_path.configure(text=f"\U0001f4c2 Selected Files: {len(self.file_paths)}")
+        self.hash_algorithms = algorithms
+        self.digest_button.configure(text=self.digest_button_text())
+        scan = job.header["scan"]
+        self.scan_exclude = scan.get("scan_exclude", [])
+        self.scan_include = scan.get("scan_include", [])
+        self.scan_default_excludes = scan.get("scan_default_excludes", True)
+        self.source_folder = job.header.get("source_folder")
+        self.load_files(job.roots, resume=job)
+
+    def load_files(self, paths, resume=None):
+        if self.scheduler:
+            self.scheduler.cancel()
+            self.scheduler = None
+        if self.job:
+            # a run replaced by a new one is not offered for resuming later
+            self.close_job(finished=True)
+        self.stop_watch()
+        self.watch_roots = list(paths)
+
+        self.hash_results.clear()
+        self.merkle = None
+        self.similar_result_text = ""
+        self.duplicate_result_text = ""
+        self.view_rows = None
+        self.sort_key = None
+        self.table.clear()
+        self.sha_report_text = ""
+
+        self.label_path.configure(text="\U0001f4c2 Scanning...")
         self.label_sha.configure(text="\U0001f522 SHA-256: Processing...")
         self.label_status.configure(text="\U0001f4ac Calculating hashes...")
 
         self.progress.set(0)
+        self.cancel_button.configure(state="normal")
+        STATS.reset()
+
+        # pHash is CPU-bound, so images always go through the process pool;
+        # its worker processes are only spawned once the first image is submitted
+        if not self.cpu_pool:
+            self.cpu_pool = ProcessPoolExecutor()
+        if self.cache:
+            self.cache.reset_stats()
+
+        self.job = self.open_job(paths, resume)
+        done = resume.done if resume and self.job else None
+        if done is not None:
+            done.row_of("")
+
+        self.scheduler = HashScheduler(self.hash_job(done), workers=self.hash_workers or None)
+        # folders are listed while the first files are already being hashed;
+        # file_paths is the scanner's own list and grows as the scan proceeds
+        self.scanner = scan_folders(paths, self.scan_rules(), self.scan_workers, self.scheduler.cancelled)
+        self.file_paths = self.scanner.paths
+        self.scheduler.start(iter(self.scanner))
+        self.root.after(100, self.poll_hash_results, self.scheduler)
+
+    def hash_job(self, done=None, force=None):
+        return functools.partial(
+            hash_scanned, done=done, buffer_size=self.hash_buffer_size, use_mmap=self.use_mmap,
+            cache=self.cache, force=self.force_rehash_var.get() if force is None else force,
+            cpu_pool=self.cpu_pool if self.use_processes else None, phash=True, phash_pool=self.cpu_pool,
+            algorithms=self.hash_algorithms, read_ahead=self.read_ahead
+        )
 
-        self.sha_report_text = "| File Name | SHA-256 | Size |\n"
-        self.sha_report_text += "|-----------|---------|------|\n"
+    def set_inflight(self, value):
+        # takes effect with the next run; a running scheduler keeps its pool
+        self.hash_workers = 0 if value == "auto" else int(value)
 
-        for i, f in enumerate(self.file_paths):
-            try:
-                with open(f, 'rb') as file:
-                    file_data = file.read()
-                    sha = hashlib.sha256(file_data).hexdigest()
+    def poll_hash_results(self, scheduler):
+        if scheduler is not self.scheduler:
+            return
 
-                stat = os.stat(f)
-                
-                size_kb = f"{stat.st_size / 1024:.2f} KB"
+        with STATS.stage("gui.store"):
+            for (f, _), info, error in scheduler.drain():
+                if error:
+                    print(f"[!] Error processing {f}: {error}")
+                    continue
+
+                self.hash_results.add(f, info["sha"], info["size"], info["mtime"], info["phash"], info["digests"])
+                if self.job and not info.get("resumed"):
+                    self.job.record(f, info["sha"], info["size"], info["mtime"], info["phash"], info["digests"])
+
+        with STATS.stage("gui.table"):
+            self.table.refresh()
+
+        total = len(self.file_paths)
+        scanning = not self.scanner.done
+        if self.job:
+            self.job.checkpoint(len(self.hash_results), total, not scanning)
+        self.progress.set(len(self.hash_results) / total if total and not scanning else 0)
+        self.label_path.configure(text=f"\U0001f4c2 Selected Files: {total}{'+' if scanning else ''}")
+
+        if not scheduler.finished:
+            stage = "Scanning and hashing" if scanning else "Calculating hashes"
+            self.label_status.configure(text=f"\U0001f4ac {stage}... {len(self.hash_results)}/{total}")
+            self.root.after(100, self.poll_hash_results, scheduler)
+            return
 
-                self.hash_results[f] = {
-                    "sha": sha,
-                    "size": size_kb,
-                }
+        self.scheduler = None
+        self.cancel_button.configure(state="disabled")
+        if self.job:
+            # only a run cut short by closing the app or a crash stays resumable
+            self.close_job(finished=True)
+        for path, error in self.scanner.errors:
+            print(f"[!] Cannot scan {path}: {error}")
+        if not total:
+            self.label_sha.configure(text="\U0001f522 SHA-256: -")
+            self.label_status.configure(text="⚠️ No supported files found.")
+            return
+        self.sha_report_text = build_sha_table(self.hash_results)
+        self.merkle = MerkleTree.from_results(self.hash_results, self.manifest_base())
+        self.label_sha.configure(text=f"\U0001f522 Merkle Root: {self.merkle.root}")
+        self.apply_view()
 
-                info = self.hash_results[f]
-                self.tree.insert('', 'end', values=(os.path.basename(f), info["sha"], info["size"]))
+        cache_info = ""
+        if self.cache:
+            try:
+                self.cache.flush()
+            except Exception as e:
+                print(f"[!] Failed to update hash cache: {e}")
+            cache_info = f" Cache: {self.cache.hits} hit(s), {self.cache.misses} miss(es)."
+
+        stats_info = f" ⏱ {STATS.summary()}" if STATS.enabled else ""
+        if scheduler.cancelled.is_set():
+            self.label_status.configure(text=f"⛔ Cancelled after {len(self.hash_results)}/{total} file(s).{cache_info}{stats_info}")
+        else:
+            self.label_status.configure(text=f"✅ Hashed {len(self.hash_results)} file(s).{cache_info}{stats_info}")
+
+    def toggle_watch(self):
+        if self.watcher:
+            self.stop_watch()
+            self.label_status.configure(text="\U0001f441 Stopped watching.")
+            return
+        if self.scheduler or not self.watch_roots or not len(self.hash_results):
+            messagebox.showinfo("Nothing to Watch", "Hash a folder first, then watch it for changes.")
+            return
 
-                self.sha_report_text += f"| {os.path.basename(f)} | `{sha}` | {size_kb} |\n"
+        self.watch_manifest = None
+        manifest_format = self.manifest_format_var.get()
+        if manifest_format != "none":
+            extension = MANIFEST_EXTENSIONS[manifest_format]
+            path = filedialog.asksaveasfilename(
+                title="Manifest to Keep Up to Date (Cancel to Skip)", defaultextension=extension,
+                initialdir=self.manifest_base(), filetypes=[("Manifest", f"*{extension}")]
+            )
+            if path:
+                self.watch_manifest = (path, manifest_format)
+                self.write_watch_manifest()
+
+        self.watcher = FolderWatcher(
+            self.watch_roots, self.scan_rules(), known_state(self.hash_results),
+            debounce=self.watch_debounce, poll_interval=self.watch_poll_interval
+        ).start()
+        self.watch_button.configure(text="⏹ Stop Watching")
+        self.label_status.configure(text=f"\U0001f441 Watching {len(self.hash_results)} file(s) for changes...")
+        self.root.after(250, self.poll_watch, self.watcher)
+
+    def stop_watch(self):
+        if self.watch_scheduler:
+            self.watch_scheduler.cancel()
+            self.watch_scheduler = None
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+            self.watch_button.configure(text="\U0001f441 Watch")
+
+    def poll_watch(self, watcher):
+        if watcher is not self.watcher:
+            return
+        if not self.watch_scheduler:
+            changes = watcher.changes()
+            if changes:
+                self.start_watch_batch(changes)
+        self.root.after(250, self.poll_watch, watcher)
+
+    def start_watch_batch(self, changes):
+        # only the reported files are read again; removals need no I/O at all
+        batch = {"changes": changes, "changed": 0, "removed": apply_removals(self.hash_results, changes), "errors": 0}
+        items = [(path, st) for kind, path, st in changes if kind != "D"]
+        if batch["removed"]:
+            self.apply_view()
+        if not items:
+            self.finish_watch_batch(batch)
+            return
+        self.watch_scheduler = HashScheduler(self.hash_job(force=False), workers=self.hash_workers or None)
+        self.watch_scheduler.start(items)
+        self.root.after(100, self.poll_watch_results, self.watch_scheduler, batch)
 
+    def poll_watch_results(self, scheduler, batch):
+        if scheduler is not self.watch_scheduler:
+            return
+        for (f, _), info, error in scheduler.drain():
+            if error:
+                print(f"[!] Error processing {f}: {error}")
+                batch["errors"] += 1
+                continue
+            apply_result(self.hash_results, f, info)
+            batch["changed"] += 1
+        if not scheduler.finished:
+            self.root.after(100, self.poll_watch_results, scheduler, batch)
+            return
+        self.watch_scheduler = None
+        self.finish_watch_batch(batch)
+
+    def finish_watch_batch(self, batch):
+        self.file_paths = self.hash_results.paths()
+        self.sha_report_text = build_sha_table(self.hash_results)
+        base = self.manifest_base()
+        # without a source folder the base follows the selection, and a new base changes every key
+        if self.merkle is None or self.merkle.base != base:
+            self.merkle = MerkleTree.from_results(self.hash_results, base)
+        else:
+            self.merkle.apply(merkle_changes(self.hash_results, batch["changes"], base))
+        self.label_sha.configure(text=f"\U0001f522 Merkle Root: {self.merkle.root}")
+        self.label_path.configure(text=f"\U0001f4c2 Selected Files: {len(self.file_paths)}")
+        self.apply_view()
+        if self.watch_manifest:
+            self.write_watch_manifest()
+        if self.cache:
+            try:
+                self.cache.flush()
             except Exception as e:
-                print(f"[!] Error processing {f}: {e}")
+                print(f"[!] Failed to update hash cache: {e}")
+        errors = f", {batch['errors']} error(s)" if batch["errors"] else ""
+        self.label_status.configure(
+            text=f"\U0001f441 {datetime.datetime.now().strftime('%H:%M:%S')}: {batch['changed']} re-hashed, "
+                 f"{batch['removed']} removed{errors} · watching {len(self.hash_results)} file(s)"
+        )
+
+    def write_watch_manifest(self):
+        path, manifest_format = self.watch_manifest
+        try:
+            # swapped in whole, so other tools never read a half-written manifest
+            write_manifest(self.hash_results, path + ".tmp", manifest_format, self.manifest_base())
+            os.replace(path + ".tmp", path)
+        except Exception as e:
+            print(f"[!] Failed to update manifest: {e}")
 
-            self.progress.set((i + 1) / len(self.file_paths))
+    def table_row_count(self):
+        return len(self.hash_results) if self.view_rows is None else len(self.view_rows)
 
-        self.label_sha.configure(text="\U0001f522 SHA-256: Done")
-        self.label_status.configure(text=f"✅ Hashed {len(self.file_paths)} file(s).")
+    def table_row(self, index):
+        store = self.hash_results
+        row = index if self.view_rows is None else self.view_rows[index]
+        modified = datetime.datetime.fromtimestamp(store.mtimes[row] / 1e9).strftime('%Y-%m-%d %H:%M:%S')
+        return (store.names[row], store.sha(row), format_size(store.sizes[row]), "", modified, store.phash(row) or "")
 
+    def sort_table(self, key):
+        if self.scheduler:
+            return
+        reverse = self.sort_key == key
+        self.sort_key = None if reverse else key
+        self.apply_view(key, reverse)
+
+    def apply_view(self, key=None, reverse=False):
+        if self.scheduler:
+            return
+        store = self.hash_results
+        rows = store.sorted_rows(key, reverse) if key else None
+        text = self.filter_var.get().strip()
+        if text:
+            rows = store.filter_rows(text, rows)
+        self.view_rows = rows
+        self.table.clear()
+
+    def cancel_hashing(self):
+        if self.scheduler:
+            self.label_status.configure(text="\U0001f4ac Cancelling...")
+            self.scheduler.cancel()
 
     def copy_sha_report(self):
         if not self.sha_report_text.strip():
             messagebox.showinfo("Nothing to Copy", "Please hash some files first.")
             return
         try:
-            author = self.author_entry.get().strip()
-            note = self.note_entry.get().strip()
-            gpg_fp = self.gpg_entry.get().strip()
-            if gpg_fp:
-                if len(gpg_fp) != 40 or not all(c in "0123456789abcdefABCDEF" for c in gpg_fp):
-                    messagebox.showerror("Invalid GPG Fingerprint", "GPG fingerprint must be exactly 40 hexadecimal characters.")
+            full_text = self.report_content()
+            if full_text is None:
                 return
 
-            metadata = ""
-            if author:
-                metadata += f"**Author:** {author}\n"
-            if note:
-                metadata += f"**Notes:** {note}\n"
-            if gpg_fp:
-                metadata += f"**GPG Fingerprint:** `{gpg_fp}`\n"
-    
-            metadata += f"**Report Time:** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-
-            full_text = "# SHA-256 Hash Report\n\n" + metadata + "\n\n" + self.sha_report_text
-
-            if self.comparison_result_text:
-                full_text += "\n\n" + self.comparison_result_text
-
             pyperclip.copy(full_text)
             self.label_status.configure(text="\U0001f4cb SHA copied to clipboard")
         except Exception as e:
@@ -347,7 +885,6 @@ class DocHashApp:
             messagebox.showwarning("No Data", "Generate some hashes or comparison first.")
             return
 
-        filename = f"SHA_Report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
         export_mode = self.export_format_var.get()
         default_ext = ".md" if export_mode == "md" else ".pdf"
         filetypes = [("Markdown Files", "*.md")] if export_mode == "md" else [("PDF Files", "*.pdf")]
@@ -367,50 +904,19 @@ class DocHashApp:
             return
 
         try:
-            author = self.author_entry.get().strip()
-            note = self.note_entry.get().strip()
-            gpg_fp = self.gpg_entry.get().strip()
-
-            if gpg_fp and (len(gpg_fp) != 40 or not all(c in "0123456789abcdefABCDEF" for c in gpg_fp)):
-                messagebox.showerror("Invalid GPG Fingerprint", "GPG fingerprint must be exactly 40 hexadecimal characters.")
+            content = self.report_content()
+            if content is None:
                 return
 
-            metadata = ""
-            if author:
-                metadata += f"**Author:** {author}\n"
-            if note:
-                metadata += f"**Notes:** {note}\n"
-            if gpg_fp:
-                metadata += f"**GPG Fingerprint:** `{gpg_fp}`\n"
-            metadata += f"**Report Time:** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-
-            content = "# SHA-256 Hash Report\n\n" + metadata + "\n\n" + self.sha_report_text
-            if self.comparison_result_text:
-                content += "\n\n" + self.comparison_result_text
-
-            export_mode = self.export_format_var.get()
-            base_filename = os.path.splitext(os.path.basename(path))[0]
-            save_dir = os.path.dirname(path)
-
-            if export_mode in ["md", "both"]:
-                md_path = os.path.join(save_dir, base_filename + ".md")
-                with open(md_path, 'w', encoding='utf-8-sig') as f:
-                    f.write(content)
+            write_report(content, path, export_mode, self.pdf_fast_threshold)
 
-            if export_mode in ["pdf", "both"]:
-                pdf_path = os.path.join(save_dir, base_filename + ".pdf")
-                self.convert_markdown_to_pdf(content, pdf_path)
+            manifest_format = self.manifest_format_var.get()
+            if manifest_format != "none" and len(self.hash_results):
+                manifest_path = os.path.splitext(path)[0] + MANIFEST_EXTENSIONS[manifest_format]
+                write_manifest(self.hash_results, manifest_path, manifest_format, self.manifest_base())
 
             if self.open_folder_var.get():
-                folder = save_dir
-                try:
-                    if os.name == 'nt':
-                        os.startfile(folder)
-                    elif os.name == 'posix':
-                        import subprocess
-                        subprocess.run(['xdg-open', folder])
-                except Exception as e:
-                    print(f"[!] Folder open error: {e}")
+                open_folder(os.path.dirname(path))
 
             self.label_status.configure(text=f"\U0001f4be Report saved as: {export_mode.upper()}")
         except Exception as e:
@@ -429,78 +935,222 @@ class DocHashApp:
             return
 
         try:
-            export_mode = self.export_format_var.get()
-            base_filename = "sha_report"
-            temp_dir = os.path.dirname(zip_path)
-            md_path = os.path.join(temp_dir, base_filename + ".md")
-            pdf_path = os.path.join(temp_dir, base_filename + ".pdf")
-
-            author = self.author_entry.get().strip()
-            note = self.note_entry.get().strip()
-            gpg_fp = self.gpg_entry.get().strip()
-
-            if gpg_fp and (len(gpg_fp) != 40 or not all(c in "0123456789abcdefABCDEF" for c in gpg_fp)):
-                messagebox.showerror("Invalid GPG Fingerprint", "GPG fingerprint must be exactly 40 hexadecimal characters.")
+            content = self.report_content()
+            if content is None:
                 return
 
-            metadata = ""
-            if author:
-                metadata += f"**Author:** {author}\n"
-            if note:
-                metadata += f"**Notes:** {note}\n"
-            if gpg_fp:
-                metadata += f"**GPG Fingerprint:** `{gpg_fp}`\n"
-            metadata += f"**Report Time:** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-
-            content = "# SHA-256 Hash Report\n\n" + metadata + "\n\n" + self.sha_report_text
-            if self.comparison_result_text:
-                content += "\n\n" + self.comparison_result_text
-
-            if export_mode in ["md", "both"]:
-                with open(md_path, 'w', encoding='utf-8-sig') as f:
-                    f.write(content)
-
-            if export_mode in ["pdf", "both"]:
-                self.convert_markdown_to_pdf(content, pdf_path)
-
-            with zipfile.ZipFile(zip_path, 'w') as zipf:
-                for path in self.file_paths:
-                    zipf.write(path, os.path.basename(path))
-                if export_mode in ["md", "both"]:
-                    zipf.write(md_path, os.path.basename(md_path))
-                if export_mode in ["pdf", "both"]:
-                    zipf.write(pdf_path, os.path.basename(pdf_path))
-                    
-            try:
-                with open(zip_path, "rb") as zf:
-                    zip_hash = hashlib.sha256(zf.read()).hexdigest()
-                    sha256_path = zip_path + ".sha256"
-                with open(sha256_path, "w", encoding="utf-8") as sha_file:
-                    sha_file.write(f"{zip_hash}  {os.path.basename(zip_path)}\n")
-            except Exception as e:
-                print(f"[!] Failed to write SHA256 file: {e}")        
-
-            if os.path.exists(md_path):
-                os.remove(md_path)
-            if os.path.exists(pdf_path):
-                os.remove(pdf_path)
+            create_zip(zip_path, self.hash_results.paths(), content, self.export_format_var.get(), self.hash_results, self.zip_compression_var.get(), self.pdf_fast_threshold)
 
             if self.open_folder_var.get():
-                folder = os.path.dirname(zip_path)
-                try:
-                    if os.name == 'nt':
-                        os.startfile(folder)
-                    elif os.name == 'posix':
-                        import subprocess
-                        subprocess.run(['xdg-open', folder])
-                except Exception as e:
-                    print(f"[!] Folder open error: {e}")
+                open_folder(os.path.dirname(zip_path))
 
             self.label_status.configure(text=f"\U0001f4e6 ZIP created → {os.path.basename(zip_path)}")
         except Exception as e:
             self.label_status.configure(text=f"❌ ZIP failed: {e}")
 
 
+    def export_proof(self):
+        if not self.merkle or not len(self.merkle):
+            messagebox.showinfo("No Files", "Hash some files first.")
+            return
+        f = filedialog.askopenfilename(title="Select File to Prove", initialdir=self.manifest_base())
+        if not f:
+            return
+        # the dialog's spelling of the path (slashes, drive case) need not match the scanner's
+        target = os.path.abspath(f)
+        results = self.hash_results
+        row = next((r for r in range(len(results)) if os.path.abspath(results.path(r)) == target), None)
+        if row is None:
+            messagebox.showwarning("Not Stamped", "The selected file is not part of the hashed set.")
+            return
+
+        key = ManifestWriter(self.manifest_base()).key(self.hash_results.path(row))
+        proof = self.merkle.export_proof(key, self.hash_results.digest(row))
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json", initialfile=os.path.basename(f) + ".proof.json", filetypes=[("JSON Files", "*.json")]
+        )
+        if not path:
+            return
+        try:
+            save_proof(proof, path)
+            self.label_status.configure(text=f"\U0001f333 Proof saved ({len(proof['proof'])} hashes) → {os.path.basename(path)}")
+        except Exception as e:
+            self.label_status.configure(text=f"❌ Proof export failed: {e}")
+
+    def verify_popup(self):
+        if self.scheduler:
+            messagebox.showwarning("Busy", "Wait for the current job to finish or cancel it.")
+            return
+        report = filedialog.askopenfilename(
+            title="Select Report or Checksum File",
+            filetypes=[("Reports & Checksums", "*.md *.sha256 SHA256SUMS *.txt"), ("All Files", "*.*")]
+        )
+        if not report:
+            return
+        folder = filedialog.askdirectory(title="Select Folder to Verify")
+        if not folder:
+            return
+
+        try:
+            manifest = load_manifest(report)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read report: {e}")
+            return
+        if not len(manifest):
+            messagebox.showwarning("Empty Report", "No SHA-256 entries found in the selected file.")
+            return
+
+        job = {"done": 0, "total": len(manifest), "result": None, "error": None}
+        cancelled = threading.Event()
+        rules = self.scan_rules()
+
+        def progress(done, total):
+            job["done"], job["total"] = done, total
+
+        def run():
+            try:
+                job["result"] = verify_folder(
+                    manifest, folder, self.hash_buffer_size, self.hash_workers or None, cancelled, progress, rules, self.scan_workers
+                )
+            except Exception as e:
+                job["error"] = e
+
+        self.label_status.configure(text=f"\U0001f4ac Verifying {len(manifest)} entries...")
+        self.progress.set(0)
+        threading.Thread(target=run, daemon=True).start()
+        self.root.after(100, self.poll_verify, job, manifest, cancelled)
+
+    def poll_verify(self, job, manifest, cancelled):
+        if job["result"] is None and job["error"] is None:
+            if job["total"]:
+                self.progress.set(job["done"] / job["total"])
+                self.label_status.configure(text=f"\U0001f4ac Verifying... {job['done']}/{job['total']}")
+            self.root.after(100, self.poll_verify, job, manifest, cancelled)
+            return
+
+        self.progress.set(1)
+        if job["error"]:
+            self.label_status.configure(text=f"❌ Verify failed: {job['error']}")
+            return
+
+        result = job["result"]
+        self.comparison_result_text = build_verify_section(result, manifest.source)
+        if result.ok:
+            self.label_status.configure(text=f"✅ Verified {len(result.matched)} file(s), {len(result.new)} new.")
+        else:
+            self.label_status.configure(
+                text=f"❌ {len(result.modified)} modified, {len(result.missing)} missing, {len(result.new)} new."
+            )
+
+        popup = tk.Toplevel(self.root)
+        popup.title("Verification")
+        popup.geometry("700x400")
+
+        text = tk.Text(popup, wrap="word")
+        text.insert("1.0", self.comparison_result_text)
+        text.configure(state="disabled")
+        text.pack(fill="both", expand=True, padx=10, pady=5)
+
+        def copy_result():
+            pyperclip.copy(self.comparison_result_text)
+            messagebox.showinfo("Copied", "Verification result copied to clipboard.")
+
+        ctk.CTkButton(popup, text="\U0001f4cb Copy Result", command=copy_result).pack(pady=10)
+
+    def compare_folders_popup(self):
+        if self.scheduler:
+            messagebox.showwarning("Busy", "Wait for the current job to finish or cancel it.")
+            return
+        use_manifest = messagebox.askyesnocancel(
+            "Compare Folders", "Compare against a saved manifest or report?\n\nYes: manifest/report vs. folder\nNo: folder vs. folder"
+        )
+        if use_manifest is None:
+            return
+        if use_manifest:
+            source = filedialog.askopenfilename(
+                title="Select Manifest or Report (A)",
+                filetypes=[("Manifests & Reports", "*.jsonl *.ostamp *.sha256sums *.md *.sha256 SHA256SUMS *.txt"), ("All Files", "*.*")]
+            )
+        else:
+            source = filedialog.askdirectory(title="Select Original Folder (A)")
+        if not source:
+            return
+        folder = filedialog.askdirectory(title="Select Folder to Compare (B)")
+        if not folder:
+            return
+
+        manifest = None
+        if use_manifest:
+            try:
+                manifest = load_manifest(source)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to read manifest: {e}")
+                return
+            if not len(manifest):
+                messagebox.showwarning("Empty Manifest", "No SHA-256 entries found in the selected file.")
+                return
+
+        job = {"done": 0, "total": 0, "result": None, "error": None}
+        cancelled = threading.Event()
+
+        def progress(done, total):
+            job["done"], job["total"] = done, total
+
+        def run():
+            options = dict(
+                buffer_size=self.hash_buffer_size, workers=self.hash_workers or None, cache=self.cache,
+                rules=self.scan_rules(), scan_workers=self.scan_workers, cancelled=cancelled, on_progress=progress
+            )
+            try:
+                if manifest is not None:
+                    job["result"] = compare_manifest(manifest, folder, **options)
+                else:
+                    job["result"] = compare_folders(source, folder, **options)
+            except Exception as e:
+                job["error"] = e
+
+        self.label_status.configure(text="\U0001f4ac Listing both sides...")
+        self.progress.set(0)
+        threading.Thread(target=run, daemon=True).start()
+        self.root.after(100, self.poll_compare, job)
+
+    def poll_compare(self, job):
+        if job["result"] is None and job["error"] is None:
+            if job["total"]:
+                self.progress.set(job["done"] / job["total"])
+                self.label_status.configure(text=f"\U0001f4ac Comparing... {job['done']}/{job['total']} file(s) hashed")
+            self.root.after(100, self.poll_compare, job)
+            return
+
+        self.progress.set(1)
+        if job["error"]:
+            self.label_status.configure(text=f"❌ Compare failed: {job['error']}")
+            return
+
+        result, self.comparison_result_text = job["result"]
+        if result.same:
+            self.label_status.configure(text=f"✅ {result.identical} file(s) identical.")
+        else:
+            self.label_status.configure(
+                text=f"❌ {len(result.changed)} changed, {len(result.only_a)} only in A, {len(result.only_b)} only in B, "
+                     f"{result.identical} identical."
+            )
+
+        popup = tk.Toplevel(self.root)
+        popup.title("Folder Comparison")
+        popup.geometry("760x480")
+
+        text = tk.Text(popup, wrap="none")
+        text.insert("1.0", self.comparison_result_text)
+        text.configure(state="disabled")
+        text.pack(fill="both", expand=True, padx=10, pady=5)
+
+        def copy_result():
+            pyperclip.copy(self.comparison_result_text)
+            messagebox.showinfo("Copied", "Comparison result copied to clipboard.")
+
+        ctk.CTkButton(popup, text="\U0001f4cb Copy Result", command=copy_result).pack(pady=10)
+
     def compare_files_popup(self):
         f1 = filedialog.askopenfilename(title="Select First File", filetypes=[("All Files", "*.*")])
         if not f1:
@@ -510,26 +1160,21 @@ class DocHashApp:
             return
 
         try:
-            with open(f1, 'rb') as a:
-                hash1 = hashlib.sha256(a.read()).hexdigest()
-            with open(f2, 'rb') as b:
-                hash2 = hashlib.sha256(b.read()).hexdigest()
+            hash1, hash2, result, self.comparison_result_text = compare_files(
+                f1, f2, self.hash_buffer_size, self.use_mmap, self.hash_algorithms
+            )
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read files: {e}")
             return
 
-        result = "✅ Files are IDENTICAL." if hash1 == hash2 else "❌ Files are DIFFERENT."
-        self.comparison_result_text = f"# File Comparison\n\n- File A: `{os.path.basename(f1)}`\n  - SHA-256: `{hash1}`\n- File B: `{os.path.basename(f2)}`\n  - SHA-256: `{hash2}`\n\n**Result:** {result}"
-
         popup = tk.Toplevel(self.root)
         popup.title("Compare Files")
-        popup.geometry("700x300")
-
-        tk.Label(popup, text=f"File A: {os.path.basename(f1)}", anchor="w").pack(fill="x", padx=10, pady=2)
-        tk.Label(popup, text=f"SHA-256: {hash1}", anchor="w", wraplength=680).pack(fill="x", padx=10, pady=2)
+        popup.geometry(f"700x{260 + 40 * len(hash1)}")
 
-        tk.Label(popup, text=f"\nFile B: {os.path.basename(f2)}", anchor="w").pack(fill="x", padx=10, pady=2)
-        tk.Label(popup, text=f"SHA-256: {hash2}", anchor="w", wraplength=680).pack(fill="x", padx=10, pady=2)
+        for title, path, digests in (("File A", f1, hash1), ("\nFile B", f2, hash2)):
+            tk.Label(popup, text=f"{title}: {os.path.basename(path)}", anchor="w").pack(fill="x", padx=10, pady=2)
+            for name, value in digests.items():
+                tk.Label(popup, text=f"{digest_label(name)}: {value}", anchor="w", wraplength=680).pack(fill="x", padx=10, pady=2)
 
         tk.Label(popup, text=f"\n{result}", anchor="center", font=("Arial", 12, "bold")).pack(pady=10)
 
@@ -541,11 +1186,14 @@ class DocHashApp:
 
 
 if __name__ == '__main__':
+    # frozen Windows builds re-run this script in every worker process
+    multiprocessing.freeze_support()
     root = ctk.CTk()
     app = DocHashApp(root)
     
     def on_close():
         app.save_config()
+        app.close()
         root.destroy()
         
     root.protocol("WM_DELETE_WINDOW", on_close)    
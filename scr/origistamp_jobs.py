@@ -0,0 +1,144 @@
+import os, json, time, datetime
+
+from origistamp_core import CONFIG_FILE, DIGESTS, PRIMARY_DIGEST, ResultStore
+from origistamp_manifest import JsonlManifestWriter
+
+JOBS_DIR = "jobs"
+JOB_EXTENSION = ".job.jsonl"
+JOB_VERSION = 1
+CHECKPOINT_INTERVAL = 5.0
+
+
+def jobs_dir():
+    return os.path.join(os.path.dirname(os.path.abspath(CONFIG_FILE)), JOBS_DIR)
+
+
+def new_job_path():
+    folder = jobs_dir()
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f"job_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')}{JOB_EXTENSION}")
+
+
+def list_jobs():
+    folder = jobs_dir()
+    if not os.path.isdir(folder):
+        return []
+    jobs = [os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(JOB_EXTENSION)]
+    return sorted(jobs, key=os.path.getmtime, reverse=True)
+
+
+def job_header(roots, algorithms, phash, rules=None, source_folder=None):
+    return {
+        "type": "job",
+        "version": JOB_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "roots": [os.path.abspath(root) for root in roots],
+        "source_folder": source_folder,
+        "algorithms": list(algorithms),
+        "phash": phash,
+        "scan": rules or {},
+    }
+
+
+class JobJournal(JsonlManifestWriter):
+    """Append-only checkpoint of a hashing run.
+
+    The first line describes the job (roots, digests, scan rules), every
+    completed file is one manifest-style JSONL row, and each checkpoint adds a
+    scan progress line before the file is fsync'ed. A crash loses at most the
+    rows written since the last checkpoint.
+    """
+
+    def __init__(self, path, header=None, offset=None):
+        super(JsonlManifestWriter, self).__init__(None)
+        self.path = path
+        if offset is None:
+            self.header = header
+            self.f = open(path, "w", encoding="utf-8")
+            self._line(header)
+        else:
+            # drop a half-written last line before appending again
+            os.truncate(path, offset)
+            self.header = header
+            self.f = open(path, "a", encoding="utf-8")
+        self._synced = time.monotonic()
+        self.checkpoint(0, force=True)
+
+    def key(self, path):
+        # rows are looked up by the exact path the scanner yields
+        return path
+
+    def _line(self, obj):
+        self.f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+
+    def record(self, path, sha, size, mtime=0, phash=None, digests=None):
+        self.write(path, sha, size, mtime, phash, digests)
+
+    def checkpoint(self, hashed, scanned=None, scan_done=False, force=False):
+        now = time.monotonic()
+        if not force and now - self._synced < CHECKPOINT_INTERVAL:
+            return False
+        self._line({"type": "scan", "hashed": hashed, "scanned": scanned, "scan_done": scan_done})
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        self._synced = now
+        return True
+
+    def close(self, finished=False):
+        if self.f.closed:
+            return
+        if finished:
+            self.f.close()
+            os.remove(self.path)
+            return
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        self.f.close()
+
+
+class ResumedJob:
+    def __init__(self, path):
+        self.path = path
+        self.header = None
+        self.progress = {}
+        self.done = ResultStore()
+        self.offset = 0
+
+    @property
+    def roots(self):
+        return self.header["roots"]
+
+    def describe(self):
+        hashed = len(self.done)
+        scanned = self.progress.get("scanned")
+        total = f" of {scanned}" if scanned and self.progress.get("scan_done") else ""
+        roots = ", ".join(os.path.basename(root) or root for root in self.roots)
+        return f"{roots} — started {self.header['created']}, {hashed}{total} file(s) hashed"
+
+    def open_journal(self):
+        return JobJournal(self.path, self.header, self.offset)
+
+
+def load_job(path):
+    job = ResumedJob(path)
+    extra = [name for name in DIGESTS if name != PRIMARY_DIGEST]
+    with open(path, "rb") as f:
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            try:
+                obj = json.loads(raw)
+            except ValueError:
+                break
+            job.offset += len(raw)
+            kind = obj.get("type")
+            if kind == "job":
+                job.header = obj
+            elif kind == "scan":
+                job.progress = obj
+            elif job.header is not None:
+                digests = {name: obj[name] for name in extra if obj.get(name)}
+                job.done.add(obj["path"], obj["sha256"], obj["size"], obj.get("mtime_ns", 0), obj.get("phash"), digests)
+    if job.header is None or job.header.get("version") != JOB_VERSION:
+        raise ValueError(f"Not an Origistamp job file: {path}")
+    return job
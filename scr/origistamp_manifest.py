@@ -0,0 +1,415 @@
+import os, sys, re, json, struct, functools, mmap
+from array import array
+
+from origistamp_core import HASH_BUFFER_SIZE, SCAN_WORKERS, HashScheduler, hash_file, collect_folder
+
+MD_ROW = re.compile(r"^\|\s*(.+?)\s*\|\s*`([0-9a-fA-F]{64})`\s*\|\s*([\d.]+)\s*KB\s*\|")
+SUMS_ROW = re.compile(r"^\\?([0-9a-fA-F]{64}) [ *](.+)$")
+
+# Markdown reports round sizes to 0.01 KB
+MD_SIZE_TOLERANCE = 0.005 * 1024 + 1
+
+MANIFEST_FORMATS = ("jsonl", "sha256sums", "bin")
+MANIFEST_EXTENSIONS = {"jsonl": ".jsonl", "sha256sums": ".sha256sums", "bin": ".ostamp"}
+
+# binary layout: MAGIC, records of <32s digest, q size, q mtime_ns, H path length, path>,
+# then the uint64 record offsets and a <Q count, Q index offset, 8s MAGIC> trailer
+BIN_MAGIC = b"OSTMAN01"
+BIN_RECORD = struct.Struct("<32sqqH")
+BIN_TRAILER = struct.Struct("<QQ8s")
+
+
+def normalize_key(path):
+    path = path.replace("\\", "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return path
+
+
+class Manifest:
+    def __init__(self, source=""):
+        self.source = source
+        self.entries = []
+        self.basenames_only = True
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, sha, size=None, tolerance=0):
+        key = normalize_key(key)
+        if "/" in key:
+            self.basenames_only = False
+        self.entries.append((key, sha.lower(), size, tolerance))
+
+
+def common_base(paths):
+    paths = [os.path.abspath(p) for p in paths]
+    if not paths:
+        return None
+    if len(paths) == 1:
+        return os.path.dirname(paths[0]) if not os.path.isdir(paths[0]) else paths[0]
+    try:
+        base = os.path.commonpath(paths)
+    except ValueError:
+        return None
+    return base if os.path.isdir(base) else os.path.dirname(base)
+
+
+def manifest_key(path, base=None):
+    return normalize_key(os.path.relpath(os.path.abspath(path), base) if base else path)
+
+
+class ManifestWriter:
+    def __init__(self, base=None):
+        self.base = base
+        self._prefix = os.path.join(base, "") if base else None
+
+    def key(self, path):
+        # plain prefix strip on the hot path; relpath only for paths outside the base
+        if self._prefix and path.startswith(self._prefix):
+            return normalize_key(path[len(self._prefix):])
+        return manifest_key(path, self.base)
+
+
+class JsonlManifestWriter(ManifestWriter):
+    def __init__(self, path, base=None):
+        super().__init__(base)
+        self.f = open(path, "w", encoding="utf-8")
+
+    def write(self, path, sha, size, mtime=0, phash=None, digests=None):
+        sha = sha.hex() if isinstance(sha, bytes) else sha
+        row = {"path": self.key(path), "sha256": sha, "size": size, "mtime_ns": mtime}
+        if digests:
+            row.update((name, value) for name, value in digests.items() if value)
+        if phash:
+            row["phash"] = phash
+        self.f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.f.close()
+
+
+class Sha256SumsWriter(ManifestWriter):
+    def __init__(self, path, base=None):
+        super().__init__(base)
+        self.f = open(path, "w", encoding="utf-8", newline="\n")
+
+    def write(self, path, sha, size, mtime=0, phash=None, digests=None):
+        sha = sha.hex() if isinstance(sha, bytes) else sha
+        self.f.write(f"{sha}  {self.key(path)}\n")
+
+    def close(self):
+        self.f.close()
+
+
+class BinaryManifestWriter(ManifestWriter):
+    def __init__(self, path, base=None):
+        super().__init__(base)
+        self.offsets = array('Q')
+        self.f = open(path, "wb")
+        self.f.write(BIN_MAGIC)
+        self.pos = len(BIN_MAGIC)
+
+    def write(self, path, sha, size, mtime=0, phash=None, digests=None):
+        name = self.key(path).encode("utf-8")
+        record = BIN_RECORD.pack(bytes.fromhex(sha) if isinstance(sha, str) else sha, size, mtime, len(name)) + name
+        self.offsets.append(self.pos)
+        self.f.write(record)
+        self.pos += len(record)
+
+    def close(self):
+        if sys.byteorder == "big":
+            self.offsets.byteswap()
+        self.f.write(self.offsets.tobytes())
+        self.f.write(BIN_TRAILER.pack(len(self.offsets), self.pos, BIN_MAGIC))
+        self.f.close()
+
+
+MANIFEST_WRITERS = {
+    "jsonl": JsonlManifestWriter,
+    "sha256sums": Sha256SumsWriter,
+    "bin": BinaryManifestWriter,
+}
+
+
+def open_manifest_writer(path, fmt="jsonl", base=None):
+    return MANIFEST_WRITERS[fmt](path, os.path.abspath(base) if base else None)
+
+
+def write_manifest(results, path, fmt="jsonl", base=None):
+    writer = open_manifest_writer(path, fmt, base)
+    try:
+        for row in results.sorted_rows():
+            writer.write(
+                results.path(row), results.digest(row), results.sizes[row], results.mtimes[row],
+                results.phash(row), results.extra_digests(row)
+            )
+    finally:
+        writer.close()
+    return path
+
+
+class BinaryManifestReader:
+    # random access through the offset index; nothing is decoded until asked for
+    def __init__(self, path):
+        self.f = open(path, "rb")
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        count, index_offset, magic = BIN_TRAILER.unpack_from(self.mm, len(self.mm) - BIN_TRAILER.size)
+        if self.mm[:len(BIN_MAGIC)] != BIN_MAGIC or magic != BIN_MAGIC:
+            raise ValueError("Not an Origistamp binary manifest")
+        self.count = count
+        self.offsets = array('Q')
+        self.offsets.frombytes(self.mm[index_offset:index_offset + count * 8])
+        if sys.byteorder == "big":
+            self.offsets.byteswap()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        offset = self.offsets[i]
+        digest, size, mtime, name_len = BIN_RECORD.unpack_from(self.mm, offset)
+        start = offset + BIN_RECORD.size
+        return self.mm[start:start + name_len].decode("utf-8"), digest.hex(), size, mtime
+
+    def __iter__(self):
+        return (self[i] for i in range(self.count))
+
+    def close(self):
+        self.mm.close()
+        self.f.close()
+
+
+def load_manifest(path):
+    manifest = Manifest(path)
+    with open(path, "rb") as f:
+        head = f.read(len(BIN_MAGIC))
+    if head == BIN_MAGIC:
+        reader = BinaryManifestReader(path)
+        try:
+            for name, sha, size, mtime in reader:
+                manifest.add(name, sha, size)
+        finally:
+            reader.close()
+        return manifest
+
+    if path.lower().endswith(".jsonl") or head.lstrip().startswith(b"{"):
+        with open(path, "r", encoding="utf-8-sig") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    manifest.add(row["path"], row["sha256"], row.get("size"))
+        return manifest
+
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            match = MD_ROW.match(line)
+            if match:
+                name, sha, size_kb = match.groups()
+                manifest.add(name, sha, float(size_kb) * 1024, MD_SIZE_TOLERANCE)
+                continue
+            match = SUMS_ROW.match(line)
+            if match:
+                sha, name = match.groups()
+                manifest.add(name, sha)
+    return manifest
+
+
+class VerifyResult:
+    def __init__(self):
+        self.matched = []
+        self.modified = []
+        self.missing = []
+        self.new = []
+        self.errors = []
+
+    @property
+    def ok(self):
+        return not (self.modified or self.missing or self.errors)
+
+
+def _verify_job(item, buffer_size=HASH_BUFFER_SIZE):
+    return hash_file(item[1], buffer_size)
+
+
+def match_basenames(entries, candidates, buffer_size=HASH_BUFFER_SIZE, workers=None, cancelled=None):
+    """Pairs report rows that only carry a file name with the files of that name.
+
+    Markdown reports list base names, so a name can occur several times in
+    the folder and in the report. `entries` are (key, sha, size, tolerance) rows whose name is
+    ambiguous, `candidates` maps each name to the unclaimed paths. Only the
+    candidates a row's size allows are hashed; rows take the file with their
+    digest first, then any file left over with that name (which then shows as
+    modified). Returns ({entry index: path}, {path: sha}).
+    """
+    sizes = {}
+    for paths in candidates.values():
+        for path in paths:
+            try:
+                sizes[path] = os.path.getsize(path)
+            except OSError:
+                pass
+
+    def fits(path, size, tolerance):
+        return path in sizes and (size is None or abs(sizes[path] - size) <= tolerance)
+
+    to_hash = {path for key, sha, size, tolerance in entries
+               for path in candidates.get(os.path.basename(key), ()) if fits(path, size, tolerance)}
+    digests = {}
+    scheduler = HashScheduler(functools.partial(_verify_job, buffer_size=buffer_size), workers=workers)
+    scheduler.start([(None, path, None) for path in sorted(to_hash)])
+    for (_, path, _), actual, error in scheduler.iter_results():
+        if cancelled is not None and cancelled.is_set():
+            scheduler.cancel()
+        if not error:
+            digests[path] = actual
+
+    pairs = {}
+    claimed = set()
+    for i, (key, sha, size, tolerance) in enumerate(entries):
+        for path in candidates.get(os.path.basename(key), ()):
+            if path not in claimed and digests.get(path) == sha:
+                pairs[i] = path
+                claimed.add(path)
+                break
+    for i, (key, sha, size, tolerance) in enumerate(entries):
+        if i in pairs:
+            continue
+        left = [path for path in candidates.get(os.path.basename(key), ()) if path not in claimed]
+        if left:
+            path = next((p for p in left if fits(p, size, tolerance)), left[0])
+            pairs[i] = path
+            claimed.add(path)
+    return pairs, digests
+
+
+def match_entries(entries, files, folder=None, basenames_only=False, buffer_size=HASH_BUFFER_SIZE, workers=None,
+                  cancelled=None):
+    """Finds the file among `files` that each manifest entry describes.
+
+    Keys with a folder part are looked up under `folder`. Markdown reports
+    only carry base names: a name listed once in the report and found at most
+    once in `files` is taken as is, a name repeated on either side has all of
+    its rows settled by match_basenames. No file is claimed twice. Returns
+    ({entry index: path}, {path: sha} for the files read while matching).
+    """
+    pairs = {}
+    if not basenames_only:
+        claimed = set()
+        for i, (key, sha, size, tolerance) in enumerate(entries):
+            path = os.path.join(folder, key)
+            if os.path.normpath(path) not in claimed and os.path.isfile(path):
+                pairs[i] = path
+                claimed.add(os.path.normpath(path))
+        return pairs, {}
+
+    by_name = {}
+    for f in files:
+        by_name.setdefault(os.path.basename(f), []).append(f)
+    rows = {}
+    for i, entry in enumerate(entries):
+        rows.setdefault(entry[0], []).append(i)
+    ambiguous = []
+    for name, indices in rows.items():
+        candidates = by_name.get(name, [])
+        if len(indices) > 1 or len(candidates) > 1:
+            ambiguous.extend(indices)
+        elif candidates:
+            pairs[indices[0]] = candidates[0]
+        elif folder is not None and os.path.isfile(os.path.join(folder, name)):
+            # listed in the report but left out of the folder listing by the scan rules
+            pairs[indices[0]] = os.path.join(folder, name)
+    if not ambiguous:
+        return pairs, {}
+    names = {entries[i][0] for i in ambiguous}
+    found, digests = match_basenames([entries[i] for i in ambiguous], {name: by_name.get(name, []) for name in names},
+                                     buffer_size, workers, cancelled)
+    pairs.update((ambiguous[j], path) for j, path in found.items())
+    return pairs, digests
+
+
+def verify_folder(manifest, folder, buffer_size=HASH_BUFFER_SIZE, workers=None, cancelled=None, on_progress=None,
+                  rules=None, scan_workers=SCAN_WORKERS):
+    # `rules` should be the ones the report was hashed with, or everything they
+    # left out (.git, build output, ...) shows up as new
+    result = VerifyResult()
+    files = collect_folder(folder, rules, scan_workers)
+    pairs, known = match_entries(manifest.entries, files, folder, manifest.basenames_only, buffer_size, workers, cancelled)
+
+    claimed = set()
+    to_hash = []
+    for i, entry in enumerate(manifest.entries):
+        path = pairs.get(i)
+        if path is None:
+            result.missing.append(entry[0])
+            continue
+        claimed.add(os.path.normpath(path))
+        _check_size(entry, path, result, to_hash)
+
+    result.new = sorted(os.path.relpath(f, folder) for f in files if os.path.normpath(f) not in claimed)
+
+    # digests taken while matching names are not read a second time
+    for key, path, sha in [item for item in to_hash if item[1] in known]:
+        if known[path] == sha:
+            result.matched.append(key)
+        else:
+            result.modified.append((key, "SHA-256 differs"))
+    to_hash = [item for item in to_hash if item[1] not in known]
+
+    scheduler = HashScheduler(functools.partial(_verify_job, buffer_size=buffer_size), workers=workers)
+    scheduler.start(to_hash)
+    done = 0
+    for (key, path, sha), actual, error in scheduler.iter_results():
+        if cancelled is not None and cancelled.is_set():
+            scheduler.cancel()
+        if error:
+            result.errors.append((key, str(error)))
+        elif actual == sha:
+            result.matched.append(key)
+        else:
+            result.modified.append((key, "SHA-256 differs"))
+        done += 1
+        if on_progress:
+            on_progress(done, len(to_hash))
+    return result
+
+
+def _check_size(entry, path, result, to_hash):
+    key, sha, size, tolerance = entry
+    try:
+        actual = os.path.getsize(path)
+    except OSError as e:
+        result.errors.append((key, str(e)))
+        return
+    # size mismatches are settled without reading a single byte
+    if size is not None and abs(actual - size) > tolerance:
+        result.modified.append((key, "size differs"))
+        return
+    to_hash.append((key, path, sha))
+
+
+def build_verify_section(result, source=""):
+    lines = ["# Verification\n\n"]
+    if source:
+        lines.append(f"- Reference: `{os.path.basename(source)}`\n")
+    lines.append(f"- Matched: {len(result.matched)}\n")
+    lines.append(f"- Modified: {len(result.modified)}\n")
+    lines.append(f"- Missing: {len(result.missing)}\n")
+    lines.append(f"- New: {len(result.new)}\n")
+    if result.errors:
+        lines.append(f"- Errors: {len(result.errors)}\n")
+
+    for title, items in (
+        ("Modified", [f"`{key}` — {reason}" for key, reason in sorted(result.modified)]),
+        ("Missing", [f"`{key}`" for key in sorted(result.missing)]),
+        ("New", [f"`{key}`" for key in result.new]),
+        ("Errors", [f"`{key}` — {error}" for key, error in result.errors]),
+    ):
+        if items:
+            lines.append(f"\n## {title}\n\n")
+            lines.extend(f"- {item}\n" for item in items)
+
+    status = "✅ All files verified." if result.ok else "❌ Verification FAILED."
+    lines.append(f"\n**Result:** {status}")
+    return "".join(lines)
@@ -0,0 +1,146 @@
+import hashlib, bisect, json
+
+# RFC 6962 style domain separation so a leaf can never be passed off as a node
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+NODE_SIZE = 32
+
+
+def leaf_hash(key, digest):
+    if isinstance(digest, str):
+        digest = bytes.fromhex(digest)
+    return hashlib.sha256(LEAF_PREFIX + key.encode("utf-8") + b"\x00" + digest).digest()
+
+
+def node_hash(left, right):
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+class MerkleTree:
+    # leaves are sorted by relative path; every level is one flat bytearray of
+    # 32-byte nodes, and an odd node at the end of a level is carried up as is
+    def __init__(self, leaves=(), base=None):
+        # base is the folder the keys are relative to, when built from results
+        self.base = base
+        leaves = sorted(leaves)
+        self.keys = [key for key, _ in leaves]
+        self.levels = [bytearray(b"".join(leaf_hash(key, digest) for key, digest in leaves))]
+        self._build_from(0)
+
+    @classmethod
+    def from_results(cls, results, base=None):
+        from origistamp_manifest import ManifestWriter
+        keys = ManifestWriter(base)
+        return cls(((keys.key(results.path(row)), results.digest(row)) for row in range(len(results))), base)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _node(self, level, index):
+        start = index * NODE_SIZE
+        return bytes(self.levels[level][start:start + NODE_SIZE])
+
+    def _level_size(self, level):
+        return len(self.levels[level]) // NODE_SIZE
+
+    def _build_from(self, level):
+        del self.levels[level + 1:]
+        while self._level_size(level) > 1:
+            count = self._level_size(level)
+            parent = bytearray()
+            for i in range(0, count - 1, 2):
+                parent += node_hash(self._node(level, i), self._node(level, i + 1))
+            if count % 2:
+                parent += self._node(level, count - 1)
+            self.levels.append(parent)
+            level += 1
+
+    @property
+    def root(self):
+        if not self.keys:
+            return hashlib.sha256(b"").hexdigest()
+        return self._node(len(self.levels) - 1, 0).hex()
+
+    def index(self, key):
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return i
+        return None
+
+    def _recompute_path(self, index):
+        for level in range(len(self.levels) - 1):
+            count = self._level_size(level)
+            pair = index ^ 1
+            if pair < count:
+                left, right = (index, pair) if index % 2 == 0 else (pair, index)
+                value = node_hash(self._node(level, left), self._node(level, right))
+            else:
+                value = self._node(level, index)
+            index //= 2
+            start = index * NODE_SIZE
+            self.levels[level + 1][start:start + NODE_SIZE] = value
+
+    def update(self, key, digest):
+        index = self.index(key)
+        if index is None:
+            return False
+        start = index * NODE_SIZE
+        self.levels[0][start:start + NODE_SIZE] = leaf_hash(key, digest)
+        self._recompute_path(index)
+        return True
+
+    def apply(self, changes):
+        # changes maps key -> new digest, or None for a removed file. Content
+        # edits touch O(log n) nodes; additions and removals shift leaf
+        # positions, so the node levels are rebuilt from the existing leaf hashes
+        structural = {key: digest for key, digest in changes.items() if digest is None or self.index(key) is None}
+        for key, digest in changes.items():
+            if key not in structural:
+                self.update(key, digest)
+        if not structural:
+            return
+
+        leaves = {key: self._node(0, i) for i, key in enumerate(self.keys)}
+        for key, digest in structural.items():
+            if digest is None:
+                leaves.pop(key, None)
+            else:
+                leaves[key] = leaf_hash(key, digest)
+        self.keys = sorted(leaves)
+        self.levels = [bytearray(b"".join(leaves[key] for key in self.keys))]
+        self._build_from(0)
+
+    def proof(self, key):
+        index = self.index(key)
+        if index is None:
+            return None
+        path = []
+        for level in range(len(self.levels) - 1):
+            pair = index ^ 1
+            if pair < self._level_size(level):
+                path.append(["L" if pair < index else "R", self._node(level, pair).hex()])
+            index //= 2
+        return path
+
+    def export_proof(self, key, digest):
+        if isinstance(digest, bytes):
+            digest = digest.hex()
+        return {"path": key, "sha256": digest, "leaves": len(self), "root": self.root, "proof": self.proof(key)}
+
+
+def verify_proof(key, digest, proof, root):
+    value = leaf_hash(key, digest)
+    for side, sibling in proof:
+        sibling = bytes.fromhex(sibling)
+        value = node_hash(sibling, value) if side == "L" else node_hash(value, sibling)
+    return value.hex() == root
+
+
+def save_proof(proof, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(proof, f, indent=2)
+
+
+def load_proof(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,262 @@
+import re, zlib
+
+# A4 landscape with the same 1in margin as the WeasyPrint stylesheet
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+MARGIN = 72
+
+FONTS = {"F1": "Helvetica", "F2": "Helvetica-Bold", "F3": "Courier"}
+
+TITLE_SIZE = 20
+TEXT_SIZE = 12
+TABLE_SIZE = 8
+ROW_HEIGHT = 14
+CELL_LINE_HEIGHT = 10
+LINE_HEIGHT = 18
+
+# advance widths in em; Courier is exact, Helvetica is grouped into a few
+# classes that never underestimate a character by much, so wrapped names stay in their cell
+COURIER_WIDTH = 0.6
+HELVETICA_CLASSES = (("ijlI.,:;'|!", 0.28), ("ftr()[]/\\ -", 0.34), ("mMW@%", 0.95), ("ABCDEFGHKNOPQRSUVXYZw&", 0.78))
+HELVETICA_WIDTHS = {c: width for chars, width in HELVETICA_CLASSES for c in chars}
+NAME_BREAKS = "/\\ _-."
+
+BOLD_LABEL = re.compile(r"^\*\*(.+?)\*\*\s*(.*)$")
+
+
+def pdf_text(text):
+    text = text.replace("`", "")
+    text = text.encode("cp1252", "replace").decode("cp1252")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def wrap_text(text, width, size, char_width):
+    # digests are never shortened; a cell too narrow for one takes several lines
+    max_chars = max(1, int(width / (size * char_width)))
+    return [text[i:i + max_chars] for i in range(0, len(text), max_chars)] or [""]
+
+
+def wrap_name(text, width, size):
+    # file names are wrapped too, never cut: two names sharing a long prefix
+    # must stay distinguishable. Lines end after a separator where there is one
+    lines = []
+    start = 0
+    while start < len(text):
+        used, end, cut = 0.0, start, None
+        while end < len(text):
+            used += HELVETICA_WIDTHS.get(text[end], 0.56) * size
+            if used > width and end > start:
+                break
+            if text[end] in NAME_BREAKS:
+                cut = end + 1
+            end += 1
+        if end < len(text) and cut and cut > start + (end - start) // 2:
+            end = cut
+        lines.append(text[start:end])
+        start = end
+    return lines or [""]
+
+
+def split_markdown_report(md_text):
+    header, table, sections = [], [], []
+    for line in md_text.splitlines():
+        if line.startswith("|") and not sections:
+            table.append(line)
+        elif table:
+            sections.append(line)
+        else:
+            header.append(line)
+
+    rows = []
+    for line in table:
+        cells = [cell.strip().replace("`", "") for cell in line.strip().strip("|").split("|")]
+        if cells and set(cells[0]) <= set("-: "):
+            continue
+        rows.append(cells)
+    return header, rows, sections
+
+
+class PdfWriter:
+    # minimal PDF 1.4 writer: objects are streamed to the file as pages fill up,
+    # only the xref offsets and page ids stay in memory
+    def __init__(self, fileobj):
+        self.f = fileobj
+        self.offsets = {}
+        self.pos = 0
+        self.page_ids = []
+        self.next_id = 3 + len(FONTS)
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        for n, (name, base) in enumerate(FONTS.items()):
+            self._object(3 + n, f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>".encode())
+
+    def _write(self, data):
+        self.f.write(data)
+        self.pos += len(data)
+
+    def _object(self, obj_id, body):
+        self.offsets[obj_id] = self.pos
+        self._write(f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    def _new_id(self):
+        obj_id = self.next_id
+        self.next_id += 1
+        return obj_id
+
+    def add_page(self, content):
+        data = zlib.compress(content.encode("cp1252", "replace"))
+        content_id = self._new_id()
+        self._object(content_id, f"<< /Length {len(data)} /Filter /FlateDecode >>\nstream\n".encode() + data + b"\nendstream")
+        page_id = self._new_id()
+        fonts = " ".join(f"/{name} {3 + n} 0 R" for n, name in enumerate(FONTS))
+        self._object(page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << {fonts} >> >> /Contents {content_id} 0 R >>"
+        ).encode())
+        self.page_ids.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode())
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        xref = self.pos
+        count = self.next_id
+        lines = [f"xref\n0 {count}\n", "0000000000 65535 f \n"]
+        lines.extend(f"{self.offsets[i]:010d} 00000 n \n" for i in range(1, count))
+        lines.append(f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n")
+        self._write("".join(lines).encode())
+
+
+class PageCanvas:
+    def __init__(self, writer):
+        self.writer = writer
+        self.ops = []
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def text(self, x, y, font, size, text):
+        self.ops.append(f"BT /{font} {size} Tf {x:.1f} {y:.1f} Td ({pdf_text(text)}) Tj ET")
+
+    def rect(self, x, y, w, h, fill=None):
+        if fill:
+            self.ops.append(f"{fill} g {x:.1f} {y:.1f} {w:.1f} {h:.1f} re f 0 g")
+        self.ops.append(f"0.8 G 0.5 w {x:.1f} {y:.1f} {w:.1f} {h:.1f} re S")
+
+    def room(self, height):
+        return self.y - height >= MARGIN
+
+    def flush(self):
+        if self.ops:
+            self.writer.add_page("\n".join(self.ops))
+        self.ops = []
+        self.y = PAGE_HEIGHT - MARGIN
+
+
+TEXT_COLUMNS = ("File Name", "Size")
+FIXED_COLUMNS = {"Size": 75, "Image Hash": 90}
+HEX_WIDTH = 64 * TABLE_SIZE * COURIER_WIDTH + 12
+MIN_NAME_WIDTH = 120
+
+
+def column_widths(header):
+    # digest columns get a full 64-hex cell while it fits, then share what is left
+    width = PAGE_WIDTH - 2 * MARGIN
+    widths = [FIXED_COLUMNS.get(title, 0) for title in header]
+    digests = [n for n, title in enumerate(header) if n and title not in FIXED_COLUMNS]
+    if digests:
+        share = (width - sum(widths) - MIN_NAME_WIDTH) / len(digests)
+        for n in digests:
+            widths[n] = min(HEX_WIDTH, share)
+    widths[0] = width - sum(widths[1:])
+    return widths
+
+
+def write_report_pdf(md_text, fileobj):
+    header, rows, sections = split_markdown_report(md_text)
+    canvas = PageCanvas(PdfWriter(fileobj))
+
+    for line in header:
+        line = line.rstrip()
+        if not line:
+            continue
+        if line.startswith("# "):
+            canvas.y -= TITLE_SIZE
+            canvas.text(MARGIN, canvas.y, "F2", TITLE_SIZE, line[2:])
+            canvas.y -= TITLE_SIZE * 0.75
+            continue
+        canvas.y -= LINE_HEIGHT
+        match = BOLD_LABEL.match(line)
+        if match:
+            label, value = match.groups()
+            canvas.text(MARGIN, canvas.y, "F2", TEXT_SIZE, label)
+            canvas.text(MARGIN + len(label) * TEXT_SIZE * 0.6 + 4, canvas.y, "F1", TEXT_SIZE, value)
+        else:
+            canvas.text(MARGIN, canvas.y, "F1", TEXT_SIZE, line)
+    canvas.y -= LINE_HEIGHT
+
+    if rows:
+        table_header, body = rows[0], rows[1:]
+        widths = column_widths(table_header)
+        mono_columns = {n for n, title in enumerate(table_header) if title not in TEXT_COLUMNS}
+
+        def cell_lines(cells, bold=False):
+            columns = []
+            for n, (cell, width) in enumerate(zip(cells, widths)):
+                if not bold and n in mono_columns:
+                    columns.append(wrap_text(cell, width - 8, TABLE_SIZE, COURIER_WIDTH))
+                else:
+                    columns.append(wrap_name(cell, width - 8, TABLE_SIZE))
+            return columns
+
+        def draw_lines(columns, bold=False):
+            height = ROW_HEIGHT + (max(map(len, columns)) - 1) * CELL_LINE_HEIGHT
+            canvas.y -= height
+            x = MARGIN
+            for n, (lines, width) in enumerate(zip(columns, widths)):
+                canvas.rect(x, canvas.y, width, height, fill="0.95" if bold else None)
+                font = "F2" if bold else ("F3" if n in mono_columns else "F1")
+                for i, line in enumerate(lines):
+                    canvas.text(x + 4, canvas.y + height - 10 - i * CELL_LINE_HEIGHT, font, TABLE_SIZE, line)
+                x += width
+
+        def capacity(y):
+            # cell lines that fit between y and the bottom margin
+            return int((y - MARGIN - ROW_HEIGHT) // CELL_LINE_HEIGHT) + 1
+
+        def new_page():
+            canvas.flush()
+            draw_lines(header_lines, bold=True)
+
+        header_lines = cell_lines(table_header, bold=True)
+        draw_lines(header_lines, bold=True)
+        header_height = ROW_HEIGHT + (max(map(len, header_lines)) - 1) * CELL_LINE_HEIGHT
+        page_lines = capacity(PAGE_HEIGHT - MARGIN - header_height)
+        for cells in body:
+            columns = cell_lines(cells)
+            while True:
+                count, room = max(map(len, columns)), capacity(canvas.y)
+                if count <= room:
+                    draw_lines(columns)
+                    break
+                if count <= page_lines or room < 1:
+                    new_page()
+                    continue
+                # taller than a whole page: continued on the next one
+                draw_lines([lines[:room] or [""] for lines in columns])
+                columns = [lines[room:] or [""] for lines in columns]
+                new_page()
+        canvas.y -= LINE_HEIGHT
+
+    for line in sections:
+        line = line.rstrip()
+        heading = line.startswith("#")
+        text = line.lstrip("#").strip().replace("**", "")
+        size = 14 if heading else 10
+        chunks = [text[i:i + 140] for i in range(0, len(text), 140)] or [""]
+        for chunk in chunks:
+            if not canvas.room(size + 6):
+                canvas.flush()
+            canvas.y -= size + 6
+            if chunk:
+                canvas.text(MARGIN, canvas.y, "F2" if heading else "F1", size, chunk)
+
+    canvas.flush()
+    canvas.writer.close()
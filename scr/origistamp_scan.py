@@ -0,0 +1,209 @@
+import os, re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# VCS metadata, dependency trees and build output never hold originals worth stamping
+DEFAULT_EXCLUDES = (
+    ".git/", ".hg/", ".svn/", "node_modules/", "__pycache__/", ".venv/", "venv/", ".tox/",
+    ".mypy_cache/", ".pytest_cache/", ".idea/", "build/", "dist/", "*.egg-info/",
+)
+SCAN_WORKERS = 8
+
+
+def glob_to_regex(pattern):
+    # gitignore globs: * and ? stop at "/", ** crosses directories
+    out, i, n = [], 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**", i):
+            i += 2
+            if pattern.startswith("/", i):
+                i += 1
+                out.append("(?:.*/)?")
+            else:
+                out.append(".*")
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+            continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class Rule:
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.negate = pattern.startswith("!")
+        pattern = pattern[1:] if self.negate else pattern
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        # a slash anywhere but the end anchors the pattern to the scan root
+        self.anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+        self.literal = None if self.anchored or any(c in pattern for c in "*?[") else pattern
+        self.regex = glob_to_regex(pattern) if self.anchored else "(?:.*/)?" + glob_to_regex(pattern)
+        self.match = re.compile(self.regex + "$").match
+
+    def applies(self, is_dir):
+        return is_dir or not self.dir_only
+
+
+class ScanRules:
+    # gitignore-style matching on paths relative to the scan root; the last
+    # matching exclude rule wins and "!pattern" re-includes
+    def __init__(self, exclude=DEFAULT_EXCLUDES, include=()):
+        self.exclude = [Rule(p) for p in exclude if p.strip() and not p.startswith("#")]
+        self.include = [Rule(p) for p in include if p.strip() and not p.startswith("#")]
+        self.ordered = any(rule.negate for rule in self.exclude)
+        if not self.ordered:
+            # without negations order does not matter: literal names become a set
+            # lookup and the rest collapse into one regex per entry kind
+            self.names = {True: set(), False: set()}
+            patterns = {True: [], False: []}
+            for rule in self.exclude:
+                for is_dir in (True, False):
+                    if rule.applies(is_dir):
+                        if rule.literal is not None:
+                            self.names[is_dir].add(rule.literal)
+                        else:
+                            patterns[is_dir].append(rule.regex)
+            self.combined = {
+                is_dir: re.compile("(?:" + "|".join(regexes) + ")$").match if regexes else None
+                for is_dir, regexes in patterns.items()
+            }
+        if self.include:
+            self.include_match = re.compile("(?:" + "|".join(rule.regex for rule in self.include) + ")$").match
+
+    @classmethod
+    def from_config(cls, config):
+        exclude = list(DEFAULT_EXCLUDES) if config.get("scan_default_excludes", True) else []
+        exclude += config.get("scan_exclude", [])
+        return cls(exclude, config.get("scan_include", []))
+
+    def excluded(self, rel, name, is_dir):
+        if not self.ordered:
+            if name in self.names[is_dir]:
+                return True
+            match = self.combined[is_dir]
+            return bool(match and match(rel))
+        for rule in reversed(self.exclude):
+            if rule.applies(is_dir) and rule.match(rel):
+                return not rule.negate
+        return False
+
+    def wanted(self, rel, name):
+        if self.excluded(rel, name, False):
+            return False
+        return not self.include or bool(self.include_match(rel))
+
+
+class Scanner:
+    """Streams (path, stat) pairs for the supported files under `roots`.
+
+    Directories are listed with os.scandir, so the type checks come from the
+    directory entries and each file is stat'ed exactly once; the stat is handed
+    on to the hashing stage. Excluded directories are pruned before they are
+    opened. With several workers, subtrees are listed concurrently, which keeps
+    high-latency network filesystems busy.
+    """
+
+    def __init__(self, roots, rules=None, extensions=None, workers=SCAN_WORKERS, cancelled=None):
+        self.roots = [roots] if isinstance(roots, str) else list(roots)
+        self.rules = rules
+        self.extensions = tuple(extensions) if extensions else None
+        self.workers = max(1, workers or 1)
+        self.cancelled = cancelled
+        self.paths = []
+        self.errors = []
+        self.dirs_scanned = 0
+        self.done = False
+
+    def _is_cancelled(self):
+        return self.cancelled is not None and self.cancelled.is_set()
+
+    def _supported(self, name):
+        return self.extensions is None or name.lower().endswith(self.extensions)
+
+    def _scan_dir(self, path, rel):
+        files, subdirs = [], []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    name = entry.name
+                    try:
+                        if entry.is_dir():
+                            # same as os.walk: symlinked directories are listed, not followed
+                            if entry.is_symlink():
+                                continue
+                            if self.rules and self.rules.excluded(rel + name, name, True):
+                                continue
+                            subdirs.append((entry.path, rel + name + "/"))
+                        elif entry.is_file() and self._supported(name):
+                            if self.rules and not self.rules.wanted(rel + name, name):
+                                continue
+                            files.append((entry.path, entry.stat()))
+                    except OSError as e:
+                        self.errors.append((entry.path, str(e)))
+        except OSError as e:
+            self.errors.append((path, str(e)))
+        self.dirs_scanned += 1
+        return files, subdirs
+
+    def _emit(self, files):
+        for path, stat in files:
+            self.paths.append(path)
+            yield path, stat
+
+    def __iter__(self):
+        try:
+            dirs = []
+            for root in self.roots:
+                if os.path.isdir(root):
+                    dirs.append((root, ""))
+                elif self._supported(root):
+                    # explicitly chosen files are taken as is, exclude rules only prune folders
+                    try:
+                        yield from self._emit([(root, os.stat(root))])
+                    except OSError as e:
+                        self.errors.append((root, str(e)))
+            if self.workers == 1:
+                yield from self._walk(dirs)
+            else:
+                yield from self._crawl(dirs)
+        finally:
+            self.done = True
+
+    def _walk(self, stack):
+        stack.reverse()
+        while stack and not self._is_cancelled():
+            files, subdirs = self._scan_dir(*stack.pop())
+            stack.extend(reversed(subdirs))
+            yield from self._emit(files)
+
+    def _crawl(self, dirs):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self._scan_dir, *d) for d in dirs}
+            try:
+                while pending and not self._is_cancelled():
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        files, subdirs = future.result()
+                        pending.update(pool.submit(self._scan_dir, *d) for d in subdirs)
+                        yield from self._emit(files)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+def scan_paths(paths, rules=None, extensions=None, workers=SCAN_WORKERS):
+    return [path for path, _ in Scanner(paths, rules, extensions, workers)]
@@ -0,0 +1,87 @@
+import os, json, time, threading
+from contextlib import contextmanager
+
+STATS_ENV = "ORIGISTAMP_STATS"
+
+
+class Stats:
+    """Opt-in per-stage timers and counters.
+
+    Everything is a no-op until enable() is called, so the hot paths only pay
+    for one attribute check. Timers accumulate wall time per stage name; when
+    workers run in parallel the stage totals can exceed the elapsed time.
+    Work done inside a process pool is timed as a whole by the submitting side.
+    """
+
+    def __init__(self):
+        self.enabled = bool(os.environ.get(STATS_ENV))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        with self._lock:
+            self.timers = {}
+            self.counters = {}
+            self.started = time.perf_counter()
+
+    def add_time(self, name, seconds, calls=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            timer = self.timers.setdefault(name, [0, 0.0])
+            timer[0] += calls
+            timer[1] += seconds
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "elapsed": time.perf_counter() - self.started,
+                "timers": {name: {"calls": calls, "seconds": round(seconds, 6)} for name, (calls, seconds) in sorted(self.timers.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def summary(self, limit=4):
+        with self._lock:
+            top = sorted(self.timers.items(), key=lambda item: -item[1][1])[:limit]
+            parts = [f"{name} {seconds:.2f}s" for name, (_, seconds) in top]
+            hashed = self.counters.get("bytes.hashed")
+        if hashed:
+            parts.append(f"{hashed / (1024 * 1024):.1f} MB hashed")
+        return " · ".join(parts)
+
+    def format_table(self):
+        snap = self.snapshot()
+        lines = [f"{'stage':<24} {'calls':>9} {'seconds':>10}"]
+        for name, timer in sorted(snap["timers"].items(), key=lambda item: -item[1]["seconds"]):
+            lines.append(f"{name:<24} {timer['calls']:>9} {timer['seconds']:>10.3f}")
+        for name, value in snap["counters"].items():
+            lines.append(f"{name:<24} {value:>9}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
+
+
+STATS = Stats()
@@ -0,0 +1,328 @@
+import os, sys, stat as statmod, struct, select, threading, time, ctypes, ctypes.util
+
+from origistamp_core import SUPPORTED_FORMATS, HashScheduler
+from origistamp_manifest import ManifestWriter
+
+# a burst of events (a build, a git checkout) is collected until the folder has
+# been quiet this long; a folder that never goes quiet is flushed after WATCH_MAX_DELAY
+WATCH_DEBOUNCE = 1.0
+WATCH_MAX_DELAY = 10.0
+WATCH_POLL_INTERVAL = 5.0
+
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT = struct.Struct("iIII")
+
+
+def load_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class FolderWatcher:
+    """Reports files added, changed or removed under `roots`.
+
+    On Linux the folders are watched with inotify; elsewhere, or when the
+    watch limit is hit, the tree is re-listed every `poll_interval` seconds.
+    `known` maps path -> (size, mtime_ns) for the files already hashed; the
+    first listing is compared against it, so edits made while the initial
+    hash was running are not lost. Events only mark paths as dirty; changes()
+    stats them once the burst is over and returns what really changed.
+    """
+
+    def __init__(self, roots, rules=None, known=None, extensions=SUPPORTED_FORMATS,
+                 debounce=WATCH_DEBOUNCE, poll_interval=WATCH_POLL_INTERVAL, polling=False):
+        self.roots = [roots] if isinstance(roots, str) else list(roots)
+        self.rules = rules
+        self.extensions = tuple(extensions) if extensions else None
+        self.known = dict(known or {})
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.mode = "polling" if polling else "inotify"
+        self.errors = []
+        self.stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._first = self._last = 0.0
+        self._thread = None
+        self._fd = None
+        self._watches = {}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _mark(self, paths):
+        now = time.monotonic()
+        with self._lock:
+            if not self._dirty:
+                self._first = now
+            self._last = now
+            self._dirty.update(paths)
+
+    def _supported(self, rel, name):
+        if self.extensions and not name.lower().endswith(self.extensions):
+            return False
+        return not self.rules or self.rules.wanted(rel, name)
+
+    def _list(self, root, rel="", on_dir=None):
+        # same pruning as the Scanner; yields (path, (size, mtime_ns))
+        if not os.path.isdir(root):
+            try:
+                st = os.stat(root)
+                yield root, (st.st_size, st.st_mtime_ns)
+            except OSError:
+                pass
+            return
+        stack = [(root, rel)]
+        while stack and not self.stopped.is_set():
+            path, rel = stack.pop()
+            if on_dir:
+                on_dir(path, rel)
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        name = entry.name
+                        try:
+                            if entry.is_dir():
+                                if entry.is_symlink() or (self.rules and self.rules.excluded(rel + name, name, True)):
+                                    continue
+                                stack.append((entry.path, rel + name + "/"))
+                            elif entry.is_file() and self._supported(rel + name, name):
+                                st = entry.stat()
+                                yield entry.path, (st.st_size, st.st_mtime_ns)
+                        except OSError:
+                            continue
+            except OSError as e:
+                self.errors.append((path, str(e)))
+
+    def _resync(self, on_dir=None):
+        # full listing against the known state; used at start, when polling and after an inotify overflow
+        listed = {}
+        for root in self.roots:
+            listed.update(self._list(root, "", on_dir))
+        if self.stopped.is_set():
+            return
+        with self._lock:
+            changed = [path for path, sig in listed.items() if self.known.get(path) != sig]
+            changed.extend(path for path in self.known if path not in listed)
+        if changed:
+            self._mark(changed)
+
+    def changes(self):
+        """Returns [(kind, path, stat)] with kind "A", "M" or "D" once events have settled, else []."""
+        now = time.monotonic()
+        with self._lock:
+            if not self._dirty:
+                return []
+            if now - self._last < self.debounce and now - self._first < WATCH_MAX_DELAY:
+                return []
+            dirty, self._dirty = self._dirty, set()
+
+        out = []
+        with self._lock:
+            for path in sorted(dirty):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    st = None
+                if st is not None and statmod.S_ISDIR(st.st_mode):
+                    continue
+                old = self.known.get(path)
+                if st is None:
+                    if old is not None:
+                        del self.known[path]
+                        out.append(("D", path, None))
+                        continue
+                    # a removed or moved-away folder: drop everything below it
+                    prefix = os.path.join(path, "")
+                    for gone in [p for p in self.known if p.startswith(prefix)]:
+                        del self.known[gone]
+                        out.append(("D", gone, None))
+                    continue
+                sig = (st.st_size, st.st_mtime_ns)
+                if sig != old:
+                    self.known[path] = sig
+                    out.append(("M" if old else "A", path, st))
+        return out
+
+    def _run(self):
+        libc = load_inotify() if self.mode == "inotify" else None
+        if libc:
+            try:
+                self._run_inotify(libc)
+                return
+            except OSError as e:
+                print(f"[!] inotify unavailable ({e}), polling every {self.poll_interval:g}s")
+            finally:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+        self.mode = "polling"
+        self._resync()
+        while not self.stopped.wait(self.poll_interval):
+            self._resync()
+
+    def _add_watch(self, libc, path, rel, only=None):
+        wd = libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        previous = self._watches.get(wd)
+        if only is not None and previous is not None:
+            if previous[2] is None:
+                return
+            only = only | previous[2]
+        self._watches[wd] = (path, rel, only)
+
+    def _run_inotify(self, libc):
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._fd = fd
+        on_dir = lambda path, rel: self._add_watch(libc, path, rel)
+        # explicitly chosen files are watched through their folder, so editors
+        # that save by writing a new file and renaming it over are still seen
+        parents = {}
+        for root in self.roots:
+            if not os.path.isdir(root):
+                parent, name = os.path.split(root)
+                parents.setdefault(parent or os.curdir, set()).add(name)
+        for parent, names in parents.items():
+            self._add_watch(libc, parent, "", names)
+        self._resync(on_dir)
+
+        while not self.stopped.is_set():
+            ready, _, _ = select.select([fd], [], [], 0.5)
+            if not ready:
+                continue
+            try:
+                data = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            changed = []
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT.unpack_from(data, offset)
+                name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b"\0")
+                offset += EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    self._resync(on_dir)
+                    continue
+                if mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                watched = self._watches.get(wd)
+                if watched is None:
+                    continue
+                path, rel, only = watched
+                if not name:
+                    continue
+                name = os.fsdecode(name)
+                child = os.path.join(path, name)
+                if only is not None:
+                    if name in only:
+                        changed.append(child if path != os.curdir else name)
+                    continue
+                if mask & IN_ISDIR:
+                    if self.rules and self.rules.excluded(rel + name, name, True):
+                        continue
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        # a new folder may already hold files by the time its watch exists
+                        changed.extend(p for p, _ in self._list(child, rel + name + "/", on_dir))
+                    elif mask & IN_MOVED_FROM:
+                        prefix = os.path.join(child, "")
+                        for old_wd, (watched_path, _, _) in list(self._watches.items()):
+                            if watched_path == child or watched_path.startswith(prefix):
+                                libc.inotify_rm_watch(fd, old_wd)
+                                self._watches.pop(old_wd, None)
+                        changed.append(child)
+                    else:
+                        changed.append(child)
+                elif self._supported(rel + name, name):
+                    changed.append(child)
+            if changed:
+                self._mark(changed)
+
+
+def known_state(results):
+    return {results.path(row): (results.sizes[row], results.mtimes[row]) for row in range(len(results))}
+
+
+def apply_removals(results, changes):
+    rows = [results.row_of(path) for kind, path, _ in changes if kind == "D"]
+    results.remove(row for row in rows if row is not None)
+    return sum(row is not None for row in rows)
+
+
+def apply_result(results, path, info):
+    row = results.row_of(path)
+    if row is None:
+        return results.add(path, info["sha"], info["size"], info["mtime"], info["phash"], info["digests"])
+    results.update(row, info["sha"], info["size"], info["mtime"], info["phash"], info["digests"])
+    return row
+
+
+def merkle_changes(results, changes, base=None):
+    # {key: digest or None} for MerkleTree.apply, taken from `results` after the
+    # batch, so a file that failed to hash keeps the digest it had before
+    keys = ManifestWriter(base)
+    out = {}
+    for kind, path, _ in changes:
+        row = results.row_of(path)
+        out[keys.key(path)] = results.digest(row) if row is not None else None
+    return out
+
+
+def watch(results, watcher, job, on_batch, workers=None, interval=0.2):
+    """Keeps `results` in sync until the watcher is stopped; blocking, for the CLI.
+
+    Only the files reported by the watcher are re-hashed (through `job`, the
+    same hash_scanned partial as the initial run), removed files are dropped,
+    then on_batch(changes, errors) regenerates whatever output depends on them.
+    """
+    while not watcher.stopped.wait(interval):
+        changes = watcher.changes()
+        if not changes:
+            continue
+        apply_removals(results, changes)
+        errors = []
+        items = [(path, st) for kind, path, st in changes if kind != "D"]
+        if items:
+            scheduler = HashScheduler(job, workers=workers)
+            scheduler.start(items)
+            for (path, _), info, error in scheduler.iter_results():
+                if error:
+                    errors.append((path, error))
+                    continue
+                apply_result(results, path, info)
+        on_batch(changes, errors)
@@ -0,0 +1,54 @@
+import os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import HashCache, hash_entry
+
+
+class HashCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = HashCache(os.path.join(self.tmp.name, "cache.sqlite"), max_entries=2)
+        self.path = self.write("a.txt", "alpha")
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_keyed_by_size_and_mtime(self):
+        self.cache.put(self.path, os.stat(self.path), "ab" * 32, digests={"sha512": "cd" * 64})
+        cached = self.cache.get(self.path, os.stat(self.path))
+        self.assertEqual(cached, {"sha": "ab" * 32, "phash": None, "digests": {"sha512": "cd" * 64}})
+        os.utime(self.path, (1, 1))
+        self.assertIsNone(self.cache.get(self.path, os.stat(self.path)))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_hash_entry_reuses_and_refreshes(self):
+        first = hash_entry(self.path, cache=self.cache)
+        second = hash_entry(self.path, cache=self.cache)
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertEqual(first["sha"], second["sha"])
+        self.assertFalse(hash_entry(self.path, cache=self.cache, force=True)["cached"])
+        # a digest the cache does not hold yet means one more read
+        self.assertFalse(hash_entry(self.path, cache=self.cache, algorithms=("sha256", "sha512"))["cached"])
+        self.assertTrue(hash_entry(self.path, cache=self.cache, algorithms=("sha256", "sha512"))["cached"])
+
+    def test_flush_evicts_least_recently_used(self):
+        paths = [self.path, self.write("b.txt", "beta"), self.write("c.txt", "gamma")]
+        for path in paths:
+            self.cache.put(path, os.stat(path), "00" * 32)
+        self.cache.conn.execute("UPDATE hashes SET used = 1 WHERE path = ?", (os.path.abspath(paths[1]),))
+        self.cache.flush()
+        self.assertIsNone(self.cache.get(paths[1], os.stat(paths[1])))
+        self.assertIsNotNone(self.cache.get(paths[0], os.stat(paths[0])))
+
+
+if __name__ == "__main__":
+    unittest.main()
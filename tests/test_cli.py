@@ -0,0 +1,52 @@
+import hashlib, os, subprocess, sys, tempfile, unittest
+
+CLI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr", "origistamp.py")
+
+
+class CliTest(unittest.TestCase):
+    # run in a scratch folder: config.json and the hash cache live next to the working directory
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.folder, "sub"))
+        self.files = {"a.txt": b"alpha", "sub/b.md": b"beta"}
+        for rel, data in self.files.items():
+            with open(os.path.join(self.folder, rel), "wb") as f:
+                f.write(data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_cli(self, *args):
+        return subprocess.run([sys.executable, CLI, *args], cwd=self.tmp.name, capture_output=True, text=True, timeout=60)
+
+    def test_hash(self):
+        out = self.run_cli("hash", "docs")
+        self.assertEqual(out.returncode, 0, out.stderr)
+        lines = sorted(line.split("  ", 1) for line in out.stdout.splitlines())
+        expected = sorted([hashlib.sha256(data).hexdigest(), os.path.join("docs", rel)] for rel, data in self.files.items())
+        self.assertEqual(lines, expected)
+
+    def test_report(self):
+        out = self.run_cli("report", "docs", "-o", "report", "--format", "md", "--author", "Tester")
+        self.assertEqual(out.returncode, 0, out.stderr)
+        with open(os.path.join(self.tmp.name, "report.md"), encoding="utf-8-sig") as f:
+            report = f.read()
+        self.assertIn("Tester", report)
+        for data in self.files.values():
+            self.assertIn(hashlib.sha256(data).hexdigest(), report)
+
+    def test_zip(self):
+        out = self.run_cli("zip", "docs", "-o", "bundle.zip", "--format", "md")
+        self.assertEqual(out.returncode, 0, out.stderr)
+        zip_hash, zip_path = out.stdout.split()
+        with open(zip_path, "rb") as f:
+            self.assertEqual(zip_hash, hashlib.sha256(f.read()).hexdigest())
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "bundle.zip.sha256")))
+
+    def test_bad_arguments(self):
+        self.assertEqual(self.run_cli("similar", "docs", "--threshold", "-1").returncode, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
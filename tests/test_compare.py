@@ -0,0 +1,55 @@
+import os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import build_metadata, build_report, build_sha_table, hash_paths, scan_folders
+from origistamp_compare import compare_folders, compare_manifest
+from origistamp_manifest import load_manifest
+
+
+def write(folder, rel, text):
+    path = os.path.join(folder, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class CompareTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.a = os.path.join(self.tmp.name, "a")
+        self.b = os.path.join(self.tmp.name, "b")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_folders(self):
+        for folder in (self.a, self.b):
+            write(folder, "same.txt", "same")
+            write(folder, "sub/edited.txt", "before")
+        write(self.b, "sub/edited.txt", "after!")
+        write(self.b, "grown.txt", "x")
+        write(self.a, "grown.txt", "xx")
+        write(self.a, "gone.txt", "gone")
+        write(self.b, "added.txt", "added")
+        result, text = compare_folders(self.a, self.b)
+        self.assertEqual(result.identical, 1)
+        self.assertEqual(sorted(key for key, _ in result.changed), ["grown.txt", "sub/edited.txt"])
+        self.assertEqual(result.size_mismatches, 1)
+        self.assertEqual((result.only_a, result.only_b), (["gone.txt"], ["added.txt"]))
+        self.assertIn("size 2 → 1 bytes", text)
+        self.assertFalse(result.same)
+
+    def test_markdown_sizes_keep_their_precision(self):
+        write(self.b, "tiny.txt", "abc")
+        report = os.path.join(self.tmp.name, "report.md")
+        with open(report, "w", encoding="utf-8-sig") as f:
+            f.write(build_report(build_sha_table(hash_paths(scan_folders([self.b]))), build_metadata()))
+        write(self.b, "tiny.txt", "x" * 20)
+        result, text = compare_manifest(load_manifest(report), self.b)
+        self.assertEqual(result.size_mismatches, 1)
+        self.assertIn("size 0.00 KB → 0.02 KB", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import HashCache, hash_paths, scan_folders
+from origistamp_dedup import duplicates_from_results, find_duplicates
+
+
+class FindDuplicatesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_stages(self):
+        block = 4096
+        data = os.urandom(4 * block)
+        same = [self.write(name, data) for name in ("a.csv", "b.csv", "c.csv")]
+        # same size and edges as the copies, different middle
+        self.write("middle.csv", data[:block] + os.urandom(2 * block) + data[-block:])
+        self.write("unique.csv", os.urandom(3 * block))
+        small = [self.write(name, b"tiny") for name in ("s1.txt", "s2.txt")]
+        self.write("empty1.txt", b"")
+        self.write("empty2.txt", b"")
+
+        result = find_duplicates(scan_folders([self.tmp.name]), block_size=block)
+        self.assertEqual([paths for _, _, paths in result.groups], [sorted(same), sorted(small)])
+        self.assertEqual(result.files, 9)
+        # unique.bin is never opened, middle.bin only loses at the full hash
+        self.assertEqual(result.size_candidates, 6)
+        self.assertEqual(result.edge_candidates, 4)
+        self.assertEqual(result.full_hashed, 4)
+        self.assertEqual(result.redundant_files, 3)
+        self.assertEqual(result.redundant_bytes, 2 * len(data) + 4)
+
+        result = find_duplicates(scan_folders([self.tmp.name]), block_size=block, include_empty=True)
+        self.assertEqual(len(result.groups), 3)
+
+    def test_matches_hashed_results(self):
+        data = os.urandom(1000)
+        for name in ("a.csv", "b.csv"):
+            self.write(name, data)
+        self.write("c.csv", os.urandom(1000))
+        self.write("empty.txt", b"")
+        paths = [path for path, _ in scan_folders([self.tmp.name])]
+        found = find_duplicates(paths)
+        from_results = duplicates_from_results(hash_paths(paths))
+        self.assertEqual(from_results.groups, found.groups)
+        self.assertEqual(from_results.total_bytes, found.total_bytes)
+
+    def test_partly_cached_size_bucket(self):
+        with tempfile.TemporaryDirectory() as folder, tempfile.TemporaryDirectory() as cache_dir:
+            data = os.urandom(300 * 1024)
+            for name in ("a.txt", "b.txt"):
+                with open(os.path.join(folder, name), "wb") as f:
+                    f.write(data)
+            cache = HashCache(os.path.join(cache_dir, "cache.sqlite"))
+            try:
+                self.assertEqual(len(find_duplicates(scan_folders([folder]), cache=cache).groups), 1)
+                # only b.txt is still cached now
+                os.utime(os.path.join(folder, "a.txt"), (1, 1))
+                result = find_duplicates(scan_folders([folder]), cache=cache)
+                self.assertEqual(len(result.groups), 1)
+                self.assertEqual(result.errors, [])
+            finally:
+                cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
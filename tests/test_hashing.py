@@ -0,0 +1,110 @@
+import hashlib, os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_stats import STATS
+from origistamp_core import MMAP_THRESHOLD, compare_files, hash_file, hash_file_digests, hash_paths, normalize_algorithms
+
+
+def expected(path, names=("sha256",)):
+    hashers = {name: hashlib.new(name) for name in names}
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            for h in hashers.values():
+                h.update(block)
+    return {name: h.hexdigest() for name, h in hashers.items()}
+
+
+class HashFileDigestsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # sparse, so only the head and the tail take disk space
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.large = os.path.join(cls.tmp.name, "large.bin")
+        with open(cls.large, "wb") as f:
+            f.write(os.urandom(4096))
+            f.truncate(MMAP_THRESHOLD + 12345)
+            f.seek(-100, os.SEEK_END)
+            f.write(os.urandom(100))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_chunked_read_matches_hashlib(self):
+        # empty, one partial block, exact blocks and a ragged tail
+        for size in (0, 1, 4096, 3 * 4096, 3 * 4096 + 7):
+            path = self.write(f"{size}.bin", os.urandom(size))
+            self.assertEqual(hash_file(path, buffer_size=4096), expected(path)["sha256"])
+
+    def test_compare_files(self):
+        a = self.write("a.txt", b"same")
+        b = self.write("b.txt", b"same")
+        c = self.write("c.txt", b"other")
+        self.assertIn("IDENTICAL", compare_files(a, b)[2])
+        hash_a, hash_c, result, text = compare_files(a, c)
+        self.assertIn("DIFFERENT", result)
+        self.assertEqual(hash_a["sha256"], hashlib.sha256(b"same").hexdigest())
+        self.assertIn(hash_c["sha256"], text)
+
+    def test_extra_digests_in_one_pass(self):
+        names = ("sha256", "sha512", "blake2b")
+        path = self.write("multi.bin", os.urandom(3 * 4096 + 5))
+        self.assertEqual(hash_file_digests(path, names, buffer_size=4096), expected(path, names))
+        results = hash_paths([path], algorithms=names)
+        self.assertEqual(results.extra_digests(0), {name: value for name, value in expected(path, names).items() if name != "sha256"})
+
+    def test_timed_read_matches_hashlib(self):
+        names = ("sha256", "sha512")
+        path = self.write("timed.bin", os.urandom(5 * 4096 + 3))
+        enabled = STATS.enabled
+        STATS.enable()
+        STATS.reset()
+        try:
+            self.assertEqual(hash_file_digests(path, names, buffer_size=4096), expected(path, names))
+            snap = STATS.snapshot()
+        finally:
+            STATS.enable(enabled)
+            STATS.reset()
+        self.assertEqual(snap["counters"]["bytes.hashed"], 5 * 4096 + 3)
+        self.assertEqual(set(snap["timers"]), {"io.read", "cpu.digest"})
+
+    def test_normalize_algorithms(self):
+        self.assertEqual(normalize_algorithms(None), ("sha256",))
+        self.assertEqual(normalize_algorithms(["SHA-512", "sha256", "blake2b", "sha512"]), ("sha256", "sha512", "blake2b"))
+        with self.assertRaises(ValueError):
+            normalize_algorithms(["md5"])
+
+    def test_mmap_above_threshold(self):
+        names = ("sha256", "sha512", "blake2b")
+        digests = hash_file_digests(self.large, names, use_mmap=True)
+        self.assertEqual(digests, expected(self.large, names))
+
+    def test_pipelined_read_matches_hashlib(self):
+        names = ("sha256", "sha512", "blake2b")
+        enabled = STATS.enabled
+        STATS.enable()
+        STATS.reset()
+        try:
+            # a buffer that does not divide the size leaves a ragged last block
+            digests = hash_file_digests(self.large, names, buffer_size=(1 << 20) + 13, read_ahead=2)
+            snap = STATS.snapshot()
+        finally:
+            STATS.enable(enabled)
+            STATS.reset()
+        self.assertEqual(digests, expected(self.large, names))
+        self.assertIn("io.wait", snap["timers"])
+        self.assertEqual(snap["counters"]["bytes.hashed"], os.path.getsize(self.large))
+
+    def test_read_ahead_off_matches_pipelined(self):
+        self.assertEqual(hash_file(self.large, read_ahead=0), hash_file(self.large, read_ahead=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
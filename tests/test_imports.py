@@ -0,0 +1,35 @@
+import os, subprocess, sys, unittest
+
+SCR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr")
+sys.path.insert(0, SCR)
+
+from origistamp_core import IMPORT_TIMES, LazyModule
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_core_import_leaves_heavy_modules_unloaded(self):
+        code = (
+            "import sys, origistamp_core, origistamp_manifest, origistamp_merkle, origistamp_compare\n"
+            "print(sorted(m for m in ('PIL', 'imagehash', 'markdown2', 'weasyprint', 'blake3') if m in sys.modules))"
+        )
+        out = subprocess.run([sys.executable, "-c", code], cwd=SCR, capture_output=True, text=True, timeout=60)
+        self.assertEqual(out.stdout.strip(), "[]", out.stderr)
+
+    def test_first_attribute_access_imports_and_times(self):
+        sys.modules.pop("colorsys", None)
+        IMPORT_TIMES.pop("colorsys", None)
+        module = LazyModule("colorsys")
+        self.assertNotIn("colorsys", sys.modules)
+        self.assertIsNone(module._module)
+        self.assertEqual(module.rgb_to_hsv(0, 0, 0), (0, 0, 0))
+        self.assertIsNotNone(module._module)
+        self.assertIn("colorsys", IMPORT_TIMES)
+
+    def test_missing_module_raises_on_use(self):
+        module = LazyModule("origistamp_no_such_module")
+        with self.assertRaises(ImportError):
+            module.anything
+
+
+if __name__ == "__main__":
+    unittest.main()
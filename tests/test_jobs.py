@@ -0,0 +1,73 @@
+import hashlib, json, os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import hash_paths
+from origistamp_jobs import JobJournal, job_header, load_job
+
+
+def sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class JobResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.files = []
+        for name in ("a.txt", "b.txt", "c.txt"):
+            path = os.path.join(self.tmp.name, name)
+            with open(path, "w") as f:
+                f.write(name * 10)
+            self.files.append(path)
+        self.path = os.path.join(self.tmp.name, "run.job.jsonl")
+
+    def crash(self):
+        # a, b hashed and checkpointed; the run dies while writing c
+        a, b, c = self.files
+        journal = JobJournal(self.path, job_header([self.tmp.name], ["sha256"], False))
+        stat = os.stat(a)
+        # a deliberately wrong digest shows whether a row is reused or re-hashed
+        journal.record(a, "00" * 32, stat.st_size, stat.st_mtime_ns)
+        stat = os.stat(b)
+        journal.record(b, sha256(b), stat.st_size, stat.st_mtime_ns)
+        journal.checkpoint(2, scanned=3, scan_done=True, force=True)
+        journal.f.write(json.dumps({"path": c, "sha256": "half"})[:20])
+        journal.f.close()
+
+    def test_load_drops_the_half_written_line(self):
+        self.crash()
+        job = load_job(self.path)
+        self.assertEqual(job.roots, [os.path.abspath(self.tmp.name)])
+        self.assertEqual(job.done.paths(), self.files[:2])
+        self.assertEqual(job.progress, {"type": "scan", "hashed": 2, "scanned": 3, "scan_done": True})
+        self.assertLess(job.offset, os.path.getsize(self.path))
+        self.assertIn("2 of 3 file(s) hashed", job.describe())
+
+    def test_resume_reuses_unchanged_rows(self):
+        self.crash()
+        a, b, c = self.files
+        with open(b, "a") as f:
+            f.write("changed")
+        job = load_job(self.path)
+        journal = job.open_journal()
+        results = hash_paths(self.files, workers=2, done=job.done, journal=journal)
+        journal.close()
+
+        shas = {results.path(row): results.sha(row) for row in range(len(results))}
+        self.assertEqual(shas, {a: "00" * 32, b: sha256(b), c: sha256(c)})
+        # only the re-hashed files are appended, after the truncated tail
+        resumed = load_job(self.path)
+        self.assertEqual(sorted(resumed.done.paths()), sorted([a, b, b, c]))
+        self.assertEqual(resumed.done.sha(resumed.done.row_of(b)), sha256(b))
+
+    def test_finished_job_is_removed(self):
+        journal = JobJournal(self.path, job_header([self.tmp.name], ["sha256"], False))
+        journal.close(finished=True)
+        self.assertFalse(os.path.exists(self.path))
+        journal.close(finished=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import json, os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import ResultStore
+from origistamp_manifest import (
+    MANIFEST_EXTENSIONS, MANIFEST_FORMATS, BinaryManifestReader, load_manifest, normalize_key, write_manifest
+)
+
+
+class ManifestRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = os.path.join(self.tmp.name, "root")
+        self.results = ResultStore()
+        rows = (("a.txt", 0), (os.path.join("sub", "with space.txt"), 5), (os.path.join("sub", "ünïcode.md"), 1 << 33))
+        for n, (rel, size) in enumerate(rows):
+            self.results.add(os.path.join(self.base, rel), bytes([n + 1]) * 32, size, mtime=1000 + n,
+                             digests={"sha512": f"{n + 1:02x}" * 64})
+        self.expected = [(normalize_key(rel), f"{n + 1:02x}" * 32, size) for n, (rel, size) in enumerate(rows)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, fmt, results=None):
+        path = os.path.join(self.tmp.name, "manifest" + MANIFEST_EXTENSIONS[fmt])
+        return write_manifest(results if results is not None else self.results, path, fmt, self.base)
+
+    def test_round_trips(self):
+        for fmt in MANIFEST_FORMATS:
+            manifest = load_manifest(self.write(fmt))
+            self.assertFalse(manifest.basenames_only, fmt)
+            entries = sorted((key, sha, size) for key, sha, size, _ in manifest.entries)
+            if fmt == "sha256sums":
+                # SHA256SUMS carries no sizes
+                self.assertEqual(entries, [(key, sha, None) for key, sha, _ in self.expected])
+            else:
+                self.assertEqual(entries, self.expected, fmt)
+
+    def test_jsonl_keeps_extra_digests_and_mtime(self):
+        with open(self.write("jsonl"), encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([row["path"] for row in rows], [key for key, _, _ in self.expected])
+        self.assertEqual(rows[0]["sha512"], "01" * 64)
+        self.assertEqual(rows[2]["mtime_ns"], 1002)
+
+    def test_binary_random_access(self):
+        reader = BinaryManifestReader(self.write("bin"))
+        try:
+            self.assertEqual(len(reader), 3)
+            self.assertEqual(reader[2], (self.expected[2][0], self.expected[2][1], 1 << 33, 1002))
+            self.assertEqual(reader[0][0], "a.txt")
+        finally:
+            reader.close()
+
+    def test_empty_manifests(self):
+        for fmt in MANIFEST_FORMATS:
+            self.assertEqual(len(load_manifest(self.write(fmt, ResultStore()))), 0, fmt)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import hashlib, os, random, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_merkle import MerkleTree, leaf_hash, load_proof, save_proof, verify_proof
+
+
+def digest(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def leaves(count, tag=""):
+    return {f"dir{n % 3}/file{n:03}.txt": digest(f"{n}{tag}") for n in range(count)}
+
+
+class MerkleTreeTest(unittest.TestCase):
+    def test_small_trees(self):
+        self.assertEqual(MerkleTree().root, hashlib.sha256(b"").hexdigest())
+        self.assertEqual(MerkleTree([("a", digest("a"))]).root, leaf_hash("a", digest("a")).hex())
+        # leaf order does not matter, the tree sorts by key
+        items = list(leaves(9).items())
+        self.assertEqual(MerkleTree(items).root, MerkleTree(reversed(items)).root)
+
+    def test_every_proof_verifies(self):
+        for count in (1, 2, 3, 5, 8, 17):
+            tree = MerkleTree(leaves(count).items())
+            for key, value in leaves(count).items():
+                self.assertTrue(verify_proof(key, value, tree.proof(key), tree.root), (count, key))
+
+    def test_tampering_is_detected(self):
+        tree = MerkleTree(leaves(6).items())
+        key, value = next(iter(leaves(6).items()))
+        proof = tree.proof(key)
+        self.assertFalse(verify_proof(key, digest("other"), proof, tree.root))
+        self.assertFalse(verify_proof("dir0/renamed.txt", value, proof, tree.root))
+        self.assertFalse(verify_proof(key, value, proof[:-1], tree.root))
+        self.assertIsNone(tree.proof("missing.txt"))
+
+    def test_apply_matches_a_rebuild(self):
+        rng = random.Random(1)
+        current = leaves(40)
+        tree = MerkleTree(current.items())
+        for step in range(30):
+            changes = {}
+            for key in rng.sample(sorted(current), 3):
+                changes[key] = None if rng.random() < 0.3 else digest(f"{key}{step}")
+            if rng.random() < 0.5:
+                changes[f"new/{step}.txt"] = digest(f"new{step}")
+            tree.apply(changes)
+            for key, value in changes.items():
+                if value is None:
+                    current.pop(key, None)
+                else:
+                    current[key] = value
+            self.assertEqual(tree.root, MerkleTree(current.items()).root, step)
+            self.assertEqual(tree.keys, sorted(current))
+        self.assertFalse(tree.update("missing.txt", digest("x")))
+
+    def test_exported_proof_round_trip(self):
+        tree = MerkleTree(leaves(5).items())
+        key, value = "dir1/file001.txt", leaves(5)["dir1/file001.txt"]
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "proof.json")
+            save_proof(tree.export_proof(key, bytes.fromhex(value)), path)
+            proof = load_proof(path)
+        self.assertEqual((proof["path"], proof["sha256"], proof["leaves"]), (key, value, 5))
+        self.assertTrue(verify_proof(proof["path"], proof["sha256"], proof["proof"], proof["root"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import io, os, sys, tempfile, unittest, zlib, re
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import build_metadata, build_report, build_sha_table, convert_markdown_to_pdf, hash_paths
+from origistamp_pdf import write_report_pdf
+
+
+def page_text(pdf):
+    return b"".join(zlib.decompress(m) for m in re.findall(rb"stream\n(.*?)\nendstream", pdf, re.S))
+
+
+def cell_text(pdf, font):
+    # the text of every Tj drawn in `font`, in drawing order
+    return b"".join(re.findall(rb"/" + font + rb" \d+ Tf [\d.]+ [\d.]+ Td \((.*?)\) Tj", page_text(pdf))).decode("cp1252")
+
+
+class WriteReportPdfTest(unittest.TestCase):
+    def test_non_ascii_row_and_section(self):
+        content = (
+            "# SHA-256 Hash Report\n\n**Author:** Zoë\n\n"
+            "| File Name | SHA-256 | Size | Modified |\n|---|---|---|---|\n"
+            f"| café’s report.txt | `{'ab' * 32}` | 1.00 KB | 2025-07-05 18:13:22 |\n\n"
+            "# Similar Images\n\n- `a.jpg` — `b.jpg` (distance 3, 5 €)\n"
+        )
+        buf = io.BytesIO()
+        write_report_pdf(content, buf)
+        pdf = buf.getvalue()
+        self.assertTrue(pdf.startswith(b"%PDF-1.4"))
+        text = page_text(pdf)
+        # WinAnsiEncoding: em dash 0x97, right quote 0x92, euro 0x80
+        self.assertIn("café’s".encode("cp1252"), text)
+        self.assertIn("—".encode("cp1252"), text)
+        self.assertIn("€".encode("cp1252"), text)
+
+    def test_extra_digests_are_printed_in_full(self):
+        with tempfile.TemporaryDirectory() as folder:
+            paths = []
+            for n in range(3):
+                paths.append(os.path.join(folder, f"file{n}.txt"))
+                with open(paths[-1], "w") as f:
+                    f.write(str(n))
+            results = hash_paths(paths, algorithms=("sha256", "sha512", "blake2b"))
+            content = build_report(build_sha_table(results), build_metadata())
+        buf = io.BytesIO()
+        write_report_pdf(content, buf)
+        mono = cell_text(buf.getvalue(), b"F3")
+        self.assertNotIn("...", mono)
+        for row in range(len(results)):
+            self.assertIn(results.sha(row), mono)
+            for value in results.extra_digests(row).values():
+                self.assertIn(value, mono)
+
+    def test_long_names_are_wrapped_not_cut(self):
+        prefix = "quarterly-report-2024-final-version-approved-by-the-legal-department_"
+        names = [prefix + "copy-1.pdf", prefix + "copy-2.pdf"]
+        rows = "".join(f"| {name} | `{'ab' * 32}` | 1.00 KB |\n" for name in names)
+        content = "# SHA-256 Hash Report\n\n| File Name | SHA-256 | Size |\n|---|---|---|\n" + rows
+        buf = io.BytesIO()
+        write_report_pdf(content, buf)
+        text = cell_text(buf.getvalue(), b"F1")
+        self.assertNotIn("...", text)
+        for name in names:
+            self.assertIn(name, text)
+
+    def test_long_reports_take_the_direct_path(self):
+        rows = "".join(f"| file{n:04}.txt | `{n:064x}` | 1.00 KB |\n" for n in range(500))
+        content = "# SHA-256 Hash Report\n\n| File Name | SHA-256 | Size |\n|---|---|---|\n" + rows
+        # WeasyPrint is never imported for a report over the threshold
+        pdf = convert_markdown_to_pdf(content, None, fast_threshold=100)
+        pages = int(re.search(rb"/Type /Pages /Kids \[[^\]]*\] /Count (\d+)", pdf).group(1))
+        self.assertGreater(pages, 10)
+        # every page repeats the header row, every row appears once
+        self.assertEqual(page_text(pdf).count(b"(File Name) Tj"), pages)
+        self.assertIn(f"{499:064x}", cell_text(pdf, b"F3"))
+        # the xref table points at each object
+        xref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+        offsets = re.findall(rb"(\d{10}) 00000 n", pdf[xref:])
+        for obj_id, offset in enumerate(offsets, 1):
+            self.assertTrue(pdf[int(offset):].startswith(f"{obj_id} 0 obj".encode()))
+
+
+if __name__ == "__main__":
+    unittest.main()
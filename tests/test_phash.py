@@ -0,0 +1,45 @@
+import hashlib, importlib.util, os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import hash_paths
+
+HAVE_IMAGING = all(importlib.util.find_spec(name) for name in ("PIL", "imagehash"))
+
+
+class ImageHashColumnTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_only_images_get_a_phash(self):
+        with open(self.path("notes.txt"), "w") as f:
+            f.write("text")
+        # not decodable: the digest is still taken from the same read, the pHash is marked failed
+        with open(self.path("broken.png"), "wb") as f:
+            f.write(b"not an image")
+        results = hash_paths([self.path("notes.txt"), self.path("broken.png")], phash=True)
+        rows = {os.path.basename(results.path(row)): row for row in range(len(results))}
+        self.assertIsNone(results.phash(rows["notes.txt"]))
+        self.assertEqual(results.phash(rows["broken.png"]), "-")
+        self.assertEqual(results.sha(rows["broken.png"]), hashlib.sha256(b"not an image").hexdigest())
+
+    @unittest.skipUnless(HAVE_IMAGING, "Pillow and imagehash are optional")
+    def test_copies_share_a_phash(self):
+        from PIL import Image
+        image = Image.linear_gradient("L").resize((64, 64))
+        image.save(self.path("a.png"))
+        image.save(self.path("b.bmp"))
+        results = hash_paths([self.path("a.png"), self.path("b.bmp")], phash=True)
+        phashes = {results.phash(row) for row in range(len(results))}
+        self.assertEqual(len(phashes), 1)
+        self.assertRegex(phashes.pop(), "^[0-9a-f]{16}$")
+
+
+if __name__ == "__main__":
+    unittest.main()
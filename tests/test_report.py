@@ -0,0 +1,44 @@
+import os, sys, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import ResultStore, build_report, build_sha_table, iter_sha_table
+
+
+def store(*rows):
+    results = ResultStore()
+    for path, sha, size, phash in rows:
+        results.add(path, sha, size, phash=phash)
+    return results
+
+
+class ShaTableTest(unittest.TestCase):
+    def test_rows_in_path_order(self):
+        results = store(("/d/b.txt", "bb" * 32, 2048, None), ("/d/a.txt", "aa" * 32, 10, None))
+        lines = build_sha_table(results).splitlines()
+        self.assertEqual(lines[0], "| File Name | SHA-256 | Size |")
+        self.assertEqual(lines[2], f"| a.txt | `{'aa' * 32}` | 0.01 KB |")
+        self.assertEqual(lines[3], f"| b.txt | `{'bb' * 32}` | 2.00 KB |")
+        self.assertEqual(len(lines), 4)
+
+    def test_selected_rows_only(self):
+        results = store(("/d/a.txt", "aa" * 32, 1, None), ("/d/b.txt", "bb" * 32, 1, None))
+        text = build_sha_table(results, rows=[1])
+        self.assertNotIn("a.txt", text)
+        self.assertIn("b.txt", text)
+
+    def test_image_hash_column_only_with_phashes(self):
+        results = store(("/d/a.png", "aa" * 32, 1, "00ff00ff00ff00ff"), ("/d/b.txt", "bb" * 32, 1, None),
+                        ("/d/c.png", "cc" * 32, 1, "-"))
+        chunks = list(iter_sha_table(results))
+        self.assertTrue(chunks[0].endswith("| Image Hash |\n"))
+        self.assertIn("| `00ff00ff00ff00ff` |", chunks[2])
+        self.assertTrue(chunks[3].endswith("| - |\n") and chunks[4].endswith("| - |\n"))
+
+    def test_build_report_skips_empty_sections(self):
+        report = build_report("TABLE\n", "META", ["", "# Extra"])
+        self.assertEqual(report, "# SHA-256 Hash Report\n\nMETA\n\nTABLE\n\n\n# Extra")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os, sys, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import ResultStore
+
+
+class ResultStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.results = ResultStore()
+        for n, path in enumerate((os.path.join("d", "b.txt"), os.path.join("d", "sub", "A.txt"), "c.txt")):
+            self.results.add(path, bytes([n]) * 32, 100 - n, mtime=n, phash=("0f" * 8) if n == 1 else None)
+
+    def test_columns(self):
+        results = self.results
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results.path(1), os.path.join("d", "sub", "A.txt"))
+        self.assertEqual(results.sha(2), "02" * 32)
+        self.assertEqual(results.phash(1), "0f" * 8)
+        self.assertIsNone(results.phash(0))
+        self.assertTrue(results.has_phashes())
+        self.assertEqual(results.row_of("c.txt"), 2)
+        self.assertIn(os.path.join("d", "b.txt"), results)
+        self.assertEqual(len(results.dirs), 3)
+
+    def test_sorting_and_filtering(self):
+        results = self.results
+        self.assertEqual(results.sorted_rows("size"), [2, 1, 0])
+        self.assertEqual(results.sorted_rows("mtime", reverse=True), [2, 1, 0])
+        self.assertEqual(results.sorted_rows("name"), [1, 0, 2])
+        self.assertEqual(results.filter_rows("A.T"), [1])
+
+    def test_row_of_follows_adds(self):
+        results = self.results
+        self.assertIsNone(results.row_of("new.txt"))
+        row = results.add("new.txt", "ff" * 32, 1)
+        self.assertEqual(results.row_of("new.txt"), row)
+
+    def test_clear(self):
+        self.results.clear()
+        self.assertEqual(len(self.results), 0)
+        self.assertIsNone(self.results.row_of("c.txt"))
+
+
+class ExtraDigestsTest(unittest.TestCase):
+    def setUp(self):
+        self.results = ResultStore()
+        self.results.add("a.txt", "0a" * 32, 1)
+        self.results.add("b.txt", "0b" * 32, 2, digests={"sha512": "bb" * 64})
+        self.results.add("c.txt", "0c" * 32, 3, digests={"sha512": "cc" * 64, "blake2b": "c2" * 64})
+
+    def test_rows_without_a_digest_stay_empty(self):
+        results = self.results
+        self.assertEqual(results.algorithms(), ["sha256", "sha512", "blake2b"])
+        self.assertEqual(results.extra_digests(0), {"sha512": None, "blake2b": None})
+        self.assertEqual(results.extra_digests(1), {"sha512": "bb" * 64, "blake2b": None})
+        self.assertEqual(results.hexdigest(2, "blake2b"), "c2" * 64)
+        self.assertEqual(results.hexdigest(2, "sha256"), "0c" * 32)
+
+    def test_update(self):
+        results = self.results
+        results.update(0, "1a" * 32, 10, mtime=5, digests={"sha512": "aa" * 64, "sha3": "a3" * 32})
+        self.assertEqual((results.sha(0), results.sizes[0], results.mtimes[0]), ("1a" * 32, 10, 5))
+        self.assertEqual(results.extra_digests(0), {"sha512": "aa" * 64, "blake2b": None, "sha3": "a3" * 32})
+        # the new column is zero-filled for the other rows, and a digest not passed again is cleared
+        self.assertIsNone(results.hexdigest(2, "sha3"))
+        results.update(2, "2c" * 32, 30)
+        self.assertEqual(results.extra_digests(2), {"sha512": None, "blake2b": None, "sha3": None})
+        self.assertEqual(results.extra_digests(1)["sha512"], "bb" * 64)
+
+    def test_remove(self):
+        results = self.results
+        self.assertEqual(results.row_of("c.txt"), 2)
+        results.remove([0, 1])
+        self.assertEqual(len(results), 1)
+        self.assertEqual((results.path(0), results.sha(0), results.sizes[0]), ("c.txt", "0c" * 32, 3))
+        self.assertEqual(results.extra_digests(0), {"sha512": "cc" * 64, "blake2b": "c2" * 64})
+        self.assertEqual(results.row_of("c.txt"), 0)
+        self.assertIsNone(results.row_of("a.txt"))
+        results.remove([])
+        self.assertEqual(len(results), 1)
+        row = results.add("d.txt", "0d" * 32, 4, digests={"blake2b": "d2" * 64})
+        self.assertEqual(results.extra_digests(row), {"sha512": None, "blake2b": "d2" * 64})
+
+
+if __name__ == "__main__":
+    unittest.main()
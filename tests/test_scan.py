@@ -0,0 +1,91 @@
+import os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_scan import ScanRules, Scanner
+
+
+class ScanRulesTest(unittest.TestCase):
+    def test_default_excludes(self):
+        rules = ScanRules()
+        self.assertTrue(rules.excluded(".git", ".git", True))
+        self.assertTrue(rules.excluded("src/node_modules", "node_modules", True))
+        self.assertTrue(rules.excluded("pkg.egg-info", "pkg.egg-info", True))
+        # directory rules never match files of the same name
+        self.assertFalse(rules.excluded("notes/build", "build", False))
+        self.assertTrue(rules.wanted("src/main.py", "main.py"))
+
+    def test_patterns(self):
+        rules = ScanRules(["*.log", "/top.txt", "docs/**/draft*", "tmp?/"])
+        self.assertTrue(rules.excluded("a/b/c.log", "c.log", False))
+        self.assertTrue(rules.excluded("top.txt", "top.txt", False))
+        self.assertFalse(rules.excluded("sub/top.txt", "top.txt", False))
+        self.assertTrue(rules.excluded("docs/draft1.md", "draft1.md", False))
+        self.assertTrue(rules.excluded("docs/x/y/draft.md", "draft.md", False))
+        self.assertFalse(rules.excluded("other/draft.md", "draft.md", False))
+        self.assertTrue(rules.excluded("tmp1", "tmp1", True))
+        self.assertFalse(rules.excluded("tmp12", "tmp12", True))
+
+    def test_negation_last_match_wins(self):
+        rules = ScanRules(["*.txt", "!keep*.txt", "keep-not.txt"])
+        self.assertTrue(rules.excluded("a.txt", "a.txt", False))
+        self.assertFalse(rules.excluded("sub/keep1.txt", "keep1.txt", False))
+        self.assertTrue(rules.excluded("keep-not.txt", "keep-not.txt", False))
+
+    def test_include(self):
+        rules = ScanRules((), ["*.md", "src/**"])
+        self.assertTrue(rules.wanted("a/readme.md", "readme.md"))
+        self.assertTrue(rules.wanted("src/deep/x.py", "x.py"))
+        self.assertFalse(rules.wanted("lib/x.py", "x.py"))
+
+    def test_from_config(self):
+        rules = ScanRules.from_config({"scan_default_excludes": False, "scan_exclude": ["*.tmp", "# comment"]})
+        self.assertFalse(rules.excluded(".git", ".git", True))
+        self.assertTrue(rules.excluded("a.tmp", "a.tmp", False))
+
+
+class ScannerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for rel in ("a.txt", "b.bin", "sub/c.txt", "sub/deep/d.md", ".git/objects/e.txt", "build/f.txt"):
+            path = os.path.join(self.root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(rel)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def rel(self, paths):
+        return sorted(os.path.relpath(path, self.root).replace(os.sep, "/") for path in paths)
+
+    def test_prunes_and_filters(self):
+        expected = ["a.txt", "sub/c.txt", "sub/deep/d.md"]
+        for workers in (1, 8):
+            scanner = Scanner([self.root], ScanRules(), (".txt", ".md"), workers)
+            items = list(scanner)
+            self.assertEqual(self.rel(path for path, _ in items), expected, workers)
+            self.assertEqual(self.rel(scanner.paths), expected)
+            self.assertTrue(all(st.st_size == os.path.getsize(path) for path, st in items))
+            self.assertTrue(scanner.done)
+            # .git and build are never opened
+            self.assertEqual(scanner.dirs_scanned, 3)
+
+    def test_without_rules_and_explicit_files(self):
+        self.assertEqual(len(list(Scanner([self.root]))), 6)
+        # explicitly chosen files bypass the exclude rules
+        chosen = os.path.join(self.root, "build", "f.txt")
+        self.assertEqual([path for path, _ in Scanner([chosen], ScanRules())], [chosen])
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "needs symlinks")
+    def test_symlinked_folders_are_not_followed(self):
+        try:
+            os.symlink(os.path.join(self.root, "sub"), os.path.join(self.root, "link"))
+        except OSError:
+            self.skipTest("symlinks not permitted")
+        self.assertNotIn("link/c.txt", self.rel(path for path, _ in Scanner([self.root], workers=1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
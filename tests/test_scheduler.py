@@ -0,0 +1,58 @@
+import os, sys, threading, time, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import HashScheduler
+
+
+def square(n):
+    if n == 13:
+        raise ValueError("unlucky")
+    return n * n
+
+
+class HashSchedulerTest(unittest.TestCase):
+    def test_every_item_comes_back_once(self):
+        scheduler = HashScheduler(square, workers=4, max_pending=3)
+        scheduler.start(iter(range(100)))
+        results = {item: (value, error) for item, value, error in scheduler.iter_results()}
+        self.assertTrue(scheduler.finished)
+        self.assertEqual(sorted(results), list(range(100)))
+        self.assertEqual(results[7], (49, None))
+        self.assertIsNone(results[13][0])
+        self.assertIsInstance(results[13][1], ValueError)
+
+    def test_drain_does_not_block(self):
+        release = threading.Event()
+        scheduler = HashScheduler(lambda n: release.wait() and n, workers=2)
+        scheduler.start(range(4))
+        self.assertEqual(scheduler.drain(), [])
+        release.set()
+        batch = []
+        deadline = time.monotonic() + 5
+        while not scheduler.finished and time.monotonic() < deadline:
+            batch += scheduler.drain(max_items=1)
+            time.sleep(0.01)
+        self.assertEqual(sorted(item for item, _, _ in batch), [0, 1, 2, 3])
+
+    def test_cancel_stops_feeding(self):
+        started = []
+        release = threading.Event()
+
+        def job(n):
+            started.append(n)
+            release.wait()
+            return n
+
+        scheduler = HashScheduler(job, workers=1, max_pending=1)
+        scheduler.start(iter(range(1000)))
+        time.sleep(0.1)
+        scheduler.cancel()
+        release.set()
+        scheduler.wait()
+        list(scheduler.iter_results())
+        self.assertLess(len(started), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os, random, sys, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import BKTree, find_similar_images, hamming_distance, similar_pairs
+
+
+def near_values(seed, count=300, bits=64):
+    # clusters of hashes a few bits apart, plus exact repeats
+    rng = random.Random(seed)
+    values = []
+    while len(values) < count:
+        base = rng.getrandbits(bits)
+        values.append(base)
+        for _ in range(rng.randrange(4)):
+            value = base
+            for bit in rng.sample(range(bits), rng.randrange(12)):
+                value ^= 1 << bit
+            values.append(value)
+    return values
+
+
+def brute_force(values, threshold):
+    return {(j, i) for i in range(len(values)) for j in range(i) if hamming_distance(values[i], values[j]) <= threshold}
+
+
+class SimilarPairsTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        # both the multi-index tables (small thresholds) and the BK-tree fallback
+        for threshold in (0, 1, 3, 5, 10, 15, 16, 24, 64):
+            values = near_values(threshold)
+            pairs = list(similar_pairs(values, threshold))
+            self.assertEqual(len(pairs), len(set(pairs)), threshold)
+            self.assertEqual(set(pairs), brute_force(values, threshold), threshold)
+
+    def test_shorter_hashes(self):
+        values = near_values(7, bits=16)
+        self.assertEqual(set(similar_pairs(values, 2, bits=16)), brute_force(values, 2))
+
+    def test_bk_tree_search(self):
+        values = near_values(3, 100)
+        tree = BKTree()
+        for i, value in enumerate(values):
+            tree.add(value, i)
+        for threshold in (0, 4, 9):
+            found = {key for key, _ in tree.search(values[0], threshold)}
+            self.assertEqual(found, {i for i, v in enumerate(values) if hamming_distance(v, values[0]) <= threshold})
+
+
+class FindSimilarImagesTest(unittest.TestCase):
+    def test_clusters(self):
+        phashes = {"a.png": "ffff000000000000", "b.png": "ffff000000000003", "c.png": "0000ffffffffffff",
+                   "d.png": "-", "e.png": None, "f.png": "ffff000000000007"}
+        clusters = find_similar_images(phashes, 2)
+        self.assertEqual([[path for path, _ in group] for group in clusters], [["a.png", "b.png", "f.png"]])
+
+    def test_threshold_bounds(self):
+        phashes = {"a.png": "ffff000000000000", "b.png": "ffff000000000001", "c.png": "0000ffffffffffff"}
+        self.assertEqual(len(find_similar_images(phashes, 0)), 0)
+        self.assertEqual(len(find_similar_images(phashes, 64)), 1)
+        for threshold in (-1, 65):
+            with self.assertRaises(ValueError):
+                find_similar_images(phashes, threshold)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import ScanRules, build_metadata, build_report, build_sha_table, hash_paths, scan_folders
+from origistamp_compare import compare_manifest
+from origistamp_manifest import load_manifest, verify_folder
+
+
+class RepeatedNamesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, "docs")
+        for sub, text in (("a", "alpha readme"), ("b", "beta readme, longer"), ("c", "gamma readme")):
+            os.makedirs(os.path.join(self.folder, sub))
+            with open(os.path.join(self.folder, sub, "README.md"), "w") as f:
+                f.write(text)
+        report = os.path.join(self.tmp.name, "report.md")
+        with open(report, "w", encoding="utf-8-sig") as f:
+            f.write(build_report(build_sha_table(hash_paths(scan_folders([self.folder]))), build_metadata()))
+        self.manifest = load_manifest(report)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_verify_matches_every_copy(self):
+        result = verify_folder(self.manifest, self.folder)
+        self.assertEqual(len(result.matched), 3)
+        self.assertTrue(result.ok)
+
+    def test_verify_and_compare_find_the_edited_copy(self):
+        # same size, different content
+        with open(os.path.join(self.folder, "c", "README.md"), "w") as f:
+            f.write("gamma README")
+        result = verify_folder(self.manifest, self.folder)
+        self.assertEqual(len(result.matched), 2)
+        self.assertEqual(len(result.modified), 1)
+        self.assertEqual(result.missing + result.new, [])
+        result, _ = compare_manifest(self.manifest, self.folder)
+        self.assertEqual(result.identical, 2)
+        self.assertEqual([key for key, _ in result.changed], ["c/README.md"])
+
+
+class RepeatedTopLevelNameTest(unittest.TestCase):
+    # x.txt is listed twice, once for the top-level file and once from sub/
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.folder, "sub"))
+        for rel, text in (("x.txt", "top"), ("sub/x.txt", "nested"), ("a.txt", "a"), ("sub/b.txt", "b")):
+            with open(os.path.join(self.folder, rel), "w") as f:
+                f.write(text)
+        report = os.path.join(self.tmp.name, "report.md")
+        with open(report, "w", encoding="utf-8-sig") as f:
+            f.write(build_report(build_sha_table(hash_paths(scan_folders([self.folder]))), build_metadata()))
+        self.manifest = load_manifest(report)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_verify_claims_each_file_once(self):
+        result = verify_folder(self.manifest, self.folder)
+        self.assertEqual(sorted(result.matched), ["a.txt", "b.txt", "x.txt", "x.txt"])
+        self.assertEqual(result.new, [])
+        self.assertTrue(result.ok)
+
+    def test_verify_reports_a_changed_copy(self):
+        with open(os.path.join(self.folder, "sub", "x.txt"), "w") as f:
+            f.write("NESTED")
+        result = verify_folder(self.manifest, self.folder)
+        self.assertEqual(len(result.modified), 1)
+        self.assertEqual(result.new, [])
+        self.assertFalse(result.ok)
+
+    def test_verify_reports_a_removed_copy(self):
+        os.remove(os.path.join(self.folder, "sub", "x.txt"))
+        result = verify_folder(self.manifest, self.folder)
+        self.assertEqual(result.missing, ["x.txt"])
+        self.assertFalse(result.ok)
+
+    def test_compare_counts_every_row(self):
+        result, _ = compare_manifest(self.manifest, self.folder)
+        self.assertEqual((result.files_a, result.files_b, result.identical), (4, 4, 4))
+        self.assertTrue(result.same)
+        os.remove(os.path.join(self.folder, "x.txt"))
+        result, _ = compare_manifest(self.manifest, self.folder)
+        self.assertEqual((result.files_a, result.identical, len(result.only_a)), (4, 3, 1))
+        self.assertEqual(result.only_b, [])
+
+
+class VerifyStatusTest(unittest.TestCase):
+    def test_matched_modified_missing_new(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for rel, text in (("same.txt", "same"), ("sub/edited.txt", "before"), ("gone.txt", "gone")):
+                os.makedirs(os.path.dirname(os.path.join(folder, rel)), exist_ok=True)
+                with open(os.path.join(folder, rel), "w") as f:
+                    f.write(text)
+            results = hash_paths(scan_folders([folder]))
+            sums = os.path.join(folder, "SHA256SUMS")
+            with open(sums, "w") as f:
+                f.writelines(f"{results.sha(row)} *{os.path.relpath(results.path(row), folder)}\n" for row in range(len(results)))
+            with open(os.path.join(folder, "sub", "edited.txt"), "w") as f:
+                f.write("after!")
+            os.remove(os.path.join(folder, "gone.txt"))
+            with open(os.path.join(folder, "added.txt"), "w") as f:
+                f.write("added")
+
+            result = verify_folder(load_manifest(sums), folder)
+            self.assertEqual(result.matched, ["same.txt"])
+            self.assertEqual(result.modified, [("sub/edited.txt", "SHA-256 differs")])
+            self.assertEqual(result.missing, ["gone.txt"])
+            self.assertEqual(result.new, ["added.txt"])
+            self.assertFalse(result.ok)
+
+
+class VerifyScanRulesTest(unittest.TestCase):
+    def test_excluded_trees_are_not_new(self):
+        with tempfile.TemporaryDirectory() as folder:
+            os.makedirs(os.path.join(folder, "build"))
+            for rel in ("a.txt", "build/out.txt"):
+                with open(os.path.join(folder, rel), "w") as f:
+                    f.write(rel)
+            rules = ScanRules()
+            sums = os.path.join(folder, "SHA256SUMS")
+            results = hash_paths(scan_folders([folder], rules))
+            with open(sums, "w") as f:
+                f.writelines(f"{results.sha(row)}  {results.names[row]}\n" for row in range(len(results)))
+            manifest = load_manifest(sums)
+            self.assertEqual(verify_folder(manifest, folder).new, ["build/out.txt"])
+            result = verify_folder(manifest, folder, rules=rules)
+            self.assertEqual((result.matched, result.new), (["a.txt"], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
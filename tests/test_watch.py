@@ -0,0 +1,38 @@
+import os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import hash_paths, hash_scanned, scan_folders
+from origistamp_merkle import MerkleTree
+from origistamp_watch import FolderWatcher, apply_removals, apply_result, known_state, merkle_changes
+
+
+class WatchMerkleTest(unittest.TestCase):
+    def test_applied_batch_matches_a_rebuild(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for name in ("a.txt", "b.txt", "c.txt"):
+                with open(os.path.join(folder, name), "w") as f:
+                    f.write(name)
+            results = hash_paths(scan_folders([folder]))
+            merkle = MerkleTree.from_results(results, folder)
+            watcher = FolderWatcher([folder], known=known_state(results), debounce=0)
+
+            with open(os.path.join(folder, "a.txt"), "w") as f:
+                f.write("edited")
+            with open(os.path.join(folder, "d.txt"), "w") as f:
+                f.write("new")
+            os.remove(os.path.join(folder, "b.txt"))
+            watcher._resync()
+            changes = watcher.changes()
+            self.assertEqual(sorted(kind for kind, _, _ in changes), ["A", "D", "M"])
+
+            apply_removals(results, changes)
+            for kind, path, st in changes:
+                if kind != "D":
+                    apply_result(results, path, hash_scanned((path, st)))
+            merkle.apply(merkle_changes(results, changes, folder))
+            self.assertEqual(merkle.root, MerkleTree.from_results(results, folder).root)
+
+
+if __name__ == "__main__":
+    unittest.main()
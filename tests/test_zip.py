@@ -0,0 +1,38 @@
+import hashlib, os, sys, tempfile, unittest, zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scr"))
+
+from origistamp_core import create_zip, hash_paths
+
+
+class CreateZipTest(unittest.TestCase):
+    def test_single_pass_digest_and_members(self):
+        with tempfile.TemporaryDirectory() as folder:
+            files = {"notes.txt": b"plain text " * 1000, "photo.jpg": os.urandom(5000)}
+            paths = []
+            for name, data in files.items():
+                paths.append(os.path.join(folder, name))
+                with open(paths[-1], "wb") as f:
+                    f.write(data)
+            zip_path = os.path.join(folder, "bundle.zip")
+            zip_hash = create_zip(zip_path, paths, "# Report\n", "md", hash_paths(paths))
+
+            with open(zip_path, "rb") as f:
+                self.assertEqual(zip_hash, hashlib.sha256(f.read()).hexdigest())
+            with open(zip_path + ".sha256", encoding="utf-8") as f:
+                self.assertEqual(f.read(), f"{zip_hash}  bundle.zip\n")
+            with zipfile.ZipFile(zip_path) as zf:
+                self.assertIsNone(zf.testzip())
+                for name, data in files.items():
+                    self.assertEqual(zf.read(name), data)
+                # already-compressed formats are stored, the rest deflated
+                self.assertEqual(zf.getinfo("photo.jpg").compress_type, zipfile.ZIP_STORED)
+                self.assertEqual(zf.getinfo("notes.txt").compress_type, zipfile.ZIP_DEFLATED)
+                self.assertEqual(zf.read("sha_report.md").decode("utf-8-sig"), "# Report\n")
+                sums = zf.read("SHA256SUMS").decode()
+                for name, data in files.items():
+                    self.assertIn(f"{hashlib.sha256(data).hexdigest()}  {name}\n", sums)
+
+
+if __name__ == "__main__":
+    unittest.main()